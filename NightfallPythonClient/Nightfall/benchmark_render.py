@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the zone render preparation.
+Compares the old per-exit room scans with map.render_prep on synthetic grid
+zones of growing size. Time per room stays flat for prepare_zone (linear)
+while the scan grows with the zone (quadratic).
+With NumPy installed prepare_zone_arrays (slices of the zone geometry
+arrays) is timed next to it.
+With --world the real zones from data/nightfall_world.json are timed too.
+With --headless every zone level of the world is also drawn through the
+ZoneRenderer into a RecordingBackend (no display needed): fitted like a
+freshly opened zone and at full detail around its center. --budget-ms makes
+it a regression gate, the exit code is 1 if any zone takes longer.
+"""
+
+import argparse
+import sys
+import time
+from types import SimpleNamespace
+
+from core.room_graph import RoomGraph
+from core.zone_geometry import ZoneGeometry, NUMPY_AVAILABLE
+from map.render_prep import prepare_zone, prepare_zone_arrays
+
+
+def make_grid_zone(count, zone_id=1, spacing=60):
+    """
+    Square grid of rooms with two-way exits (one-way in the first column) and
+    one zone exit, as (graph, get_rooms_in_zone tuples, rooms by id)
+    """
+    side = int(count ** 0.5) or 1
+    rooms, exits, listed = {}, {}, []
+    for i in range(count):
+        x, y = (i % side) * spacing, (i // side) * spacing
+        room_id = i + 1
+        rooms[str(room_id)] = {"id": room_id, "zone_id": zone_id, "name": f"Room {room_id}",
+                               "position": {"x": x, "y": y, "z": 0}}
+        listed.append((room_id, x, y, 0, f"Room {room_id}"))
+        room_exits = []
+        if i % side + 1 < side and i + 1 < count:
+            room_exits.append({"to": room_id + 1, "type": 2})
+        if i % side > 0:
+            room_exits.append({"to": room_id - 1, "type": 6})
+        if i + side < count:
+            room_exits.append({"to": room_id + side, "type": 4})
+        if i >= side and i % side:  # two-way north/south, except one-way in the first column
+            room_exits.append({"to": room_id - side, "type": 0})
+        exits[str(room_id)] = room_exits
+    # One exit into a neighbouring zone
+    rooms["0"] = {"id": 0, "zone_id": zone_id + 1, "name": "Elsewhere", "position": {"x": 0, "y": 0, "z": 0}}
+    exits["1"].append({"to": 0, "type": 8})
+    return RoomGraph(rooms, exits), listed, rooms
+
+
+def legacy_prepare(graph, rooms, zone_id):
+    """The previous draw path: exit list, then two linear room scans per exit"""
+    exits_info = []
+    for room in rooms:
+        idx = graph.index_of[room[0]]
+        for to_idx in graph.neighbours(idx):
+            exits_info.append((room[0], graph.room_ids[to_idx], graph.zone(to_idx)))
+    exits_tuples = {(e[0], e[1]) for e in exits_info}
+    bidirectional = {(a, b) for a, b in exits_tuples if (b, a) in exits_tuples}
+    segments = []
+    for from_id, to_id in exits_tuples:
+        from_pos = next((room[1:3] for room in rooms if room[0] == from_id), None)
+        to_pos = next((room[1:3] for room in rooms if room[0] == to_id), None)
+        if from_pos and to_pos:
+            segments.append((from_pos, to_pos, (from_id, to_id) in bidirectional))
+    notes = [e for e in exits_info if e[2] != zone_id]
+    return segments, notes
+
+
+def best_of(repeat, func, *args):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_synthetic(sizes, legacy_limit, repeat):
+    arrays_header = f"{'arrays':>10}{'us/room':>10}" if NUMPY_AVAILABLE else ""
+    print(f"{'Rooms':>7}{'Exits':>8}{'prepare_zone':>15}{'us/room':>10}{arrays_header}{'legacy scan':>14}{'us/room':>10}")
+    for size in sizes:
+        graph, rooms, by_id = make_grid_zone(size)
+        fast = best_of(repeat, prepare_zone, graph, rooms, 1)
+        line = f"{size:>7}{graph.edge_count:>8}{fast * 1000:>13.1f}ms{fast / size * 1e6:>10.2f}"
+        if NUMPY_AVAILABLE:
+            arrays = best_of(repeat, prepare_zone_arrays, ZoneGeometry(graph, by_id), 1)
+            line += f"{arrays * 1000:>8.1f}ms{arrays / size * 1e6:>10.2f}"
+        if size <= legacy_limit:
+            slow = best_of(1, legacy_prepare, graph, rooms, 1)
+            line += f"{slow * 1000:>12.1f}ms{slow / size * 1e6:>10.2f}"
+        print(line)
+
+
+def run_world(repeat):
+    from core.fast_database import get_database
+    db = get_database()
+    graph = db.get_graph()
+    geometry = db.get_zone_geometry()
+    zones = sorted(db.data["zone_rooms"].items(), key=lambda item: len(item[1]), reverse=True)
+    arrays_header = f"{'arrays':>10}{'us/room':>10}" if geometry is not None else ""
+    print(f"\n{'Zone':<32}{'Rooms':>7}{'prepare_zone':>15}{'us/room':>10}{arrays_header}")
+    for zone_key, room_ids in zones[:15]:
+        zone_id = int(zone_key)
+        rooms = db.get_rooms_in_zone(zone_id, z_level=0)
+        if not rooms:
+            continue
+        elapsed = best_of(repeat, prepare_zone, graph, rooms, zone_id)
+        name = (db.get_zone_name(zone_id) or str(zone_id))[:30]
+        line = f"{name:<32}{len(rooms):>7}{elapsed * 1000:>13.1f}ms{elapsed / len(rooms) * 1e6:>10.2f}"
+        if geometry is not None:
+            arrays = best_of(repeat, prepare_zone_arrays, geometry, zone_id)
+            line += f"{arrays * 1000:>8.1f}ms{arrays / len(rooms) * 1e6:>10.2f}"
+        print(line)
+
+
+def run_headless(worst, budget_ms=None):
+    """Render every zone level headlessly, report items and times, return False if over budget"""
+    from core.fast_database import get_database
+    from map.render_backend import RecordingBackend, HeadlessViewer
+    from map.render_cache import ZoneRenderCache
+    db = get_database()
+    # Without customizations, so runs on different machines compare
+    render_cache = ZoneRenderCache(db, SimpleNamespace(get=lambda room_id: None))
+    backend = RecordingBackend()
+    viewer = HeadlessViewer(backend)
+    pool_counter = viewer.item_pool.counter
+    hits_before = pool_counter.hits
+
+    results = []
+    start_all = time.perf_counter()
+    for zone_id, zone_name in sorted(db.get_all_zones()):
+        levels = sorted({z or 0 for _, _, _, z, _ in db.get_rooms_in_zone(zone_id)})
+        for level in levels:
+            start = time.perf_counter()
+            model = render_cache.build(zone_id, level)
+            prepared = time.perf_counter()
+            if not model.rooms:
+                continue
+            created_before = sum(backend.created.values())
+            viewer.render(model)                      # fitted, as display_zone shows a new zone
+            fitted = time.perf_counter()
+            fit_items = backend.visible_count()
+            viewer.render(model, zoom=1.0)            # full detail around the center
+            full = time.perf_counter()
+            results.append({
+                'zone': f"{zone_name[:26]} ({zone_id})" + (f" L{level}" if level else ""),
+                'rooms': len(model.rooms),
+                'prepare_ms': (prepared - start) * 1000,
+                'fit_ms': (fitted - prepared) * 1000,
+                'full_ms': (full - fitted) * 1000,
+                'fit_items': fit_items,
+                'full_items': backend.visible_count(),
+                'created': sum(backend.created.values()) - created_before,
+            })
+    elapsed = time.perf_counter() - start_all
+    if not results:
+        print("No zones with rooms found")
+        return True
+
+    for result in results:
+        result['total_ms'] = result['prepare_ms'] + result['fit_ms'] + result['full_ms']
+    header = (f"{'Zone':<36}{'Rooms':>7}{'prepare':>10}{'fitted':>10}{'items':>7}"
+              f"{'full':>10}{'items':>7}{'created':>9}")
+    print(f"\nWorst {min(worst, len(results))} of {len(results)} zone levels (headless):")
+    print(header)
+    for result in sorted(results, key=lambda r: r['total_ms'], reverse=True)[:worst]:
+        print(f"{result['zone']:<36}{result['rooms']:>7}{result['prepare_ms']:>8.1f}ms{result['fit_ms']:>8.1f}ms"
+              f"{result['fit_items']:>7}{result['full_ms']:>8.1f}ms{result['full_items']:>7}{result['created']:>9}")
+
+    totals = {key: sum(r[key] for r in results) for key in ('rooms', 'prepare_ms', 'fit_ms', 'full_ms', 'created')}
+    print(f"\n{len(results)} zone levels, {totals['rooms']} rooms in {elapsed:.2f}s: "
+          f"prepare {totals['prepare_ms']:.0f}ms, fitted {totals['fit_ms']:.0f}ms, full {totals['full_ms']:.0f}ms, "
+          f"{totals['created']} items created, {pool_counter.hits - hits_before} reused from the pool")
+    print("Canvas calls: " + ", ".join(f"{name} {count}" for name, count in backend.calls.most_common()))
+
+    if budget_ms is not None:
+        over = [r for r in results if r['total_ms'] > budget_ms]
+        if over:
+            print(f"FAIL: {len(over)} zone levels over the {budget_ms:g}ms budget")
+            return False
+        print(f"OK: every zone level within {budget_ms:g}ms")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Zone render preparation benchmark')
+    parser.add_argument('--sizes', default='250,500,1000,2000,4000,8000',
+                        help='Comma separated synthetic zone sizes')
+    parser.add_argument('--legacy-limit', type=int, default=2000,
+                        help='Largest zone to run the quadratic legacy scan on')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best is kept)')
+    parser.add_argument('--world', action='store_true', help='Also time the zones of the world database')
+    parser.add_argument('--headless', action='store_true',
+                        help='Render every zone level of the world without a display')
+    parser.add_argument('--worst', type=int, default=15, help='Zones listed by --headless')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Fail (exit code 1) if a zone level takes longer with --headless')
+    args = parser.parse_args()
+
+    run_synthetic([int(s) for s in args.sizes.split(',')], args.legacy_limit, args.repeat)
+    if args.world:
+        run_world(args.repeat)
+    if args.headless and not run_headless(args.worst, args.budget_ms):
+        sys.exit(1)
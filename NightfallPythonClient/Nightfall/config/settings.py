@@ -8,8 +8,11 @@ def save_config(settings):
     config = ConfigParser()
     config.read_dict(settings)
     os.makedirs(os.path.dirname(config_file_path), exist_ok=True)
-    with open(config_file_path, 'w') as configfile:
+    # Write a temporary file and swap it in, a crash never leaves half a settings.ini
+    tmp_path = config_file_path + '.tmp'
+    with open(tmp_path, 'w') as configfile:
         config.write(configfile)
+    os.replace(tmp_path, config_file_path)
 
 def load_config():
     config = ConfigParser()
@@ -42,6 +45,12 @@ def load_config():
                 'commands': 'l,look,n,w,s,e,ne,nw,se,sw,northwest,northeast,southeast,southwest,north,west,east,south,up,down,u,d,enter,leave',
                 'RoomReload': 'look'
             },
+            'Pathfinding': {
+                'StepCost': '1',
+                'CommandExitCost': '3',
+                'ZoneChangeCost': '2',
+                'AvoidRoomCost': '25'
+            },
             'Network': {
                 'host': 'nightfall.org',
                 'port': '4242',
@@ -0,0 +1,78 @@
+# counters.py - Named cache counters and timing histograms, reported by the profiler
+from bisect import bisect_left
+
+_counters = {}
+_histograms = {}
+
+# Upper bounds (ms) of the histogram buckets, a last bucket takes everything slower
+HISTOGRAM_BUCKETS_MS = (4, 8, 16, 33, 50, 100, 250)
+
+
+class CacheCounter:
+    """Hit/miss/eviction/invalidation counts of one cache"""
+
+    def __init__(self, name):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'invalidations': self.invalidations, 'hit_rate': round(self.hit_rate, 3)}
+
+
+def get_counter(name):
+    """Get (or create) the counter registered under name"""
+    counter = _counters.get(name)
+    if counter is None:
+        counter = _counters[name] = CacheCounter(name)
+    return counter
+
+
+def snapshot():
+    """{name: counts} of all registered counters"""
+    return {name: counter.as_dict() for name, counter in sorted(_counters.items())}
+
+
+class TimeHistogram:
+    """Durations in ms sorted into HISTOGRAM_BUCKETS_MS, plus frames skipped by a frame loop"""
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.skipped = 0
+
+    def add(self, ms):
+        self.counts[bisect_left(HISTOGRAM_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self):
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}ms"]
+        return {'count': self.count, 'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+                'max_ms': round(self.max_ms, 2), 'skipped': self.skipped,
+                'buckets': dict(zip(labels, self.counts))}
+
+
+def get_histogram(name):
+    """Get (or create) the timing histogram registered under name"""
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = TimeHistogram(name)
+    return histogram
+
+
+def histogram_snapshot():
+    """{name: buckets} of all registered timing histograms"""
+    return {name: histogram.as_dict() for name, histogram in sorted(_histograms.items())}
@@ -0,0 +1,212 @@
+# description_search.py - Word index over room descriptions, searched on a worker and delivered in ranked pages
+import bisect
+import re
+import threading
+from core.landmarks import UNREACHABLE, bfs_steps
+
+# Results per delivered page
+PAGE_SIZE = 100
+# Candidates checked between two looks at the cancel flag
+CHECK_CHUNK = 2000
+# Characters of the description shown with a result
+PREVIEW_LENGTH = 100
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Lowercase with whitespace runs (wrapped lines) folded to single spaces"""
+    return ' '.join(text.lower().split())
+
+
+class DescriptionIndex:
+    """
+    Room descriptions indexed by word: the room ids per word, plus the sorted
+    vocabulary so the partial words at the ends of a query are looked up by
+    prefix or suffix. A search only checks the rooms every query word can be
+    in instead of every description. Built on a background thread and again
+    after the room graph changed; until then searches scan all descriptions.
+    Also keeps the step counts from the player's room, so searches typed from
+    the same room share one breadth-first search.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.texts = {}       # room id -> normalized description
+        self.postings = {}    # word -> set of room ids
+        self.vocabulary = []  # sorted words
+        self.distances = None  # (graph, room id, steps per room index)
+        self._ready = threading.Event()
+        db.add_graph_listener(self.invalidate)
+
+    def start(self):
+        """Build the index on a background thread"""
+        self._ready.clear()
+        threading.Thread(target=self._build, daemon=True).start()
+
+    def invalidate(self):
+        self.start()
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def _build(self):
+        try:
+            texts, postings = {}, {}
+            for room_id, description in list(self.db.data["descriptions_index"]):
+                if not description:
+                    continue
+                room_id = int(room_id)
+                text = normalize(description)
+                texts[room_id] = text
+                for word in set(WORD.findall(text)):
+                    postings.setdefault(word, set()).add(room_id)
+            # Swap in all at once, running searches keep the old index
+            self.texts, self.postings, self.vocabulary = texts, postings, sorted(postings)
+            self._ready.set()
+            print(f"[SEARCH] Indexed {len(postings)} words of {len(texts)} room descriptions")
+        except Exception as e:
+            print(f"[SEARCH] Description index build failed: {e}")
+
+    def steps_from(self, room_id):
+        """{room id: steps} lookup from a room as (index_of, steps), None if the room is unknown"""
+        graph = self.db.get_graph()
+        cached = self.distances
+        if cached and cached[0] is graph and cached[1] == room_id:
+            return graph.index_of, cached[2]
+        source = graph.index_of.get(room_id)
+        if source is None:
+            return None
+        steps = bfs_steps(len(graph), graph.offsets, graph.targets, source)
+        self.distances = (graph, room_id, steps)
+        return graph.index_of, steps
+
+    # === CANDIDATES ===
+
+    def _words_with_prefix(self, prefix):
+        vocabulary = self.vocabulary
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + '\uffff')
+        return vocabulary[start:end]
+
+    def _rooms_with(self, words):
+        rooms = set()
+        for word in words:
+            rooms.update(self.postings[word])
+        return rooms
+
+    def candidates(self, query):
+        """Room ids whose description can contain the (normalized) query"""
+        tokens = WORD.findall(query)
+        if not self.is_ready() or not tokens:
+            return list(self.texts) if self.is_ready() else None
+        postings = self.postings
+        # The query may start and end inside a word, the words between are whole
+        whole = tokens[1:-1]
+        if any(word not in postings for word in whole):
+            return []
+        sets = [postings[word] for word in whole]
+        if len(tokens) == 1:
+            sets.append(self._rooms_with(word for word in self.vocabulary if tokens[0] in word))
+        else:
+            sets.append(self._rooms_with(self._words_with_prefix(tokens[-1])))
+            if query[0].isalnum() or query[0] == '_':
+                sets.append(self._rooms_with(word for word in self.vocabulary if word.endswith(tokens[0])))
+            else:
+                sets.append(postings.get(tokens[0], set()))
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+
+class DescriptionSearch:
+    """
+    One description search, run on a worker thread.
+    Matches are ranked by relevance (query in the room name, whole-word
+    match, any match) and then by steps from the player's room. The ranked
+    results are appended to `pages` page by page and `done` is set at the
+    end; the UI thread drains pages as they arrive.
+    cancel() stops the worker at its next check (the query changed).
+    """
+
+    def __init__(self, index, query, origin=None):
+        self.index = index
+        self.query = normalize(query)
+        self.origin = int(origin) if origin else None
+        self.pages = []       # lists of (room_id, name, zone_name, preview, (steps, steps) or None)
+        self.total = 0
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _run(self):
+        try:
+            self._search()
+        except Exception as e:
+            print(f"[SEARCH] Description search failed: {e}")
+        finally:
+            self.done.set()
+
+    def _search(self):
+        query = self.query
+        if not query:
+            return
+        index = self.index
+        db = index.db
+        candidates = index.candidates(query)
+        if candidates is None:
+            # Index still building: scan the descriptions like before
+            texts = {int(room_id): normalize(description)
+                     for room_id, description in list(db.data["descriptions_index"]) if description}
+            candidates = list(texts)
+        else:
+            texts = index.texts
+        # A one-word query matches a whole word exactly when the word is indexed for the room
+        whole_word = index.postings.get(query, ()) if index.is_ready() and WORD.fullmatch(query) else None
+        boundary = re.compile(r"(?<!\w)" + re.escape(query) + r"(?!\w)")
+        distances = index.steps_from(self.origin) if self.origin else None
+        index_of, steps = distances if distances else ({}, ())
+
+        ranked = []
+        candidates = list(candidates)
+        for start in range(0, len(candidates), CHECK_CHUNK):
+            if self.cancelled:
+                return
+            for room_id in candidates[start:start + CHECK_CHUNK]:
+                text = texts.get(room_id)
+                if text is None or query not in text:
+                    continue
+                room = db.get_room(room_id)
+                if not room:
+                    continue
+                if whole_word is not None:
+                    relevance = 2 if room_id in whole_word else 1
+                else:
+                    relevance = 2 if boundary.search(text) else 1
+                if query in room.get("name", "").lower():
+                    relevance += 1
+                idx = index_of.get(room_id)
+                distance = steps[idx] if idx is not None else UNREACHABLE
+                ranked.append((-relevance, distance, room_id, room))
+
+        if self.cancelled:
+            return
+        ranked.sort(key=lambda entry: entry[:3])
+        self.total = len(ranked)
+
+        for start in range(0, len(ranked), PAGE_SIZE):
+            if self.cancelled:
+                return
+            page = []
+            for _, distance, room_id, room in ranked[start:start + PAGE_SIZE]:
+                zone_id = room.get("zone_id")
+                zone_name = db.get_zone_name(zone_id) if zone_id else "Unknown Zone"
+                description = room.get("description") or texts.get(room_id, "")
+                page.append((room_id, room.get("name", "Unknown"), zone_name, description[:PREVIEW_LENGTH],
+                             (distance, distance) if distance != UNREACHABLE else None))
+            self.pages.append(page)
@@ -1,10 +1,13 @@
 # fast_database.py - Optimized JSON-based database for lightning-fast operations
+import hashlib
 import json
 import os
 import logging
 import time
 from functools import lru_cache
 import Levenshtein
+from core.room_graph import RoomGraph
+from core.zone_geometry import ZoneGeometry, NUMPY_AVAILABLE
 
 class FastDatabase:
     """
@@ -12,10 +15,15 @@ class FastDatabase:
     Everything is kept in memory for instant access.
     """
     
-    def __init__(self):
+    def __init__(self, json_file=None):
         self.data = None
+        self.graph = None
+        self.exit_records = {}  # Exit lists as in the world file, saved back unchanged
+        self.zone_geometry = None  # ZoneGeometry of the graph, None without NumPy
+        self.graph_listeners = []
+        self.world_hash = None  # ((mtime, size), sha1) of the world file
         self.loaded = False
-        self.json_file = os.path.join(os.path.dirname(__file__), '../data/nightfall_world.json')
+        self.json_file = json_file or os.path.join(os.path.dirname(__file__), '../data/nightfall_world.json')
         self.load_database()
     
     def load_database(self):
@@ -32,12 +40,14 @@ class FastDatabase:
                 "names_index": [],
                 "zone_rooms": {}
             }
+            self.build_graph()
             return False
         
         try:
             start = time.time()
             with open(self.json_file, 'r', encoding='utf-8') as f:
                 self.data = json.load(f)
+            self.build_graph()
             self.loaded = True
             load_time = time.time() - start
             logging.info(f"Database loaded in {load_time:.3f} seconds")
@@ -52,8 +62,56 @@ class FastDatabase:
                 "names_index": [],
                 "zone_rooms": {}
             }
+            self.build_graph()
             return False
     
+    def build_graph(self):
+        """
+        Compile the exit lists into the CSR RoomGraph.
+        data["exits"] moves to exit_records, which keep what the graph drops
+        (exits to unknown rooms, the exact fields) and are written back on save.
+        """
+        start = time.time()
+        if "exits" in self.data:
+            self.exit_records = self.data.pop("exits")
+        self.graph = RoomGraph(self.data["rooms"], self.exit_records)
+        if NUMPY_AVAILABLE:
+            self.zone_geometry = ZoneGeometry(self.graph, self.data["rooms"])
+        logging.info(f"Exit graph built in {time.time() - start:.3f} seconds: "
+                     f"{len(self.graph)} rooms, {self.graph.edge_count} exits, "
+                     f"{self.graph.memory_bytes() / 1024:.0f} KB")
+        for listener in self.graph_listeners:
+            listener()
+    
+    def get_graph(self):
+        """Get the CSR exit graph shared by pathfinding, tracking and rendering"""
+        return self.graph
+
+    def get_zone_geometry(self):
+        """Room positions of the current graph as NumPy arrays per zone level, None without NumPy"""
+        return self.zone_geometry
+
+    def add_graph_listener(self, callback):
+        """Call callback() whenever the exit graph is rebuilt (room deleted, map edited)"""
+        self.graph_listeners.append(callback)
+
+    def world_file_hash(self):
+        """SHA-1 hex digest of the world file, None without one (keys the disk caches)"""
+        try:
+            stat = os.stat(self.json_file)
+        except OSError:
+            return None
+        version = (stat.st_mtime, stat.st_size)
+        cached = self.world_hash
+        if cached and cached[0] == version:
+            return cached[1]
+        sha = hashlib.sha1()
+        with open(self.json_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        self.world_hash = (version, sha.hexdigest())
+        return self.world_hash[1]
+    
     # === ROOM OPERATIONS (instant) ===
     
     def get_room(self, room_id):
@@ -135,18 +193,19 @@ class FastDatabase:
     
     def get_exits_from_room(self, room_id):
         """Get all exits from a room instantly"""
-        return self.data["exits"].get(str(room_id), [])
+        return self.graph.exits_from(room_id)
     
     def get_exits_with_zone_info(self, from_room_ids):
         """Get exits with zone information instantly"""
+        graph = self.graph
+        room_ids = graph.room_ids
         results = []
         for from_id in from_room_ids:
-            exits = self.get_exits_from_room(from_id)
-            for exit_info in exits:
-                to_id = exit_info["to"]
-                to_room = self.get_room(to_id)
-                if to_room:
-                    results.append((from_id, to_id, to_room["zone_id"]))
+            idx = graph.index_of.get(int(from_id))
+            if idx is None:
+                continue
+            for to_idx in graph.neighbours(idx):
+                results.append((from_id, room_ids[to_idx], graph.zone(to_idx)))
         return results
     
     # === SEARCH OPERATIONS (optimized) ===
@@ -221,7 +280,7 @@ class FastDatabase:
         return {
             "rooms": len(self.data["rooms"]),
             "zones": len(self.data["zones"]),
-            "exits": sum(len(exits) for exits in self.data["exits"].values()),
+            "exits": self.graph.edge_count,
             "descriptions": len(self.data["descriptions_index"]),
             "loaded": self.loaded
         }
@@ -230,57 +289,83 @@ class FastDatabase:
         """Delete a room from the database"""
         try:
             room_id_str = str(room_id)
+            room_id_int = int(room_id)
             
             # Check if room exists
             if room_id_str not in self.data["rooms"]:
                 return False
             
             # Delete the room
-            del self.data["rooms"][room_id_str]
+            room = self.data["rooms"].pop(room_id_str)
             
-            # Delete exits from this room
-            if room_id_str in self.data["exits"]:
-                del self.data["exits"][room_id_str]
+            # Delete exits from and to this room (other records stay exactly as loaded)
+            exits = dict(self.exit_records)
+            exits.pop(room_id_str, None)
+            for from_room, room_exits in list(exits.items()):
+                if any(int(e["to"]) == room_id_int for e in room_exits):
+                    kept = [e for e in room_exits if int(e["to"]) != room_id_int]
+                    if kept:
+                        exits[from_room] = kept
+                    else:
+                        del exits[from_room]
             
-            # Delete exits TO this room from other rooms
-            for from_room, exits in list(self.data["exits"].items()):
-                # Remove any exits that lead to the deleted room
-                self.data["exits"][from_room] = {
-                    direction: to_room 
-                    for direction, to_room in exits.items() 
-                    if str(to_room) != room_id_str
-                }
-                # Clean up empty exit dicts
-                if not self.data["exits"][from_room]:
-                    del self.data["exits"][from_room]
+            # Keep per-room exit copies in sync
+            for other in self.data["rooms"].values():
+                if other.get("exits"):
+                    other["exits"] = [e for e in other["exits"] if int(e.get("to", -1)) != room_id_int]
+                if other.get("connected_rooms"):
+                    other["connected_rooms"] = [r for r in other["connected_rooms"] if int(r) != room_id_int]
             
             # Remove from zone rooms list
-            for zone_id, zone_data in self.data["zones"].items():
-                if "rooms" in zone_data and room_id_str in zone_data["rooms"]:
-                    zone_data["rooms"].remove(room_id_str)
+            zone_key = str(room.get("zone_id"))
+            if zone_key in self.data["zone_rooms"]:
+                self.data["zone_rooms"][zone_key] = [r for r in self.data["zone_rooms"][zone_key]
+                                                     if int(r) != room_id_int]
+            
+            # Remove from search indexes
+            self.data["descriptions_index"] = [entry for entry in self.data["descriptions_index"]
+                                               if int(entry[0]) != room_id_int]
+            self.data["names_index"] = [entry for entry in self.data["names_index"]
+                                        if int(entry[0]) != room_id_int]
+            self.find_room_by_description.cache_clear()
             
-            # Remove from descriptions index if present
-            if room_id_str in self.data["descriptions_index"]:
-                desc = self.data["descriptions_index"][room_id_str]
-                if desc in self.data["descriptions"]:
-                    rooms_with_desc = self.data["descriptions"][desc]
-                    if room_id_str in rooms_with_desc:
-                        rooms_with_desc.remove(room_id_str)
-                    # Clean up empty description lists
-                    if not rooms_with_desc:
-                        del self.data["descriptions"][desc]
-                del self.data["descriptions_index"][room_id_str]
+            # Save first: the graph rebuild notifies listeners that key caches by the file's hash
+            self.data["exits"] = exits
+            try:
+                self.save_database()
+            except Exception as e:
+                print(f"Error saving after deleting room {room_id}: {e}")
+                # The file is untouched, go back to it
+                self.load_database()
+                return False
             
-            # Save changes back to file
-            import json
-            with open(self.db_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            # Rebuild the exit graph without the room
+            self.build_graph()
             
             return True
             
         except Exception as e:
             print(f"Error deleting room {room_id}: {e}")
             return False
+    
+    def save_database(self):
+        """
+        Write the database back to the JSON file. Exits come from data["exits"]
+        when a change is waiting for its graph rebuild, else from exit_records.
+        """
+        data = dict(self.data)
+        if "exits" not in data:
+            data["exits"] = self.exit_records
+        # Write a temporary file and swap it in, a crash never leaves half a world file
+        tmp_path = self.json_file + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.json_file)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
 # Global instance for easy access
 _db_instance = None
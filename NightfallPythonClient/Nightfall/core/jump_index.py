@@ -0,0 +1,170 @@
+# jump_index.py - Fuzzy index of zone names, room names and room ids for the jump palette
+import heapq
+import threading
+
+# Results returned per query
+MAX_RESULTS = 30
+# Share of the query's trigrams a name needs to be a candidate at all
+MIN_TRIGRAM_SHARE = 0.5
+# Names scored at most when a query has typos (keeps a keystroke well under a frame)
+MAX_FUZZY_CANDIDATES = 4000
+
+
+def trigrams(text, typing=False):
+    """
+    Trigrams of a lowercase text, each word padded in front so word starts
+    get their own trigrams. A text being typed gets no end padding: its last
+    word is still a prefix.
+    """
+    padded = f"  {' '.join(text.split())}" + ('' if typing else ' ')
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class JumpIndex:
+    """
+    Zone and room names for the jump palette, searched per keystroke.
+    Names are indexed once by trigram (rooms sharing a name share one entry),
+    numbered zones first and then by length so lower numbers rank higher.
+    A query first intersects the posting sets of its trigrams: names holding
+    all of them, whole-name prefixes first. Only when that finds too few does
+    it score the names listed under the query's rarest trigrams by shared
+    trigrams (typos, swapped letters). All-digit queries also match room ids.
+    Built on a background thread and again after the room graph changed.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.names = []      # name index -> lowercase name
+        self.labels = []     # name index -> name as shown
+        self.members = []    # name index -> [(kind, id)] with kind 'zone' or 'room'
+        self.name_trigrams = []
+        self.postings = {}   # trigram -> set of name indices
+        self.room_zone = {}  # room id -> zone id
+        self._ready = threading.Event()
+        db.add_graph_listener(self.invalidate)
+
+    def start(self):
+        """Build the index on a background thread"""
+        self._ready.clear()
+        threading.Thread(target=self._build, daemon=True).start()
+
+    def invalidate(self):
+        self.start()
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def _build(self):
+        try:
+            entries = {}  # lowercase name -> [label, members]
+
+            def add(label, kind, item_id):
+                key = ' '.join(label.lower().split())
+                if key:
+                    entries.setdefault(key, [label.strip(), []])[1].append((kind, item_id))
+
+            for zone_id, zone_name in self.db.get_all_zones():
+                add(zone_name or '', 'zone', zone_id)
+            room_zone = {}
+            for room in self.db.get_all_rooms().values():
+                room_zone[room['id']] = room.get('zone_id')
+                add(room.get('name') or '', 'room', room['id'])
+
+            # Zones first, then shorter names: the index order is the tie break
+            order = sorted(entries, key=lambda key: (entries[key][1][0][0] != 'zone', len(key), key))
+            names = order
+            labels = [entries[key][0] for key in order]
+            # Zones before rooms of the same name
+            members = [sorted(entries[key][1], key=lambda member: member[0] != 'zone') for key in order]
+
+            name_trigrams = [trigrams(name) for name in names]
+            postings = {}
+            for index, grams in enumerate(name_trigrams):
+                for gram in grams:
+                    postings.setdefault(gram, set()).add(index)
+
+            # Swap in all at once, searches keep using the old index meanwhile
+            self.names, self.labels, self.members = names, labels, members
+            self.name_trigrams, self.postings = name_trigrams, postings
+            self.room_zone = room_zone
+            self._ready.set()
+            print(f"[JUMP] Indexed {len(names)} names of {len(room_zone)} rooms")
+        except Exception as e:
+            print(f"[JUMP] Index build failed: {e}")
+
+    # === SEARCH ===
+
+    def search(self, query, limit=MAX_RESULTS):
+        """[(kind, id, label, zone id)] best matches first, kind 'zone' or 'room'"""
+        query = ' '.join(query.lower().split())
+        if not query:
+            return []
+        results = []
+        seen = set()
+        if query.isdigit() and int(query) in self.room_zone:
+            room_id = int(query)
+            results.append(('room', room_id, self._room_label(room_id), self.room_zone[room_id]))
+            seen.add(('room', room_id))
+
+        for index in self._matches(query, limit):
+            for kind, item_id in self.members[index]:
+                if (kind, item_id) in seen:
+                    continue
+                zone_id = item_id if kind == 'zone' else self.room_zone.get(item_id)
+                results.append((kind, item_id, self.labels[index], zone_id))
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _matches(self, query, limit):
+        """Name indices for a query, best first"""
+        names = self.names
+        postings = self.postings
+        grams = sorted(trigrams(query, typing=True), key=lambda gram: len(postings.get(gram, ())))
+        if not postings.get(grams[0]):
+            found = []
+        else:
+            found = sorted(postings[grams[0]].intersection(*(postings[gram] for gram in grams[1:]))
+                           if all(gram in postings for gram in grams) else ())
+
+        prefixed, others = [], []
+        for index in found:
+            if names[index].startswith(query):
+                prefixed.append(index)
+                if len(prefixed) >= limit:
+                    break
+            elif len(others) < limit:
+                others.append(index)
+        best = (prefixed + others)[:limit]
+        if len(best) >= limit:
+            return best
+
+        # Too few names hold the whole query: rank names sharing most of its trigrams.
+        # A name sharing `needed` trigrams is listed under one of any len - needed + 1
+        # of them, so take the rarest until that covers MIN_TRIGRAM_SHARE or the
+        # candidates get too many (then only closer names are looked for)
+        needed = max(1, int(len(grams) * MIN_TRIGRAM_SHARE + 0.999))
+        listed = [gram for gram in grams if postings.get(gram)]  # trigrams some name has
+        candidates = set()
+        used = 0
+        for gram in listed[:len(listed) - needed + 1]:
+            posting = postings[gram]
+            if used and len(candidates) + len(posting) > MAX_FUZZY_CANDIDATES:
+                break
+            candidates.update(posting)
+            used += 1
+        needed = max(needed, len(listed) - used + 1)
+        candidates.difference_update(found)
+        query_grams = set(grams)
+        name_trigrams = self.name_trigrams
+        scored = []
+        for index in candidates:
+            shared = len(query_grams & name_trigrams[index])
+            if shared >= needed:
+                scored.append((-shared, index))
+        best.extend(index for _, index in heapq.nsmallest(limit - len(best), scored))
+        return best
+
+    def _room_label(self, room_id):
+        room = self.db.get_room(room_id)
+        return room.get('name', 'Unknown') if room else 'Unknown'
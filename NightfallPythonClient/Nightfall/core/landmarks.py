@@ -0,0 +1,248 @@
+# landmarks.py - Landmark (ALT) step distances for instant route-length estimates
+import json
+import os
+import threading
+import time
+from array import array
+from collections import deque
+
+UNREACHABLE = 0xFFFF
+CACHE_VERSION = 1
+
+
+def bfs_steps(n, offsets, targets, source):
+    """Hop counts from source to every room index (UNREACHABLE if none)"""
+    steps = array('H', [UNREACHABLE]) * n
+    steps[source] = 0
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        next_steps = min(steps[node] + 1, UNREACHABLE - 1)
+        for i in range(offsets[node], offsets[node + 1]):
+            to_idx = targets[i]
+            if steps[to_idx] == UNREACHABLE:
+                steps[to_idx] = next_steps
+                queue.append(to_idx)
+    return steps
+
+
+def compute_landmark_tables(n, offsets, targets, rev_offsets, rev_sources, seed, count):
+    """
+    Pick landmarks by farthest-point selection starting at seed and compute
+    forward (landmark -> room) and backward (room -> landmark) step tables.
+    """
+    landmarks, forward, backward = [], [], []
+    nearest = None  # per room: steps from the closest landmark so far
+    landmark = seed
+
+    while landmark is not None and len(landmarks) < count:
+        fwd = bfs_steps(n, offsets, targets, landmark)
+        bwd = bfs_steps(n, rev_offsets, rev_sources, landmark)
+        landmarks.append(landmark)
+        forward.append(fwd)
+        backward.append(bwd)
+
+        # Next landmark: the reachable room farthest from all chosen ones
+        nearest = fwd if nearest is None else array('H', map(min, nearest, fwd))
+        best, landmark = 0, None
+        for idx, steps in enumerate(nearest):
+            if steps != UNREACHABLE and steps > best:
+                best, landmark = steps, idx
+
+    return landmarks, forward, backward
+
+
+class LandmarkIndex:
+    """
+    Step distances from and to a handful of landmark rooms (ALT).
+    The first landmark is the busiest room of the home zone (Nightfall City),
+    the others are spread out by farthest-point selection. Tables are uint16
+    per room and landmark, computed once on a background thread after the
+    database is loaded and cached on disk keyed by the world file's hash.
+    """
+
+    def __init__(self, db, count=8, home_zone=None):
+        self.db = db
+        self.count = count
+        self.home_zone = home_zone
+        # (graph, landmarks, forward, backward) published together; forward holds the
+        # steps landmark -> room and backward room -> landmark, per landmark
+        self.tables = (None, [], [], [])
+        self.cache_dir = os.path.join(os.path.dirname(__file__), '../data/cache')
+        self.lock = threading.Lock()
+        self.generation = 0  # bumped by every start, only the latest computation publishes
+        self._ready = threading.Event()
+        self._thread = None
+        db.add_graph_listener(self.invalidate)
+
+    @property
+    def graph(self):
+        return self.tables[0]
+
+    @property
+    def landmarks(self):
+        return self.tables[1]
+
+    def tables_for(self, graph):
+        """(forward, backward) tables if they were computed for graph, else None"""
+        tables = self.tables
+        if not self._ready.is_set() or tables[0] is not graph:
+            return None
+        return tables[2], tables[3]
+
+    # === BACKGROUND PRECOMPUTATION ===
+
+    def start(self):
+        """Load or compute the tables on a background thread"""
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self._ready.clear()
+        self._thread = threading.Thread(target=self._prepare, args=(generation,), daemon=True)
+        self._thread.start()
+
+    def invalidate(self):
+        """The room graph changed - recompute for the new graph"""
+        self.start()
+
+    def is_ready(self):
+        """True when tables exist for the database's current graph"""
+        return self.tables_for(self.db.get_graph()) is not None
+
+    def _prepare(self, generation):
+        graph = self.db.get_graph()
+        if not len(graph):
+            return
+        start = time.time()
+        cache_file = self._cache_file()
+
+        tables = self._load_cache(cache_file, graph) if cache_file else None
+        if tables is None:
+            tables = self._compute(graph)
+            # Tables of a graph that changed meanwhile are not worth caching
+            if cache_file and generation == self.generation:
+                self._save_cache(cache_file, tables)
+
+        with self.lock:
+            if generation != self.generation:
+                return  # The graph changed meanwhile, a newer computation publishes
+            self.tables = (graph,) + tables
+            self._ready.set()
+        print(f"[LANDMARKS] {len(tables[0])} landmarks ready in {time.time() - start:.2f}s")
+
+    def _seed_room(self, graph):
+        """The room with the most exits in the home zone"""
+        best, best_degree = 0, -1
+        for idx in range(len(graph)):
+            if self.home_zone is not None and graph.zone(idx) != self.home_zone:
+                continue
+            degree = graph.offsets[idx + 1] - graph.offsets[idx]
+            if degree > best_degree:
+                best, best_degree = idx, degree
+        return best
+
+    def _compute(self, graph):
+        """(landmarks, forward, backward) for a graph"""
+        # Reverse search walks incoming edges: source room of each reverse entry
+        rev_sources = array('i', (graph.edge_source[e] for e in graph.rev_edges))
+        return compute_landmark_tables(
+            len(graph), graph.offsets, graph.targets, graph.rev_offsets, rev_sources,
+            self._seed_room(graph), self.count)
+
+    @staticmethod
+    def _table(data):
+        table = array('H')
+        table.frombytes(data)
+        return table
+
+    # === DISK CACHE ===
+
+    def _cache_file(self):
+        """Cache file name derived from the world file's SHA-1, None without a world file"""
+        world_hash = self.db.world_file_hash()
+        if world_hash is None:
+            return None
+        return os.path.join(self.cache_dir, f"landmarks_{world_hash}_{self.count}.bin")
+
+    def _load_cache(self, cache_file, graph):
+        """(landmarks, forward, backward) from the cache file, None if missing or not matching"""
+        try:
+            if not os.path.exists(cache_file):
+                return None
+            with open(cache_file, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('version') != CACHE_VERSION or header.get('rooms') != len(graph):
+                    return None
+                size = 2 * len(graph)
+                landmarks = header['landmarks']
+                forward = [self._table(f.read(size)) for _ in landmarks]
+                backward = [self._table(f.read(size)) for _ in landmarks]
+            return landmarks, forward, backward
+        except Exception as e:
+            print(f"[LANDMARKS] Could not load cache: {e}")
+            return None
+
+    def _save_cache(self, cache_file, tables):
+        landmarks, forward, backward = tables
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            header = {'version': CACHE_VERSION, 'rooms': len(forward[0]) if forward else 0,
+                      'landmarks': landmarks}
+            tmp_file = cache_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                for table in forward + backward:
+                    f.write(table.tobytes())
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"[LANDMARKS] Could not save cache: {e}")
+
+    # === QUERIES ===
+
+    def lower_bound(self, u, v, tables=None):
+        """Admissible lower bound on the steps from room index u to v (tables from tables_for)"""
+        forward, backward = tables or self.tables[2:]
+        best = 0
+        for fwd, bwd in zip(forward, backward):
+            a, b = fwd[u], fwd[v]        # landmark -> u, landmark -> v
+            if a != UNREACHABLE and b != UNREACHABLE and b - a > best:
+                best = b - a
+            a, b = bwd[u], bwd[v]        # u -> landmark, v -> landmark
+            if a != UNREACHABLE and b != UNREACHABLE and a - b > best:
+                best = a - b
+        return best
+
+    def upper_bound(self, u, v, tables=None):
+        """Steps of the best detour u -> landmark -> v, None if no landmark connects them"""
+        forward, backward = tables or self.tables[2:]
+        best = None
+        for fwd, bwd in zip(forward, backward):
+            a, b = bwd[u], fwd[v]
+            if a != UNREACHABLE and b != UNREACHABLE and (best is None or a + b < best):
+                best = a + b
+        return best
+
+    def estimate_steps(self, from_room, to_room):
+        """(min, max) steps between two room ids, None if unknown"""
+        graph = self.db.get_graph()
+        tables = self.tables_for(graph)
+        if tables is None or from_room is None or to_room is None:
+            return None
+        u = graph.index_of.get(int(from_room))
+        v = graph.index_of.get(int(to_room))
+        if u is None or v is None:
+            return None
+        if u == v:
+            return (0, 0)
+        high = self.upper_bound(u, v, tables)
+        if high is None:
+            return None
+        return (max(self.lower_bound(u, v, tables), 1), high)
+
+
+def format_steps(estimate):
+    """Human readable step estimate for tooltips and result lists"""
+    if estimate is None:
+        return "?"
+    low, high = estimate
+    return f"{low}" if low == high else f"{low}-{high}"
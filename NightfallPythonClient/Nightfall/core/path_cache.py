@@ -0,0 +1,53 @@
+# path_cache.py - Bounded LRU caches for route queries
+from collections import OrderedDict
+from core.counters import get_counter
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Small least-recently-used cache with a size bound.
+    Hits, misses, evictions and clears are counted under a name so they
+    show up in the profiler report.
+    """
+
+    def __init__(self, max_size, name):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.counter = get_counter(name)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        """Cached value for key (marks it as recently used), default on a miss"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.counter.hits += 1
+            return self.entries[key]
+        self.counter.misses += 1
+        return default
+
+    def pop(self, key):
+        """Remove one entry (no-op if absent)"""
+        self.entries.pop(key, None)
+
+    def keys(self):
+        return list(self.entries)
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.counter.evictions += 1
+
+    def clear(self):
+        """Drop everything, e.g. after the room graph changed"""
+        if self.entries:
+            self.entries.clear()
+            self.counter.invalidations += 1
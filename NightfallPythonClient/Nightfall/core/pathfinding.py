@@ -0,0 +1,427 @@
+# pathfinding.py - Route planning over the room graph
+import heapq
+from array import array
+from core.path_cache import MISSING, LRUCache
+
+# Values of the 'route' room customization
+ROUTE_AVOID = 'avoid'
+ROUTE_FORBID = 'forbid'
+
+
+class CostModel:
+    """
+    Per-edge walking costs.
+    Plain exits cost StepCost, exits that need a custom command (doors, portals)
+    cost CommandExitCost, leaving a zone adds ZoneChangeCost and entering a room
+    the user marked as 'avoid' adds AvoidRoomCost. Rooms marked 'forbid' are
+    never entered.
+    """
+
+    def __init__(self, step_cost=1.0, command_cost=3.0, zone_change_cost=2.0,
+                 avoid_cost=25.0, route_flags=None):
+        self.step_cost = step_cost
+        self.command_cost = command_cost
+        self.zone_change_cost = zone_change_cost
+        self.avoid_cost = avoid_cost
+        self.route_flags = route_flags or {}  # room id -> ROUTE_AVOID / ROUTE_FORBID
+
+    @classmethod
+    def from_config(cls, config, route_flags=None):
+        """Build a cost model from the [Pathfinding] section of settings.ini"""
+        section = 'Pathfinding'
+        return cls(
+            step_cost=config.getfloat(section, 'StepCost', fallback=1.0),
+            command_cost=config.getfloat(section, 'CommandExitCost', fallback=3.0),
+            zone_change_cost=config.getfloat(section, 'ZoneChangeCost', fallback=2.0),
+            avoid_cost=config.getfloat(section, 'AvoidRoomCost', fallback=25.0),
+            route_flags=route_flags
+        )
+
+    def min_edge_cost(self):
+        """Cheapest possible edge, scales step lower bounds into cost lower bounds"""
+        return min(self.step_cost, self.command_cost)
+
+    def compile(self, graph):
+        """Per-edge cost array for a RoomGraph (inf for edges that must not be used)"""
+        costs = array('d')
+        for from_idx in range(len(graph)):
+            from_zone = graph.zone_of[from_idx]
+            for edge in graph.edges(from_idx):
+                to_idx = graph.targets[edge]
+                flag = self.route_flags.get(graph.room_ids[to_idx])
+                if flag == ROUTE_FORBID:
+                    costs.append(float('inf'))
+                    continue
+                cost = self.command_cost if edge in graph.commands else self.step_cost
+                if graph.zone_of[to_idx] != from_zone:
+                    cost += self.zone_change_cost
+                if flag == ROUTE_AVOID:
+                    cost += self.avoid_cost
+                costs.append(cost)
+        return costs
+
+
+class ZoneRouter:
+    """
+    Hierarchical (HPA*-style) weighted router.
+    The world is split by zone_id. Rooms with an exit into another zone, or
+    entered from another zone, are gateways. Long trips are planned on the small
+    abstract graph of gateways and only refined into room-level steps afterwards,
+    one zone at a time, so the cost barely depends on the size of the world.
+    All searches are Dijkstra over the shared RoomGraph with per-edge costs
+    compiled from the CostModel, turned into A* once landmark tables are ready.
+    Every destination keeps a route tree (next edge per room) in an LRU cache,
+    grown from the routes planned towards it. Autowalk re-plans after every
+    step, from a room already on the tree, and gets the rest of the same route
+    without searching.
+    """
+
+    def __init__(self, db, cost_model=None, landmarks=None, max_trees=16, max_segments=4096):
+        self.db = db
+        self.cost_model = cost_model or CostModel()
+        self.landmarks = landmarks
+        self.segment_cache = LRUCache(max_segments, 'route_segments')  # (from, to) -> [edges]
+        self.tree_cache = LRUCache(max_trees, 'path_trees')  # (graph, destination) -> {room: next edge}
+        self.build()
+        db.add_graph_listener(self.invalidate)
+
+    def build(self):
+        """Compile the cost model and build the abstract zone/gateway graph"""
+        self.graph = graph = self.db.get_graph()
+        self.costs = costs = self.cost_model.compile(graph)
+        self.gateways = {}  # zone id -> set of gateway room indices
+
+        for idx in range(len(graph)):
+            from_zone = graph.zone_of[idx]
+            for edge in graph.edges(idx):
+                to_idx = graph.targets[edge]
+                to_zone = graph.zone_of[to_idx]
+                if to_zone != from_zone and costs[edge] != float('inf'):
+                    self.gateways.setdefault(from_zone, set()).add(idx)
+                    self.gateways.setdefault(to_zone, set()).add(to_idx)
+
+        # Lazily filled caches, all tied to this graph and cost model
+        self.gateway_costs = {}   # zone id -> {gateway: {gateway: cost}}
+        self.segment_cache.clear()
+        self.tree_cache.clear()
+
+    def invalidate(self):
+        """Rebuild after the room graph or the cost model changed"""
+        self.build()
+
+    def set_cost_model(self, cost_model):
+        """Switch to a new cost model and recompile"""
+        self.cost_model = cost_model
+        self.build()
+
+    def set_landmarks(self, landmarks):
+        """Use a LandmarkIndex as A* heuristic once it is ready"""
+        self.landmarks = landmarks
+
+    def _heuristic(self, target):
+        """A* heuristic towards a room index, None while landmarks are not available"""
+        landmarks = self.landmarks
+        tables = landmarks.tables_for(self.graph) if landmarks is not None else None
+        if tables is None:
+            return None
+        scale = self.cost_model.min_edge_cost()
+        # Tables fixed for the whole search, a newer graph's tables never mix in
+        return lambda node: landmarks.lower_bound(node, target, tables) * scale
+
+    # === ZONE-LOCAL SEARCHES ===
+
+    def _zone_search(self, source, targets=None, reverse=False, heuristic=None):
+        """
+        Dijkstra (A* with a heuristic) restricted to the source's zone.
+        Returns ({room index: cost}, {room index: edge used to reach it}).
+        Stops early once every room in targets is settled.
+        """
+        graph = self.graph
+        costs = self.costs
+        zone_id = graph.zone_of[source]
+        dist = {source: 0.0}
+        via = {}
+        settled = set()
+        remaining = set(targets) - {source} if targets is not None else None
+        heap = [(0.0, source)]
+
+        if reverse:
+            offsets, edges = graph.rev_offsets, graph.rev_edges
+        else:
+            offsets, edges = graph.offsets, None
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            if remaining is not None:
+                remaining.discard(node)
+                if not remaining:
+                    break
+            cost = dist[node]
+
+            for i in range(offsets[node], offsets[node + 1]):
+                if reverse:
+                    edge = edges[i]
+                    next_node = graph.edge_source[edge]
+                else:
+                    edge = i
+                    next_node = graph.targets[edge]
+                if graph.zone_of[next_node] != zone_id:
+                    continue
+                new_cost = cost + costs[edge]
+                if new_cost < dist.get(next_node, float('inf')):
+                    dist[next_node] = new_cost
+                    via[next_node] = edge
+                    priority = new_cost + heuristic(next_node) if heuristic else new_cost
+                    heapq.heappush(heap, (priority, next_node))
+
+        return {node: dist[node] for node in settled}, via
+
+    def _zone_gateway_table(self, zone_id):
+        """Gateway-to-gateway costs inside a zone (computed once per zone)"""
+        table = self.gateway_costs.get(zone_id)
+        if table is None:
+            gateways = self.gateways.get(zone_id, set())
+            table = {}
+            for gateway in gateways:
+                dist, _ = self._zone_search(gateway, gateways)
+                table[gateway] = {g: d for g, d in dist.items() if g in gateways and g != gateway}
+            self.gateway_costs[zone_id] = table
+        return table
+
+    def _zone_segment(self, start, end):
+        """Room-level edges between two rooms of the same zone (cached)"""
+        key = (start, end)
+        segment = self.segment_cache.get(key, MISSING)
+        if segment is not MISSING:
+            return segment
+
+        dist, via = self._zone_search(start, (end,), heuristic=self._heuristic(end))
+        if end not in dist:
+            segment = None
+        else:
+            segment = []
+            node = end
+            while node != start:
+                edge = via[node]
+                segment.append(edge)
+                node = self.graph.edge_source[edge]
+            segment.reverse()
+
+        self.segment_cache.put(key, segment)
+        return segment
+
+    # === ABSTRACT PLANNING ===
+
+    def plan(self, start, end):
+        """
+        Plan a route on the abstract graph (room indices).
+        Returns the list of waypoints (start, gateways..., end) or None.
+        """
+        graph = self.graph
+        costs = self.costs
+        start_zone = graph.zone_of[start]
+        end_zone = graph.zone_of[end]
+        if start == end:
+            return [start]
+
+        # Same zone and reachable inside it: no abstract search needed
+        if start_zone == end_zone and self._zone_segment(start, end) is not None:
+            return [start, end]
+
+        # Connect start and end to the gateways of their zones
+        start_gateways = self.gateways.get(start_zone, set())
+        end_zone_gateways = self.gateways.get(end_zone, set())
+        start_links, _ = self._zone_search(start, start_gateways)
+        end_links, _ = self._zone_search(end, end_zone_gateways, reverse=True)
+        end_gateways = {g: d for g, d in end_links.items() if g in end_zone_gateways}
+
+        # Dijkstra (A* once landmarks are ready) over gateways
+        heuristic = self._heuristic(end)
+        dist = {start: 0.0}
+        came_from = {start: None}
+        settled = set()
+        heap = [(0.0, start)]
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == end:
+                break
+            if node in settled:
+                continue
+            settled.add(node)
+            cost = dist[node]
+
+            zone_id = graph.zone_of[node]
+            if node == start and node not in start_gateways:
+                edges = [(g, d) for g, d in start_links.items() if g in start_gateways]
+            else:
+                edges = list(self._zone_gateway_table(zone_id).get(node, {}).items())
+                for edge in graph.edges(node):
+                    to_idx = graph.targets[edge]
+                    if graph.zone_of[to_idx] != zone_id:
+                        edges.append((to_idx, costs[edge]))
+            if zone_id == end_zone and node in end_gateways:
+                edges.append((end, end_gateways[node]))
+
+            for next_node, weight in edges:
+                new_cost = cost + weight
+                if new_cost < dist.get(next_node, float('inf')):
+                    dist[next_node] = new_cost
+                    came_from[next_node] = node
+                    priority = new_cost + heuristic(next_node) if heuristic else new_cost
+                    heapq.heappush(heap, (priority, next_node))
+
+        if end not in came_from:
+            return None
+
+        waypoints = []
+        node = end
+        while node is not None:
+            waypoints.append(node)
+            node = came_from[node]
+        waypoints.reverse()
+        return waypoints
+
+    def refine(self, waypoints):
+        """Lazily expand abstract waypoints into walking commands"""
+        for edge in self.route_edges(waypoints):
+            yield self.graph.edge_command(edge)
+
+    def route_edges(self, waypoints):
+        """Lazily expand abstract waypoints into the edges walked"""
+        graph = self.graph
+        costs = self.costs
+        for from_idx, to_idx in zip(waypoints, waypoints[1:]):
+            if graph.zone_of[from_idx] != graph.zone_of[to_idx]:
+                # Cross-zone hop: the cheapest direct exit
+                best = None
+                for edge in graph.edges(from_idx):
+                    if graph.targets[edge] == to_idx and (best is None or costs[edge] < costs[best]):
+                        best = edge
+                if best is None:
+                    return
+                yield best
+            else:
+                segment = self._zone_segment(from_idx, to_idx)
+                if segment is None:
+                    return
+                yield from segment
+
+    def path_rooms(self, start, commands):
+        """Room ids a list of commands walks through from start (start included, cut at an unknown command)"""
+        graph = self.graph
+        node = graph.index_of.get(int(start))
+        if node is None:
+            return []
+        rooms = [graph.room_ids[node]]
+        for command in commands:
+            node = next((graph.targets[edge] for edge in graph.edges(node)
+                         if graph.edge_command(edge) == command), None)
+            if node is None:
+                break
+            rooms.append(graph.room_ids[node])
+        return rooms
+
+    def find_nearest(self, start, is_target):
+        """
+        Nearest room (by walking cost) whose room id satisfies is_target.
+        One best-first expansion over the whole graph that stops at the first
+        settled match. Returns (room id, [commands]) or None.
+        """
+        graph = self.graph
+        costs = self.costs
+        source = graph.index_of.get(int(start))
+        if source is None:
+            return None
+
+        dist = {source: 0.0}
+        via = {}
+        settled = set()
+        heap = [(0.0, source)]
+        found = None
+
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            if is_target(graph.room_ids[node]):
+                found = node
+                break
+            for edge in graph.edges(node):
+                next_node = graph.targets[edge]
+                new_cost = cost + costs[edge]
+                if new_cost < dist.get(next_node, float('inf')):
+                    dist[next_node] = new_cost
+                    via[next_node] = edge
+                    heapq.heappush(heap, (new_cost, next_node))
+
+        if found is None:
+            return None
+        commands = []
+        node = found
+        while node != source:
+            edge = via[node]
+            commands.append(graph.edge_command(edge))
+            node = graph.edge_source[edge]
+        commands.reverse()
+        return graph.room_ids[found], commands
+
+    # === ROUTE TREES ===
+
+    def _add_route(self, tree, start, end, edges):
+        """
+        Record a planned route in the tree of its destination.
+        Loops are cut out and the route joins the tree at the first room that
+        already has a route there, so a room keeps the route it was given first.
+        Returns False if the edges do not lead from start to end.
+        """
+        graph = self.graph
+        nodes = [start]
+        for edge in edges:
+            nodes.append(graph.targets[edge])
+        if nodes[-1] != end:
+            return False
+        # Keep the last visit of every room: the route without its loops
+        last = {node: i for i, node in enumerate(nodes)}
+        i = 0
+        while nodes[i] != end and nodes[i] not in tree:
+            i = last[nodes[i]]
+            tree[nodes[i]] = edges[i]
+            i += 1
+        return True
+
+    def _tree_path(self, tree, start, end):
+        """Follow a route tree from start to its destination"""
+        commands = []
+        node = start
+        while node != end:
+            edge = tree[node]
+            if edge < 0:
+                return None
+            commands.append(self.graph.edge_command(edge))
+            node = self.graph.targets[edge]
+        return commands
+
+    def find_path(self, start, end):
+        """Full list of commands from start to end, or None if unreachable"""
+        graph = self.graph
+        start_idx = graph.index_of.get(int(start))
+        end_idx = graph.index_of.get(int(end))
+        if start_idx is None or end_idx is None:
+            return None
+
+        key = (graph, end_idx)
+        tree = self.tree_cache.get(key)
+        if tree is None:
+            tree = {}
+            self.tree_cache.put(key, tree)
+        if start_idx != end_idx and start_idx not in tree:
+            waypoints = self.plan(start_idx, end_idx)
+            if waypoints is None or not self._add_route(tree, start_idx, end_idx,
+                                                        list(self.route_edges(waypoints))):
+                tree[start_idx] = -1  # Unreachable, remembered like a route
+        return self._tree_path(tree, start_idx, end_idx)
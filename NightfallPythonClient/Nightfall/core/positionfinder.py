@@ -17,6 +17,13 @@ import Levenshtein
 ANSI_ESCAPE_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
 EXIT_LINE_PATTERN = re.compile(r'(?:There (?:is|are)|The path leads|Exits?:)', re.IGNORECASE)
 
+# Exit type codes of the room graph -> direction words (long and short form)
+EXIT_TYPE_DIRECTIONS = {
+    0: ('north', 'n'), 1: ('northeast', 'ne'), 2: ('east', 'e'), 3: ('southeast', 'se'),
+    4: ('south', 's'), 5: ('southwest', 'sw'), 6: ('west', 'w'), 7: ('northwest', 'nw'),
+    8: ('up', 'u'), 9: ('down', 'd'), 10: ('enter',), 11: ('leave',)
+}
+
 class AutoWalker:
     def __init__(self, map_viewer):
         self.map_viewer = map_viewer
@@ -43,6 +50,11 @@ class AutoWalker:
         
         # Update display and highlight
         def update_display():
+            if getattr(self.map_viewer, 'world_overview', None) and self.map_viewer.world_overview.active:
+                # The world overview shows every zone, just move the marker
+                self.map_viewer.highlight_room(room_id)
+                return
+            
             # Check if we're changing zones
             zone_changing = new_zone_id and (new_zone_id != self.map_viewer.displayed_zone_id or self.map_viewer.displayed_zone_id is None)
             
@@ -160,8 +172,7 @@ class AutoWalker:
         return None
     
     def _find_matching_room_with_exits(self, exit_info, words_in_response, room_descriptions):
-        from core.fast_database import get_database
-        db = get_database()
+        graph = _db.get_graph()
         
         # Collect all candidates with their scores
         candidates = []
@@ -180,27 +191,14 @@ class AutoWalker:
             description_score = len(common_words)
             
             # Check if exits match what's in the database
-            if exit_info:
-                room_exits = db.get_room_exits(room_id)
-                if room_exits:
-                    # Get exit directions from database
+            room_idx = graph.index_of.get(int(room_id)) if exit_info else None
+            if room_idx is not None:
+                exit_edges = graph.edges(room_idx)
+                if exit_edges:
+                    # Get exit directions from the room graph (long and short forms)
                     db_directions = set()
-                    for exit in room_exits:
-                        exit_type = exit.get('type', -1)
-                        # Map exit types to directions
-                        type_to_dir = {
-                            0: 'north', 1: 'northeast', 2: 'east', 3: 'southeast',
-                            4: 'south', 5: 'southwest', 6: 'west', 7: 'northwest',
-                            8: 'up', 9: 'down', 10: 'enter', 11: 'leave'
-                        }
-                        if exit_type in type_to_dir:
-                            db_directions.add(type_to_dir[exit_type])
-                            # Also add short forms
-                            short_forms = {'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
-                                         'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
-                                         'up': 'u', 'down': 'd'}
-                            if type_to_dir[exit_type] in short_forms:
-                                db_directions.add(short_forms[type_to_dir[exit_type]])
+                    for edge in exit_edges:
+                        db_directions.update(EXIT_TYPE_DIRECTIONS.get(graph.directions[edge], ()))
                     
                     # Check if response exits match database exits
                     response_dirs = set(exit_info.get('directions', []))
@@ -540,67 +538,24 @@ class AutoWalker:
         return {'items': items, 'npcs': npcs}
     
     def _save_room_entities(self, room_id, entities):
-        """Save items and NPCs to separate databases"""
-        import json
-        import os
+        """Save items and NPCs to separate stores (written to disk in the background)"""
         from datetime import datetime
+        from core.storage import get_storage
         
         current_time = datetime.now().isoformat()
-        room_key = str(room_id)
-        
-        # Save items to items database
-        if entities['items']:
-            items_file = os.path.join(os.path.dirname(__file__), '../data/room_items.json')
-            try:
-                if os.path.exists(items_file):
-                    with open(items_file, 'r', encoding='utf-8') as f:
-                        items_data = json.load(f)
-                else:
-                    items_data = {}
-            except Exception as e:
-                items_data = {}
-            
-            if room_key not in items_data:
-                items_data[room_key] = {'items': [], 'last_seen': {}}
-            
-            for item in entities['items']:
-                if item not in items_data[room_key]['items']:
-                    items_data[room_key]['items'].append(item)
-                items_data[room_key]['last_seen'][item] = current_time
-            
-            try:
-                os.makedirs(os.path.dirname(items_file), exist_ok=True)
-                with open(items_file, 'w', encoding='utf-8') as f:
-                    json.dump(items_data, f, indent=2, ensure_ascii=False)
-            except Exception:
-                pass
-        
-        # Save NPCs to NPCs database
-        if entities['npcs']:
-            npcs_file = os.path.join(os.path.dirname(__file__), '../data/room_npcs.json')
-            try:
-                if os.path.exists(npcs_file):
-                    with open(npcs_file, 'r', encoding='utf-8') as f:
-                        npcs_data = json.load(f)
-                else:
-                    npcs_data = {}
-            except Exception as e:
-                npcs_data = {}
-            
-            if room_key not in npcs_data:
-                npcs_data[room_key] = {'npcs': [], 'last_seen': {}}
-            
-            for npc in entities['npcs']:
-                if npc not in npcs_data[room_key]['npcs']:
-                    npcs_data[room_key]['npcs'].append(npc)
-                npcs_data[room_key]['last_seen'][npc] = current_time
-            
-            try:
-                os.makedirs(os.path.dirname(npcs_file), exist_ok=True)
-                with open(npcs_file, 'w', encoding='utf-8') as f:
-                    json.dump(npcs_data, f, indent=2, ensure_ascii=False)
-            except Exception:
-                pass
+        storage = get_storage()
+        
+        for namespace, key in (('room_items', 'items'), ('room_npcs', 'npcs')):
+            if not entities[key]:
+                continue
+            stored = storage.get(namespace, room_id)
+            room_data = {key: list(stored.get(key, [])), 'last_seen': dict(stored.get('last_seen', {}))} \
+                if stored else {key: [], 'last_seen': {}}
+            for name in entities[key]:
+                if name not in room_data[key]:
+                    room_data[key].append(name)
+                room_data['last_seen'][name] = current_time
+            storage.put(namespace, room_id, room_data)
     
     def _map_to_original_positions(self, original, clean, clean_positions):
         try:
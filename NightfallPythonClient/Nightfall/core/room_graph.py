@@ -0,0 +1,149 @@
+# room_graph.py - Compressed sparse row (CSR) exit graph
+from array import array
+
+# Map exit types to direction commands
+EXIT_TYPE_TO_COMMAND = {
+    0: "n",    # north
+    1: "ne",   # northeast
+    2: "e",    # east
+    3: "se",   # southeast
+    4: "s",    # south
+    5: "sw",   # southwest
+    6: "w",    # west
+    7: "nw",   # northwest
+    8: "u",    # up
+    9: "d",    # down
+    10: "enter", # enter
+    11: "leave"  # leave
+}
+
+NO_ZONE = -1
+
+
+class RoomGraph:
+    """
+    The whole exit graph in flat int32 arrays.
+    Rooms are numbered 0..n-1 (index_of maps room ids to indices). The exits
+    of room i are the edges offsets[i]..offsets[i+1]-1, each with a target
+    room index and a direction code (exit type). Custom exit commands and any
+    other exit fields are kept in small side tables keyed by edge number.
+    A reverse index (rev_offsets/rev_edges) lists the incoming edges of a room.
+    """
+
+    def __init__(self, rooms, exits):
+        self.room_ids = array('i')
+        self.index_of = {}
+        self.zone_of = array('i')
+
+        for rid_str, room in rooms.items():
+            room_id = int(rid_str)
+            self.index_of[room_id] = len(self.room_ids)
+            self.room_ids.append(room_id)
+            zone_id = room.get("zone_id")
+            self.zone_of.append(NO_ZONE if zone_id is None else int(zone_id))
+
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        self.directions = array('h')
+        self.commands = {}  # edge -> custom command
+        self.extras = {}    # edge -> any other exit fields, kept for saving
+
+        for room_id in self.room_ids:
+            for exit_info in exits.get(str(room_id), ()):
+                to_idx = self.index_of.get(int(exit_info["to"]))
+                if to_idx is None:
+                    continue
+                edge = len(self.targets)
+                self.targets.append(to_idx)
+                self.directions.append(exit_info.get("type", -1))
+                if exit_info.get("command"):
+                    self.commands[edge] = exit_info["command"]
+                extra = {k: v for k, v in exit_info.items() if k not in ("to", "type", "command")}
+                if extra:
+                    self.extras[edge] = extra
+            self.offsets.append(len(self.targets))
+
+        self._build_reverse()
+
+    def _build_reverse(self):
+        """Group edge numbers by target room"""
+        n = len(self.room_ids)
+        counts = [0] * (n + 1)
+        for to_idx in self.targets:
+            counts[to_idx + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        self.rev_offsets = array('i', counts)
+        self.rev_edges = array('i', bytes(4 * len(self.targets)))
+        self.edge_source = array('i', bytes(4 * len(self.targets)))
+        fill = counts[:n]
+        for idx in range(n):
+            for edge in range(self.offsets[idx], self.offsets[idx + 1]):
+                to_idx = self.targets[edge]
+                self.rev_edges[fill[to_idx]] = edge
+                fill[to_idx] += 1
+                self.edge_source[edge] = idx
+
+    def __len__(self):
+        return len(self.room_ids)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    # === LOOKUPS ===
+
+    def index(self, room_id):
+        """Get the room index for a room id, None if unknown"""
+        return self.index_of.get(int(room_id))
+
+    def zone(self, idx):
+        """Get the zone id of a room index (None if the room has no zone)"""
+        zone_id = self.zone_of[idx]
+        return None if zone_id == NO_ZONE else zone_id
+
+    def edges(self, idx):
+        """Edge numbers leaving a room index"""
+        return range(self.offsets[idx], self.offsets[idx + 1])
+
+    def neighbours(self, idx):
+        """Room indices reachable in one step"""
+        return self.targets[self.offsets[idx]:self.offsets[idx + 1]]
+
+    def edge_command(self, edge):
+        """Command that walks an edge (custom command wins)"""
+        command = self.commands.get(edge)
+        if command:
+            return command
+        exit_type = self.directions[edge]
+        return EXIT_TYPE_TO_COMMAND.get(exit_type, f"unknown_{exit_type}")
+
+    def exit_dict(self, edge):
+        """Rebuild the original exit record of an edge"""
+        exit_info = {"to": self.room_ids[self.targets[edge]], "type": self.directions[edge]}
+        if edge in self.commands:
+            exit_info["command"] = self.commands[edge]
+        if edge in self.extras:
+            exit_info.update(self.extras[edge])
+        return exit_info
+
+    def exits_from(self, room_id):
+        """Exit records of a room, in the format of the world file"""
+        idx = self.index_of.get(int(room_id))
+        if idx is None:
+            return []
+        return [self.exit_dict(edge) for edge in self.edges(idx)]
+
+    def to_exit_dict(self):
+        """Export all exits in the world file format ({room id: [exits]})"""
+        exits = {}
+        for idx, room_id in enumerate(self.room_ids):
+            if self.offsets[idx] != self.offsets[idx + 1]:
+                exits[str(room_id)] = [self.exit_dict(edge) for edge in self.edges(idx)]
+        return exits
+
+    def memory_bytes(self):
+        """Approximate size of the arrays in bytes"""
+        arrays = (self.room_ids, self.zone_of, self.offsets, self.targets, self.directions,
+                  self.rev_offsets, self.rev_edges, self.edge_source)
+        return sum(a.itemsize * len(a) for a in arrays)
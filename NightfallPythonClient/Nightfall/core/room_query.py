@@ -0,0 +1,68 @@
+# room_query.py - Room predicates for "walk to the nearest ..." searches
+import re
+from core.storage import get_storage
+
+# Entity stores written by the position finder: storage namespace -> list key
+ENTITY_NAMESPACES = {
+    'room_items': 'items',
+    'room_npcs': 'npcs',
+}
+
+QUERY_HELP = (
+    "NPC or item name, or one of:\n"
+    "  note:<text>   room with a note (text optional)\n"
+    "  color:<#hex>  room with a custom color (color optional)\n"
+    "  name:<regex>  room name matching a pattern"
+)
+
+
+def entity_rooms(text):
+    """Room ids where an item or NPC containing text has been seen"""
+    text = text.lower()
+    rooms = set()
+    storage = get_storage()
+    for namespace, key in ENTITY_NAMESPACES.items():
+        for room_id, room_data in storage.items(namespace).items():
+            if any(text in name.lower() for name in room_data.get(key, [])):
+                rooms.add(int(room_id))
+    return rooms
+
+
+def customization_rooms(customizations, field, value=''):
+    """Room ids with a note/color customization (optionally containing value)"""
+    value = value.lower()
+    return {int(room_id) for room_id, custom in customizations.items()
+            if custom.get(field) and value in custom[field].lower()}
+
+
+def name_matcher(db, pattern):
+    """Predicate matching room names against a case-insensitive regex"""
+    regex = re.compile(pattern, re.IGNORECASE)
+    return lambda room_id: bool(regex.search(db.get_room_name(room_id) or ''))
+
+
+def build_room_predicate(query, db, customizations):
+    """
+    Turn a query string into (predicate on room id, description).
+    Raises ValueError for an empty query or an invalid name pattern.
+    """
+    query = query.strip()
+    kind, sep, value = query.partition(':')
+    kind = kind.strip().lower() if sep else ''
+    value = value.strip()
+
+    if kind in ('note', 'color'):
+        rooms = customization_rooms(customizations, kind, value)
+        label = f"{kind} '{value}'" if value else kind
+        return rooms.__contains__, f"room with {label}"
+    if kind == 'name':
+        if not value:
+            raise ValueError("Empty name pattern")
+        try:
+            return name_matcher(db, value), f"room named /{value}/"
+        except re.error as e:
+            raise ValueError(f"Invalid pattern: {e}")
+
+    if not query:
+        raise ValueError("Empty query")
+    return entity_rooms(query).__contains__, f"'{query}'"
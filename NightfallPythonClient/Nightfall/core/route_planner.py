@@ -0,0 +1,159 @@
+# route_planner.py - Visiting order for a list of rooms (multi-stop autowalk)
+import heapq
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Stand-in for "unreachable" so tour costs stay finite and comparable
+NO_ROUTE = 1e9
+
+# Below this many stops the searches run in-process (spawning workers costs about half a second)
+PARALLEL_MIN_STOPS = 200
+
+# Graph arrays of a worker process (set once by _init_worker)
+_worker_graph = None
+
+
+def cost_rows(offsets, targets, costs, sources, wanted):
+    """
+    Walking costs from each source to every wanted room index.
+    One Dijkstra per source over the whole graph, stopping as soon as all
+    wanted rooms are settled. Returns one row per source, NO_ROUTE if unreachable.
+    """
+    rows = []
+    for source in sources:
+        remaining = set(wanted)
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap and remaining:
+            cost, node = heapq.heappop(heap)
+            if cost > dist[node]:
+                continue
+            remaining.discard(node)
+            for edge in range(offsets[node], offsets[node + 1]):
+                next_node = targets[edge]
+                new_cost = cost + costs[edge]
+                if new_cost < dist.get(next_node, float('inf')):
+                    dist[next_node] = new_cost
+                    heapq.heappush(heap, (new_cost, next_node))
+        rows.append([dist.get(w, NO_ROUTE) for w in wanted])
+    return rows
+
+
+def _init_worker(offsets, targets, costs):
+    global _worker_graph
+    _worker_graph = (offsets, targets, costs)
+
+
+def _worker_rows(sources, wanted):
+    return cost_rows(*_worker_graph, sources, wanted)
+
+
+def cost_matrix(graph, costs, nodes, workers=None):
+    """
+    Pairwise walking costs between room indices (matrix[i][j] = nodes[i] -> nodes[j]).
+    Large sets are split into batches of sources searched on a process pool;
+    the graph arrays are sent to each worker once. Workers are spawned, not
+    forked: the caller is a background thread of the Tk client.
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(nodes) < PARALLEL_MIN_STOPS or workers < 2:
+        return cost_rows(graph.offsets, graph.targets, costs, nodes, nodes)
+
+    batch_size = -(-len(nodes) // (workers * 2))
+    batches = [nodes[i:i + batch_size] for i in range(0, len(nodes), batch_size)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker,
+                                 initargs=(graph.offsets, graph.targets, costs)) as pool:
+            matrix = []
+            for rows in pool.map(_worker_rows, batches, [nodes] * len(batches)):
+                matrix.extend(rows)
+            return matrix
+    except Exception as e:
+        # No worker processes available (frozen build, sandbox...) - search in-process
+        print(f"[ROUTE PLANNER] Process pool failed ({e}), searching in-process")
+        return cost_rows(graph.offsets, graph.targets, costs, nodes, nodes)
+
+
+def nearest_neighbour_order(matrix):
+    """Greedy open tour over matrix indices, starting at index 0"""
+    order = [0]
+    unvisited = set(range(1, len(matrix)))
+    while unvisited:
+        row = matrix[order[-1]]
+        nearest = min(unvisited, key=lambda j: row[j])
+        order.append(nearest)
+        unvisited.remove(nearest)
+    return order
+
+
+def tour_cost(matrix, order):
+    return sum(matrix[a][b] for a, b in zip(order, order[1:]))
+
+
+def two_opt(matrix, order):
+    """
+    Improve an open tour (first stop fixed) by reversing segments.
+    Costs may be asymmetric, so the reversed segment is re-priced using
+    prefix sums of the forward and backward leg costs.
+    """
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        n = len(order)
+        forward = [0.0] * n
+        backward = [0.0] * n
+        for k in range(1, n):
+            forward[k] = forward[k - 1] + matrix[order[k - 1]][order[k]]
+            backward[k] = backward[k - 1] + matrix[order[k]][order[k - 1]]
+
+        for i in range(1, n - 1):
+            before = order[i - 1]
+            for j in range(i + 1, n):
+                after = order[j + 1] if j + 1 < n else None
+                old = matrix[before][order[i]] + forward[j] - forward[i]
+                new = matrix[before][order[j]] + backward[j] - backward[i]
+                if after is not None:
+                    old += matrix[order[j]][after]
+                    new += matrix[order[i]][after]
+                if new < old - 1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+                    break
+            if improved:
+                break
+    return order
+
+
+def plan_visit_order(graph, costs, start, rooms, workers=None):
+    """
+    Near-optimal order to visit rooms starting from room id start, over a
+    graph and its compiled edge costs (taken together, e.g. from a ZoneRouter).
+    Returns (ordered room ids, unreachable room ids).
+    """
+    start_idx = graph.index_of.get(int(start))
+    if start_idx is None:
+        return [], list(rooms)
+
+    stops, unknown = [], []
+    for room_id in dict.fromkeys(int(r) for r in rooms):
+        idx = graph.index_of.get(room_id)
+        if idx is None:
+            unknown.append(room_id)
+        elif idx != start_idx:
+            stops.append(idx)
+
+    nodes = [start_idx] + stops
+    matrix = cost_matrix(graph, costs, nodes, workers)
+
+    # Drop stops that cannot be reached from the start at all
+    keep = [0] + [i for i in range(1, len(nodes)) if matrix[0][i] < NO_ROUTE]
+    unknown.extend(graph.room_ids[nodes[i]] for i in range(1, len(nodes)) if matrix[0][i] >= NO_ROUTE)
+    matrix = [[matrix[a][b] for b in keep] for a in keep]
+    nodes = [nodes[i] for i in keep]
+
+    order = two_opt(matrix, nearest_neighbour_order(matrix))
+    print(f"[ROUTE PLANNER] {len(order) - 1} stops, tour cost {tour_cost(matrix, order):.1f}")
+    return [graph.room_ids[nodes[i]] for i in order[1:]], unknown
@@ -0,0 +1,191 @@
+# storage.py - Write-behind key-value store (SQLite) for the client's own data files
+import atexit
+import json
+import os
+import sqlite3
+import threading
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data')
+STORE_FILE = os.path.join(DATA_DIR, 'client_data.sqlite3')
+# SQLite path of a store kept only in memory (headless runs, tests)
+MEMORY_STORE = ':memory:'
+# Seconds between background flushes of pending writes
+FLUSH_INTERVAL = 2.0
+
+# Namespaces that used to be JSON files in data/, imported on first use
+LEGACY_FILES = {
+    'camera_states': 'camera_states.json',
+    'room_customizations': 'room_customizations.json',
+    'room_items': 'room_items.json',
+    'room_npcs': 'room_npcs.json',
+    'preferences': 'theme_preference.json',
+}
+
+
+class Storage:
+    """
+    Namespaced JSON values in one SQLite file.
+    Reads come from an in-memory copy of each namespace (loaded on first
+    use). put/delete update that copy and queue the change; a background
+    thread commits everything queued in one transaction every FLUSH_INTERVAL
+    seconds, so UI events never wait for the disk. flush() commits now and
+    is called on shutdown. Values are serialized when they are put, later
+    changes to the same object need another put.
+    """
+
+    def __init__(self, path=STORE_FILE, legacy_dir=DATA_DIR):
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self.cache = {}     # namespace -> {key: value}
+        self.pending = {}   # (namespace, key) -> JSON text, None to delete
+        self.lock = threading.RLock()
+        self.db_lock = threading.Lock()
+        if path != MEMORY_STORE:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS kv (namespace TEXT, key TEXT, value TEXT, "
+                          "PRIMARY KEY (namespace, key))")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS migrated (namespace TEXT PRIMARY KEY)")
+        self.conn.commit()
+        self.wake = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.thread.start()
+
+    # === READS ===
+
+    def items(self, namespace):
+        """All values of a namespace as {key: value} (a snapshot, safe to iterate while others put)"""
+        with self.lock:
+            return dict(self._values(namespace))
+
+    def get(self, namespace, key, default=None):
+        with self.lock:
+            return self._values(namespace).get(str(key), default)
+
+    def _values(self, namespace):
+        """The live cached dict of a namespace (call with self.lock held)"""
+        values = self.cache.get(namespace)
+        if values is None:
+            values = self._load(namespace)
+            self.cache[namespace] = values
+        return values
+
+    # === WRITES ===
+
+    def put(self, namespace, key, value):
+        key = str(key)
+        text = json.dumps(value, ensure_ascii=False)
+        with self.lock:
+            self._values(namespace)[key] = value
+            self.pending[(namespace, key)] = text
+
+    def delete(self, namespace, key):
+        key = str(key)
+        with self.lock:
+            self._values(namespace).pop(key, None)
+            self.pending[(namespace, key)] = None
+
+    def flush(self):
+        """Commit all pending writes now (one transaction)"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        upserts = [(ns, key, text) for (ns, key), text in pending.items() if text is not None]
+        deletes = [(ns, key) for (ns, key), text in pending.items() if text is None]
+        try:
+            with self.db_lock, self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)",
+                                      upserts)
+                self.conn.executemany("DELETE FROM kv WHERE namespace = ? AND key = ?", deletes)
+        except Exception as e:
+            print(f"[STORAGE] Could not write {len(pending)} changes: {e}")
+            with self.lock:
+                # Keep them for the next flush unless newer values were queued meanwhile
+                for change, text in pending.items():
+                    self.pending.setdefault(change, text)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.wake.set()
+        self.flush()
+        with self.db_lock:
+            self.conn.close()
+
+    def _flush_loop(self):
+        while not self.closed:
+            self.wake.wait(FLUSH_INTERVAL)
+            self.wake.clear()
+            if not self.closed:
+                self.flush()
+
+    # === LOADING / MIGRATION ===
+
+    def _load(self, namespace):
+        with self.db_lock:
+            rows = self.conn.execute("SELECT key, value FROM kv WHERE namespace = ?", (namespace,)).fetchall()
+            migrated = self.conn.execute("SELECT 1 FROM migrated WHERE namespace = ?", (namespace,)).fetchone()
+        values = {}
+        for key, text in rows:
+            try:
+                values[key] = json.loads(text)
+            except ValueError:
+                print(f"[STORAGE] Dropping unreadable value {namespace}/{key}")
+        if not migrated:
+            # Values already in the store are newer than the old file's
+            for key, value in self._migrate(namespace).items():
+                values.setdefault(key, value)
+        return values
+
+    def _migrate(self, namespace):
+        """
+        Import the namespace's old JSON file once (the file is left in place as
+        a backup). Empty entries are skipped and keys already in the store keep
+        their newer value. The namespace is marked as migrated in the same
+        transaction, an import that fails is tried again next start.
+        """
+        imported = {}
+        file_name = LEGACY_FILES.get(namespace)
+        path = os.path.join(self.legacy_dir, file_name) if file_name and self.legacy_dir else None
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+                if not isinstance(entries, dict):
+                    raise ValueError("not a JSON object")
+            except Exception as e:
+                print(f"[STORAGE] Could not import {file_name}: {e}")
+                return {}  # Try again next start
+            for key, value in entries.items():
+                if value is None:
+                    print(f"[STORAGE] Skipping empty entry {key!r} in {file_name}")
+                    continue
+                imported[str(key)] = value
+        try:
+            with self.db_lock, self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO kv (namespace, key, value) VALUES (?, ?, ?)",
+                                      [(namespace, key, json.dumps(value, ensure_ascii=False))
+                                       for key, value in imported.items()])
+                self.conn.execute("INSERT OR REPLACE INTO migrated (namespace) VALUES (?)", (namespace,))
+            if imported:
+                print(f"[STORAGE] Imported {len(imported)} entries from {file_name}")
+        except Exception as e:
+            print(f"[STORAGE] Could not store imported {namespace}: {e}")
+        return imported
+
+
+# Global instance for easy access
+_storage_instance = None
+
+
+def get_storage():
+    """Get or create the global storage (flushed and closed at exit)"""
+    global _storage_instance
+    if _storage_instance is None:
+        _storage_instance = Storage()
+        atexit.register(_storage_instance.close)
+    return _storage_instance
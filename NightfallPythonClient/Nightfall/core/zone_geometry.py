@@ -0,0 +1,71 @@
+# zone_geometry.py - Room coordinates of the world as NumPy arrays grouped by zone level (needs NumPy, optional)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+class ZoneGeometry:
+    """
+    Positions, names and exits of every room in flat NumPy arrays, indexed
+    like the RoomGraph it was built from (room index 0..n-1), plus `order`:
+    the placed rooms sorted by (zone, level), so the rooms of one zone level
+    are the slice order[start:end] found in `spans`. Built once per graph
+    (at load time and after every rebuild), read-only afterwards and shared
+    by all threads.
+    """
+
+    def __init__(self, graph, rooms):
+        n = len(graph)
+        xs, ys, zs, placed, names = [0] * n, [0] * n, [0] * n, [False] * n, [''] * n
+        for idx, room_id in enumerate(graph.room_ids):
+            room = rooms.get(str(room_id))
+            if not room:
+                continue
+            names[idx] = room.get("name", "")
+            position = room.get("position")
+            if position:
+                xs[idx], ys[idx] = position["x"], position["y"]
+                zs[idx] = position.get("z") or 0
+                placed[idx] = True
+
+        self.graph = graph
+        # Integer coordinates stay integers (as stored in the world file), unplaced rooms hold 0
+        self.xs = np.array(xs)
+        self.ys = np.array(ys)
+        self.zs = np.array(zs, dtype=np.int64)
+        self.placed = np.array(placed, dtype=bool)
+        self.names = np.array(names, dtype=object)
+        self.room_ids = np.array(graph.room_ids, dtype=np.int64)
+        self.zone_of = np.array(graph.zone_of, dtype=np.int64)
+        self.offsets = np.array(graph.offsets, dtype=np.int64)
+        self.targets = np.array(graph.targets, dtype=np.int64)
+
+        # Placed rooms grouped by zone, then level (stable: graph order inside a group)
+        indices = np.flatnonzero(self.placed)
+        self.order = indices[np.lexsort((self.zs[indices], self.zone_of[indices]))]
+        zones, levels = self.zone_of[self.order], self.zs[self.order]
+        starts = np.flatnonzero(np.r_[True, (zones[1:] != zones[:-1]) | (levels[1:] != levels[:-1])])
+        if not len(self.order):
+            starts = self.order  # No placed rooms (empty world): no spans
+        ends = np.r_[starts[1:], len(self.order)]
+        self.spans = {(int(zones[s]), int(levels[s])): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    def level_indices(self, zone_id, level):
+        """Room indices of a zone level (a view into order, empty if none)"""
+        start, end = self.spans.get((int(zone_id), int(level or 0)), (0, 0))
+        return self.order[start:end]
+
+    def zone_levels(self, zone_id):
+        """Levels with placed rooms in a zone"""
+        return sorted(level for zone, level in self.spans if zone == int(zone_id))
+
+    def exits_from(self, indices):
+        """(source position in indices, target room index) of every exit leaving the rooms"""
+        starts = self.offsets[indices]
+        counts = self.offsets[indices + 1] - starts
+        total = int(counts.sum())
+        # Edge numbers of all the rooms' exits, room after room
+        edges = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+        return np.repeat(np.arange(len(indices)), counts), self.targets[edges]
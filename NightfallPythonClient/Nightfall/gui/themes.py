@@ -1,6 +1,5 @@
 # themes.py
-import json
-import os
+from core.storage import get_storage
 
 class ThemeManager:
     def __init__(self):
@@ -163,23 +162,13 @@ class ThemeManager:
     
     def load_theme_preference(self):
         """Load saved theme preference"""
-        pref_file = os.path.join(os.path.dirname(__file__), '../data/theme_preference.json')
-        if os.path.exists(pref_file):
-            try:
-                with open(pref_file, 'r') as f:
-                    data = json.load(f)
-                    saved_theme = data.get('theme', 'paper')
-                    if saved_theme in self.themes:
-                        self.current_theme = saved_theme
-            except (FileNotFoundError, json.JSONDecodeError, KeyError):
-                pass
+        saved_theme = get_storage().get('preferences', 'theme', 'paper')
+        if saved_theme in self.themes:
+            self.current_theme = saved_theme
     
     def save_theme_preference(self):
         """Save current theme preference"""
-        pref_file = os.path.join(os.path.dirname(__file__), '../data/theme_preference.json')
-        os.makedirs(os.path.dirname(pref_file), exist_ok=True)
-        with open(pref_file, 'w') as f:
-            json.dump({'theme': self.current_theme}, f)
+        get_storage().put('preferences', 'theme', self.current_theme)
     
     def get_theme(self):
         """Get current theme"""
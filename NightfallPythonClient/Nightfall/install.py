@@ -15,12 +15,21 @@ def check_tkinter():
 def main():
     check_tkinter()
 
-    packages = ["python-Levenshtein"]
-    for package in packages:
+    # pip package name -> module it installs
+    packages = {
+        "python-Levenshtein": "Levenshtein",
+    }
+    for package, module in packages.items():
         try:
-            __import__(package)
+            __import__(module)
         except ImportError:
             install(package)
 
+    # Optional: the client runs without it, only zone drawing gets slower
+    try:
+        import numpy
+    except ImportError:
+        print("numpy is not installed (optional). For faster zone drawing run: 'pip install numpy'")
+
 if __name__ == "__main__":
     main()
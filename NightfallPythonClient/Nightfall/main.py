@@ -5,14 +5,15 @@ import sys
 # Change to script directory
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-# Import and run install check
-from install import main as install_dependencies
-install_dependencies()
-
-from gui.mainwindow import MainWindow
-import tkinter as tk
-
 def main():
+    # Import and run install check (inside main: worker processes of the
+    # route planner re-import this module and must not start the client)
+    from install import main as install_dependencies
+    install_dependencies()
+    
+    from gui.mainwindow import MainWindow
+    import tkinter as tk
+    
     root = tk.Tk()
     app = MainWindow(root)
     
@@ -21,6 +22,9 @@ def main():
         if hasattr(app, 'map_viewer') and app.map_viewer.displayed_zone_id:
             zone_key = f"{app.map_viewer.displayed_zone_id}_{app.map_viewer.current_level}"
             app.map_viewer.camera.save_zone_state(zone_key)
+        if hasattr(app, 'map_viewer'):
+            # Camera states are written behind, flush what is still pending
+            app.map_viewer.camera.flush_states()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
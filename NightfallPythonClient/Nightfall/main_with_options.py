@@ -23,6 +23,9 @@ def main():
         if hasattr(app, 'map_viewer') and app.map_viewer.displayed_zone_id:
             zone_key = f"{app.map_viewer.displayed_zone_id}_{app.map_viewer.current_level}"
             app.map_viewer.camera.save_zone_state(zone_key)
+        if hasattr(app, 'map_viewer'):
+            # Camera states are written behind, flush what is still pending
+            app.map_viewer.camera.flush_states()
         root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
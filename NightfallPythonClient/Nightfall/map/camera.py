@@ -1,15 +1,45 @@
-import json
-import os
+import math
+import time
+from core.counters import get_histogram
+from core.storage import get_storage
+
+# Canvas space kept around the content for panning
+SCROLL_MARGIN = 2000
+# Follow animation: frame interval, time constant of the approach (s) and when it counts as arrived (px)
+FRAME_MS = 16
+FOLLOW_TIME = 0.08
+SETTLE_PIXELS = 1.0
+# Targets further away than this many view sizes are jumped to
+SNAP_SCREENS = 3
+
 
 class Camera:
-    def __init__(self, canvas, initial_position=(0, 0), initial_zoom=1.0):
+    """
+    Owns the world->canvas transform: canvas = offset + zoom * world.
+    Zooming only changes zoom and offset, the renderer then places the items
+    of the visible region from their world coordinates, so no canvas item is
+    rescaled in place. Panning scrolls the canvas view (scan_dragto).
+    Zone states are kept in the write-behind Storage ('camera_states', the
+    global one unless another is passed), so saving on every zoom/pan step
+    costs no disk I/O.
+    center_on_point glides the view there by scrolling, one frame every
+    FRAME_MS; frame intervals go to the 'camera_follow' histogram.
+    """
+
+    def __init__(self, canvas, initial_position=(0, 0), initial_zoom=1.0, storage=None):
         self.canvas = canvas
         self.position = initial_position
         self.zoom = initial_zoom
+        self.offset = (0.0, 0.0)  # canvas position of the world origin
+        self.world_bounds = None  # (min_x, min_y, max_x, max_y) of the drawn zone, set by the viewer
         self.start_pan_pos = None
-        self.zone_states = {}  # Store camera state per zone
-        self.states_file = os.path.join(os.path.dirname(__file__), '../data/camera_states.json')
-        self.load_states_from_file()
+        self.storage = storage or get_storage()
+        print(f"[CAMERA] Loaded {len(self.storage.items('camera_states'))} zone states")
+        self.on_view_changed = None  # Called after every pan/zoom (redraws culled items)
+        self.follow_target = None  # World point the view is gliding to
+        self._follow_timer = None
+        self._follow_last = 0.0
+        self.frame_times = get_histogram('camera_follow')
 
         self.canvas.bind("<Button-2>", self.start_pan)
         self.canvas.bind("<B2-Motion>", self.on_pan)
@@ -17,7 +47,30 @@ class Camera:
 
         self.apply_current_zoom()
 
+    def notify_view_changed(self):
+        if self.on_view_changed:
+            self.on_view_changed()
+
+    # === TRANSFORM ===
+
+    def transform(self):
+        """(zoom, offset x, offset y) with canvas = offset + zoom * world"""
+        return self.zoom, self.offset[0], self.offset[1]
+
+    def world_to_canvas(self, x, y):
+        return self.offset[0] + self.zoom * x, self.offset[1] + self.zoom * y
+
+    def canvas_to_world(self, x, y):
+        return (x - self.offset[0]) / self.zoom, (y - self.offset[1]) / self.zoom
+
+    def zoom_at(self, x, y, new_zoom):
+        """Set the zoom keeping the canvas point (x, y) in place"""
+        factor = new_zoom / self.zoom
+        self.offset = (x - (x - self.offset[0]) * factor, y - (y - self.offset[1]) * factor)
+        self.zoom = new_zoom
+
     def start_pan(self, event):
+        self.stop_follow()  # The user takes over
         self.canvas.scan_mark(event.x, event.y)
         self.start_pan_pos = (event.x, event.y)
 
@@ -27,13 +80,11 @@ class Camera:
         dy = (self.start_pan_pos[1] - event.y) / self.zoom
         self.position = (self.position[0] + dx, self.position[1] + dy)
         self.start_pan_pos = (event.x, event.y)
+        self.notify_view_changed()
         
-        # Auto-save camera state when panning if we have a zone
+        # Auto-save camera state when panning if we have a zone (written once the pan is over)
         if hasattr(self, 'current_zone_id') and self.current_zone_id:
-            # Throttle saves - only save after pan is done
-            if hasattr(self, '_save_timer'):
-                self.canvas.after_cancel(self._save_timer)
-            self._save_timer = self.canvas.after(500, lambda: self.save_zone_state(self.current_zone_id))
+            self.save_zone_state(self.current_zone_id)
 
     def on_zoom(self, event):
         x = self.canvas.canvasx(event.x)
@@ -44,52 +95,60 @@ class Camera:
         # Allow much wider zoom range
         new_zoom = max(0.001, min(50.0, new_zoom))
 
-        relative_factor = new_zoom / self.zoom
-        self.zoom = new_zoom
-        self.canvas.scale("all", x, y, relative_factor, relative_factor)
+        self.zoom_at(x, y, new_zoom)
         self.update_scroll_region()
+        self.notify_view_changed()
 
         # Auto-save camera state when zooming if we have a zone
         if hasattr(self, 'current_zone_id') and self.current_zone_id:
             self.save_zone_state(self.current_zone_id)
 
     def update_scroll_region(self):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        if self.world_bounds:
+            x1, y1 = self.world_to_canvas(*self.world_bounds[:2])
+            x2, y2 = self.world_to_canvas(*self.world_bounds[2:])
+            self.canvas.configure(scrollregion=(x1 - SCROLL_MARGIN, y1 - SCROLL_MARGIN,
+                                                x2 + SCROLL_MARGIN, y2 + SCROLL_MARGIN))
+        else:
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
 
     def apply_current_zoom(self):
-        self.canvas.scale("all", 0, 0, self.zoom, self.zoom)
         self.update_scroll_region()
 
     def log_current_position(self):
         pass
     
     def save_zone_state(self, zone_id):
-        """Save current camera state for a zone"""
+        """Remember the current camera state of a zone (written to disk in the background)"""
         if zone_id:
             # Get current view position
             x1 = self.canvas.canvasx(0)
             y1 = self.canvas.canvasy(0)
-            self.zone_states[zone_id] = {
+            self.storage.put('camera_states', zone_id, {
                 'zoom': self.zoom,
                 'view_x': x1,
                 'view_y': y1,
-                'position': self.position
-            }
-            self.save_states_to_file()
+                'position': self.position,
+                'offset': self.offset
+            })
+
+    def flush_states(self):
+        """Write pending zone states now (called on shutdown)"""
+        self.storage.flush()
     
     def restore_zone_state(self, zone_id):
         """Restore camera state for a zone"""
-        if zone_id and zone_id in self.zone_states:
-            state = self.zone_states[zone_id]
+        self.stop_follow()
+        state = self.storage.get('camera_states', zone_id) if zone_id else None
+        if state:
             
-            # IMPORTANT: Clear ALL transformations first
-            self.canvas.delete("all")  # This will be redrawn by caller
-            
-            # Set zoom directly without any scaling first
+            # The caller redraws the zone through the restored transform
             saved_zoom = state['zoom']
             # Allow wider range but sanity check
             saved_zoom = max(0.001, min(50.0, saved_zoom))
             self.zoom = saved_zoom
+            # States saved before the camera owned the transform were scaled from the origin
+            self.offset = tuple(state.get('offset', (0.0, 0.0)))
             
             # Position will be set by the caller after drawing
             self.position = state.get('position', (0, 0))
@@ -104,15 +163,15 @@ class Camera:
             print(f"[CAMERA] No saved state for {zone_id}, starting with zoom=1.0")
             # Reset to default zoom when no state
             self.zoom = 1.0
+            self.offset = (0.0, 0.0)
             self.position = (0, 0)
         return False
     
     def apply_pending_view(self):
         """Apply pending view position after map is drawn"""
         if hasattr(self, 'pending_view_x') and hasattr(self, 'pending_view_y'):
-            # Apply the zoom to all new items
-            if self.zoom != 1.0:
-                self.canvas.scale("all", 0, 0, self.zoom, self.zoom)
+            # Zoom and offset were restored already, the items follow on the next render
+            self.update_scroll_region()
             
             # Restore view position
             self.canvas.xview_moveto(0)
@@ -125,30 +184,11 @@ class Camera:
             del self.pending_view_y
             
             self.update_scroll_region()
+            self.notify_view_changed()
             print(f"[CAMERA] Applied pending view state")
     
-    def save_states_to_file(self):
-        """Save all zone camera states to file"""
-        try:
-            os.makedirs(os.path.dirname(self.states_file), exist_ok=True)
-            with open(self.states_file, 'w') as f:
-                json.dump(self.zone_states, f, indent=2)
-        except Exception as e:
-            print(f"[CAMERA] Could not save states: {e}")
-    
-    def load_states_from_file(self):
-        """Load zone camera states from file"""
-        try:
-            if os.path.exists(self.states_file):
-                with open(self.states_file, 'r') as f:
-                    self.zone_states = json.load(f)
-                print(f"[CAMERA] Loaded {len(self.zone_states)} zone states")
-        except Exception as e:
-            print(f"[CAMERA] Could not load states: {e}")
-            self.zone_states = {}
-    
-    def center_on_point(self, x, y):
-        """Center the view on a specific point"""
+    def center_on_point(self, x, y, animate=True):
+        """Center the view on a canvas point, gliding there unless animate is False"""
         # Get canvas dimensions
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
@@ -158,31 +198,104 @@ class Camera:
             self.canvas.after(50, lambda: self.center_on_point(x, y))
             return
         
-        # Get current bbox to check scroll region
-        bbox = self.canvas.bbox("all")
-        if not bbox:
+        if not self.world_bounds:
             return
             
-        # Calculate offset to center the point
-        canvas_center_x = canvas_width / 2
-        canvas_center_y = canvas_height / 2
-        
-        # Calculate how much to move everything
-        dx = canvas_center_x - x
-        dy = canvas_center_y - y
+        # Update position tracking
+        self.position = (x, y)
         
-        # Move all items
-        self.canvas.move("all", dx, dy)
+        # Remember the target in world coordinates, so zooming during the glide keeps it
+        self.follow_target = self.canvas_to_world(x, y)
+        target_x, target_y = self._follow_view_target()
+        distance = max(abs(target_x - self.canvas.canvasx(0)), abs(target_y - self.canvas.canvasy(0)))
+        if not animate or distance > SNAP_SCREENS * max(canvas_width, canvas_height):
+            # Far away (e.g. right after a zone switch): shift the world under the view
+            self.stop_follow()
+            canvas_center_x = self.canvas.canvasx(canvas_width / 2)
+            canvas_center_y = self.canvas.canvasy(canvas_height / 2)
+            self.offset = (self.offset[0] + canvas_center_x - x, self.offset[1] + canvas_center_y - y)
+            self.update_scroll_region()
+            self.notify_view_changed()
+        elif self._follow_timer is None:
+            # Rapid moves only retarget a running glide, so they blend into one motion
+            self._follow_last = time.perf_counter()
+            self._follow_timer = self.canvas.after(FRAME_MS, self._follow_frame)
+    
+    # === FOLLOW ANIMATION ===
+    
+    @property
+    def following(self):
+        return self._follow_timer is not None
+    
+    def stop_follow(self):
+        if self._follow_timer is not None:
+            self.canvas.after_cancel(self._follow_timer)
+            self._follow_timer = None
+        self.follow_target = None
+    
+    def _follow_view_target(self):
+        """Canvas position of the view's top left corner that centers the follow target"""
+        x, y = self.world_to_canvas(*self.follow_target)
+        return x - self.canvas.winfo_width() / 2, y - self.canvas.winfo_height() / 2
+    
+    def _follow_frame(self):
+        """One animation frame: move the view part of the way, more if frames were late"""
+        self._follow_timer = None
+        if self.follow_target is None:
+            return
+        now = time.perf_counter()
+        elapsed = now - self._follow_last
+        self._follow_last = now
+        self.frame_times.add(elapsed * 1000)
+        late_frames = int(elapsed * 1000 / FRAME_MS) - 1
+        if late_frames > 0:
+            self.frame_times.skipped += late_frames
         
-        # Update scroll region after moving
-        self.update_scroll_region()
+        # Exponential approach by elapsed time: a slow frame covers the skipped frames' way
+        target_x, target_y = self._follow_view_target()
+        view_x, view_y = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        step = 1 - math.exp(-elapsed / FOLLOW_TIME)
+        new_x = view_x + self._follow_step(target_x - view_x, step)
+        new_y = view_y + self._follow_step(target_y - view_y, step)
+        arrived = abs(target_x - new_x) < SETTLE_PIXELS and abs(target_y - new_y) < SETTLE_PIXELS
+        if arrived:
+            new_x, new_y = target_x, target_y
+        moved = self.scroll_view_to(new_x, new_y)
+        self.notify_view_changed()
         
-        # Update position tracking
-        self.position = (x, y)
+        if arrived or not moved:
+            # There, or stuck at the edge of the scroll region
+            self.follow_target = None
+            return
+        # Keep the frame rate: the time this frame took comes off the wait
+        spent_ms = (time.perf_counter() - now) * 1000
+        self._follow_timer = self.canvas.after(max(1, int(FRAME_MS - spent_ms)), self._follow_frame)
+    
+    @staticmethod
+    def _follow_step(distance, step):
+        """Part of the distance to move this frame, at least a whole pixel (the view scrolls in pixels)"""
+        move = distance * step
+        if abs(move) < 1:
+            move = max(-1.0, min(1.0, distance))
+        return move
+    
+    def scroll_view_to(self, view_x, view_y):
+        """Scroll so the view's top left corner is at a canvas position, False if the view did not move"""
+        region = self.canvas.cget('scrollregion')
+        if not region:
+            return False
+        x1, y1, x2, y2 = (float(v) for v in str(region).split())
+        before = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        if x2 > x1:
+            self.canvas.xview_moveto((view_x - x1) / (x2 - x1))
+        if y2 > y1:
+            self.canvas.yview_moveto((view_y - y1) / (y2 - y1))
+        return (self.canvas.canvasx(0), self.canvas.canvasy(0)) != before
     
     def fit_to_content(self, padding=50):
         """Fit all content in view with proper zoom and centering"""
-        bbox = self.canvas.bbox("all")
+        self.stop_follow()
+        bbox = self.world_bounds
         if not bbox:
             return
         
@@ -196,7 +309,7 @@ class Camera:
             self.canvas.after(50, lambda: self.fit_to_content(padding))
             return
         
-        # Content bounds
+        # Content bounds (world coordinates)
         x1, y1, x2, y2 = bbox
         content_width = x2 - x1
         content_height = y2 - y1
@@ -204,52 +317,29 @@ class Camera:
         if content_width <= 0 or content_height <= 0:
             return
         
-        # Reset to zoom 1.0 first to get accurate measurements
-        if self.zoom != 1.0:
-            self.canvas.scale("all", 0, 0, 1/self.zoom, 1/self.zoom)
-            self.zoom = 1.0
-        
         # Calculate zoom needed to fit content with padding
         scale_x = (canvas_width - padding * 2) / content_width
         scale_y = (canvas_height - padding * 2) / content_height
-        new_zoom = min(scale_x, scale_y, 2.0)  # Cap at 2.0 to avoid too much zoom
-        
-        # Apply zoom from origin (0,0)
-        if new_zoom != 1.0:
-            self.canvas.scale("all", 0, 0, new_zoom, new_zoom)
-            self.zoom = new_zoom
+        self.zoom = max(0.001, min(scale_x, scale_y, 2.0))  # Cap at 2.0 to avoid too much zoom
         
-        # Get new bbox after scaling
-        new_bbox = self.canvas.bbox("all")
-        if new_bbox:
-            # Calculate offset to center content
-            content_center_x = (new_bbox[0] + new_bbox[2]) / 2
-            content_center_y = (new_bbox[1] + new_bbox[3]) / 2
-            canvas_center_x = canvas_width / 2
-            canvas_center_y = canvas_height / 2
-            
-            # Move to center
-            offset_x = canvas_center_x - content_center_x
-            offset_y = canvas_center_y - content_center_y
-            self.canvas.move("all", offset_x, offset_y)
+        # Put the content center in the middle of the view
+        canvas_center_x = self.canvas.canvasx(canvas_width / 2)
+        canvas_center_y = self.canvas.canvasy(canvas_height / 2)
+        self.offset = (canvas_center_x - self.zoom * (x1 + x2) / 2,
+                       canvas_center_y - self.zoom * (y1 + y2) / 2)
         
         # Update scroll region with extra space for panning
-        final_bbox = self.canvas.bbox("all")
-        if final_bbox:
-            extra = 2000  # Extra space for panning
-            self.canvas.configure(scrollregion=(
-                final_bbox[0] - extra,
-                final_bbox[1] - extra,
-                final_bbox[2] + extra,
-                final_bbox[3] + extra
-            ))
+        self.update_scroll_region()
+        self.notify_view_changed()
     
     def reset_view(self):
         """Reset zoom and position"""
+        self.stop_follow()
         # Reset zoom
-        self.canvas.scale("all", 0, 0, 1/self.zoom, 1/self.zoom)
         self.zoom = 1.0
+        self.offset = (0.0, 0.0)
         
         # Reset position
         self.position = (0, 0)
-        self.update_scroll_region()
\ No newline at end of file
+        self.update_scroll_region()
+        self.notify_view_changed()
\ No newline at end of file
@@ -0,0 +1,60 @@
+# item_pool.py - Retained canvas items, reused across redraws and zone switches
+from core.counters import get_counter
+
+POOLED_TAG = "pooled"
+
+
+class ItemPool:
+    """
+    Free lists of hidden canvas items per item type.
+    acquire() revives a hidden item with coords()/itemconfig() instead of
+    creating a new one; release() hides items (and strips their tags) instead
+    of deleting them. Hidden items are ignored by bbox and find, so the rest
+    of the map code does not see them. Callers pass every option that differs
+    between uses (fill, tags, arrow, width, text...) on each acquire.
+    Reuses count as hits and creations as misses of the 'canvas_items' counter.
+    """
+
+    def __init__(self, canvas, max_free=20000):
+        self.canvas = canvas
+        self.max_free = max_free  # per item type, beyond that released items are deleted
+        self.free = {}            # item type -> [hidden item ids]
+        self.type_of = {}         # item id -> item type
+        self.counter = get_counter('canvas_items')
+
+    def acquire(self, item_type, coords, **options):
+        """Get a visible item of a type ('line', 'polygon', 'rectangle', 'text') at coords"""
+        free = self.free.get(item_type)
+        if free:
+            item = free.pop()
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfig(item, state='normal', **options)
+            self.counter.hits += 1
+            return item
+        item = getattr(self.canvas, f"create_{item_type}")(*coords, **options)
+        self.type_of[item] = item_type
+        self.counter.misses += 1
+        return item
+
+    def release(self, items):
+        """Hide items and keep them for reuse"""
+        canvas = self.canvas
+        surplus = []
+        for item in items:
+            item_type = self.type_of.get(item)
+            if item_type is None:
+                surplus.append(item)  # not from the pool
+                continue
+            free = self.free.setdefault(item_type, [])
+            if len(free) >= self.max_free:
+                del self.type_of[item]
+                surplus.append(item)
+                continue
+            canvas.itemconfig(item, state='hidden', tags=(POOLED_TAG,))
+            free.append(item)
+        if surplus:
+            canvas.delete(*surplus)
+            self.counter.evictions += len(surplus)
+
+    def free_count(self):
+        return sum(len(free) for free in self.free.values())
@@ -1,10 +1,13 @@
 #map.py
 import os
+import time
 import tkinter as tk
 import configparser
 
 from tkinter import ttk
 from core.fast_database import get_database
+from core.storage import get_storage
+from core.counters import get_histogram
 
 # Get database instance
 _db = get_database()
@@ -15,21 +18,30 @@ def fetch_rooms(zone_id, z=None):
     return _db.get_rooms_in_zone(zone_id, z_level=z)
 
 fetch_zones = _db.get_all_zones
-fetch_exits_with_zone_info = _db.get_exits_with_zone_info
 fetch_room_name = _db.get_room_name
 fetch_room_position = _db.get_room_position
 fetch_zone_name = _db.get_zone_name
 import map.camera
 from gui.tooltip import ToolTip
 from map.room_customization import RoomCustomization, RoomCustomizationDialog
+from map.zone_renderer import ZoneRenderer
+from map.item_pool import ItemPool
+from map.zone_tiles import ZoneTiles
+from map.world_overview import WorldOverview
+from map.minimap import Minimap
+from map.path_overlay import PathOverlay
+from map.render_cache import ZoneRenderCache
+from core.pathfinding import CostModel, ZoneRouter
+from core.landmarks import LandmarkIndex, format_steps
+from core.jump_index import JumpIndex
+from core.description_search import DescriptionIndex, DescriptionSearch
+from core.room_query import QUERY_HELP, build_room_predicate
+from core.route_planner import plan_visit_order
 
-def calculate_direction(from_pos, to_pos):
-    dir_x = to_pos[0] - from_pos[0]
-    dir_y = to_pos[1] - from_pos[1]
-    mag = (dir_x**2 + dir_y**2) ** 0.5
-    if mag == 0:
-        return 0, 0
-    return dir_x / mag, dir_y / mag
+# Canvas distance the crosshair lines reach beyond the zone bounds
+POSITION_INDICATOR_MARGIN = 5000
+# The camera follows the player once their room is closer than this part of the view to its edge
+FOLLOW_EDGE = 0.2
 
 class MapViewer:
     def __init__(self, parent, pane, root, theme_manager=None):
@@ -57,8 +69,50 @@ class MapViewer:
         self.this.pack(fill=tk.BOTH, expand=True)
         self.camera = map.camera.Camera(self.this)  # Keep camera for manual zoom
         
+        # Viewport culled drawing with pooled canvas items, refreshed after every pan/zoom and resize
+        self.item_pool = ItemPool(self.this)
+        # Zoomed out zones are shown as pre-rendered images when Pillow is installed
+        self.zone_tiles = ZoneTiles(_db)
+        self.zone_renderer = ZoneRenderer(self)
+        # Autowalk route over the zone, trimmed step by step
+        self.path_overlay = PathOverlay(self)
+        self._render_pending = None
+        self.position_items = None      # crosshair lines (horizontal, vertical), created on first use
+        self.position_visible = False
+        self.camera.on_view_changed = self.schedule_render
+        self.this.bind("<Configure>", lambda e: self.schedule_render(), add='+')
+        # One hover handler for the whole map, rooms are resolved from the zone's spatial index
+        self.hovered_room = None
+        self.this.bind("<Motion>", self.on_canvas_motion, add='+')
+        self.this.bind("<Leave>", self.hide_room_name, add='+')
+        
         # Initialize room customization manager
         self.room_customization = RoomCustomization()
+        
+        # Prepared zone geometry, cached per (zone, level)
+        self.render_cache = ZoneRenderCache(_db, self.room_customization)
+        
+        # All zones of a level stitched together (Ctrl+W), zone geometry streamed in as needed
+        self.world_overview = WorldOverview(self, _db)
+        
+        # Landmark step tables (computed in the background) for distance estimates
+        try:
+            home_zone = int(self.default_zone)
+        except (TypeError, ValueError):
+            home_zone = None
+        self.landmarks = LandmarkIndex(_db, home_zone=home_zone)
+        self.landmarks.start()
+
+        # Fuzzy zone/room name index for the jump palette (Ctrl+G)
+        self.jump_index = JumpIndex(_db)
+        self.jump_index.start()
+
+        # Word index of room descriptions for the room search (Ctrl+F)
+        self.description_index = DescriptionIndex(_db)
+        self.description_index.start()
+
+        # Weighted zone/gateway router used by autowalk
+        self.zone_router = ZoneRouter(_db, self.build_cost_model(), self.landmarks)
 
         self.level_var = tk.StringVar()
         self.level_var.set(f"Level: {self.current_level}")
@@ -78,6 +132,12 @@ class MapViewer:
         self.this.bind("<Control-f>", lambda e: self.show_room_search_dialog())
         # Bind Ctrl+I for item search
         self.this.bind("<Control-i>", lambda e: self.show_item_search_dialog())
+        # Bind Ctrl+N to walk to the nearest matching room
+        self.this.bind("<Control-n>", lambda e: self.show_nearest_dialog())
+        # Bind Ctrl+G to jump to a zone or room by name
+        self.this.bind("<Control-g>", lambda e: self.show_jump_palette())
+        # Bind Ctrl+W to toggle the world overview
+        self.this.bind("<Control-w>", lambda e: self.toggle_world_overview())
         # Focus canvas to receive keyboard events
         self.this.focus_set()
 
@@ -88,6 +148,10 @@ class MapViewer:
         # Use tk.Frame for theme support
         zone_listbox_frame = tk.Frame(self.pane, width=200, bg=self.background_color)
         
+        # Whole-zone minimap above the zone list
+        self.minimap = Minimap(zone_listbox_frame, self)
+        self.minimap.canvas.pack(side=tk.TOP, pady=(0, 4))
+        
         # Apply theme to listbox
         listbox_bg = self.background_color
         listbox_fg = "#FFFFFF" if self.background_color[1] < '5' else "#000000"  # Auto contrast
@@ -133,6 +197,7 @@ class MapViewer:
         config_file_path = os.path.join(os.path.dirname(__file__), '../config/settings.ini')
         config = configparser.ConfigParser()
         config.read(config_file_path)
+        self.config = config
 
         # Load defaults from config
         self.player_marker_color = config['Visuals']['PlayerMarkerColor']
@@ -248,8 +313,27 @@ class MapViewer:
         item_search_btn.bind("<Button-1>", lambda e: self.show_item_search_dialog())
         self._add_tooltip(item_search_btn, "Search Items (Ctrl+I)")
         
+        # Walk to nearest button
+        nearest_btn = tk.Canvas(toolbar, width=25, height=25, highlightthickness=0, bg=bg_color)
+        nearest_btn.pack(side=tk.LEFT, padx=3)
+        # Draw a target icon
+        nearest_btn.create_oval(5, 5, 20, 20, outline=fg_color, width=2)
+        nearest_btn.create_oval(10, 10, 15, 15, outline=fg_color, width=1)
+        nearest_btn.bind("<Button-1>", lambda e: self.show_nearest_dialog())
+        self._add_tooltip(nearest_btn, "Walk to Nearest (Ctrl+N)")
+        
+        # World overview button
+        world_btn = tk.Canvas(toolbar, width=25, height=25, highlightthickness=0, bg=bg_color)
+        world_btn.pack(side=tk.LEFT, padx=3)
+        # Draw a globe icon
+        world_btn.create_oval(4, 4, 21, 21, outline=fg_color, width=2)
+        world_btn.create_oval(9, 4, 16, 21, outline=fg_color, width=1)
+        world_btn.create_line(4, 12, 21, 12, fill=fg_color, width=1)
+        world_btn.bind("<Button-1>", lambda e: self.toggle_world_overview())
+        self._add_tooltip(world_btn, "World Overview (Ctrl+W)")
+        
         # Simple hover effect for all buttons
-        for btn in [find_btn, location_btn, room_search_btn, item_search_btn]:
+        for btn in [find_btn, location_btn, room_search_btn, item_search_btn, nearest_btn, world_btn]:
             self._add_hover_effect(btn, hover_color, fg_color)
     
     def _add_hover_effect(self, canvas, hover_color, normal_color):
@@ -326,6 +410,9 @@ class MapViewer:
         widget.bind("<Leave>", on_leave, add='+')
 
     def display_zone(self, zone_id, auto_fit=True):
+        if self.world_overview.active:
+            self.world_overview.hide()
+        
         # Save camera state for previous zone before switching
         if self.displayed_zone_id and self.displayed_zone_id != zone_id:
             print(f"[MAP] Saving camera state for zone {self.displayed_zone_id} (level {self.current_level})")
@@ -343,11 +430,10 @@ class MapViewer:
         print(f"[MAP] Trying to restore camera state for zone {zone_id} (level {self.current_level})")
         has_saved_state = self.camera.restore_zone_state(zone_key)
         
-        # Now draw the map
-        self.this.delete("all")
-        rooms = fetch_rooms(zone_id, z=self.current_level)
-        exits_info = self.exits_with_zone_info([room[0] for room in rooms])
-        self.draw_map(rooms, exits_info)
+        # Now draw the map (the renderer hands the old zone's items back to the pool)
+        self.hide_position_indicator()
+        model = self.render_cache.get(zone_id, self.current_level)
+        self.draw_map(model)
         
         # Apply pending view transformations after drawing
         if has_saved_state:
@@ -373,6 +459,12 @@ class MapViewer:
 
 
     def change_level(self, delta):
+        if self.world_overview.active:
+            self.current_level += delta
+            self.level_var.set(f"Level: {self.current_level}")
+            self.show_world_overview()
+            return
+        
         # Save camera state for current level before changing
         if self.displayed_zone_id:
             zone_key = f"{self.displayed_zone_id}_{self.current_level}"
@@ -397,124 +489,35 @@ class MapViewer:
             self.parent.last_command = 'l'
             self.parent.connection.send('l')
 
-    def exits_with_zone_info(self, from_obj_ids):
-        exits_info = fetch_exits_with_zone_info(from_obj_ids)
-        detailed_exits_info = []
-        for from_id, to_id, to_zone_id in exits_info:
-            from_pos = fetch_room_position(from_id)
-            to_pos = fetch_room_position(to_id)
-            if from_pos and to_pos:
-                # Extract x, y coordinates from position tuples
-                from_xy = (from_pos[0], from_pos[1])
-                to_xy = (to_pos[0], to_pos[1])
-                dir_x, dir_y = calculate_direction(from_xy, to_xy)
-                detailed_exits_info.append((from_id, to_id, to_zone_id, dir_x, dir_y))
-            else:
-                pass
-        return detailed_exits_info
-
-    def create_rounded_rectangle(self, x1, y1, x2, y2, radius=25, **kwargs):
-        return self.this.create_polygon([x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y2-radius, x2, y2, x2-radius, y2, x1+radius, y2, x1, y2, x1, y2-radius, x1, y1+radius, x1, y1], **kwargs, smooth=True)
-
-    def draw_room_with_shadow(self, x, y, room_id, room_name):
-        box_size = 20
-        shadow_offset = 6
-        tag_id = str(room_id)
-
-        # Shadow with theme-aware color
-        shadow_tag = f"{tag_id}_shadow"
-        shadow_color = "#202020" if hasattr(self, 'background_color') and self.background_color[1] < '5' else "gray80"
-        self.create_rounded_rectangle(x - box_size + shadow_offset, y - box_size + shadow_offset,
-                                      x + box_size + shadow_offset, y + box_size + shadow_offset, radius=10,
-                                      fill=shadow_color, tags=(shadow_tag,))
-        room_tag = f"{tag_id}_room"
-        
-        # Check for custom color, otherwise use theme color
-        custom = self.room_customization.get_room_customization(room_id)
-        room_fill_color = custom.get('color', self.room_color)
-        
-        self.create_rounded_rectangle(x - box_size, y - box_size, x + box_size, y + box_size, radius=10,
-                                      fill=room_fill_color, tags=(room_tag,))
-        
-        # Add custom note indicator if note exists
-        if custom.get('note'):
-            # Use N instead of emoji for better compatibility
-            note_indicator = self.this.create_text(x + box_size - 5, y - box_size + 5, 
-                                                  text="N", font=('Arial', 8, 'bold'), 
-                                                  fill=self.note_color,
-                                                  tags=(f"{tag_id}_note",))
-        
-        self.this.tag_bind(room_tag, "<Enter>", lambda e, id=room_id: self.show_room_name(e, id, e.x, e.y))
-        self.this.tag_bind(room_tag, "<Leave>", self.hide_room_name)
-
-    def draw_exits(self, rooms, exits):
-        bidirectional = set()
-        exits_tuples = {(exit[0], exit[1]) for exit in exits}
-
-        for from_id, to_id in exits_tuples:
-            if (to_id, from_id) in exits_tuples:
-                bidirectional.add((from_id, to_id))
-
-        for from_id, to_id in exits_tuples:
-            from_pos = next((room[1:3] for room in rooms if room[0] == from_id), None)
-            to_pos = next((room[1:3] for room in rooms if room[0] == to_id), None)
-            if from_pos and to_pos:
-                line_color = getattr(self, 'connection_color', self.room_color)
-                if (from_id, to_id) in bidirectional:
-                    self.this.create_line(from_pos[0], from_pos[1], to_pos[0], to_pos[1], fill=line_color, width=2)
-                else:
-                    self.this.create_line(from_pos[0], from_pos[1], to_pos[0], to_pos[1], arrow=tk.LAST, fill=line_color, width=2)
-    def draw_map(self, rooms, exits_info):
-        total_x, total_y, count = 0, 0, 0
-        room_size = 20
-        shadow_offset = 6
-        extra_padding = 10
-        offset = room_size + shadow_offset + extra_padding
-        min_x, min_y, max_x, max_y = float('inf'), float('inf'), float('-inf'), float('-inf')
-
-        # Draw exits first (behind rooms)
-        self.draw_exits(rooms, [exit[:2] for exit in exits_info])
-        
-        # Draw rooms on top
-        for room_id, x, y, z, name in rooms:
-            # Handle None z-values as level 0
-            if z is None:
-                z = 0
-            if z != self.current_level:
-                continue
-            self.draw_room_with_shadow(x, y, str(room_id), name)
-            min_x, min_y = min(min_x, x - offset), min(min_y, y - offset)
-            max_x, max_y = max(max_x, x + offset), max(max_y, y + offset)
-            total_x += x
-            total_y += y
-            count += 1
+    def draw_map(self, model):
+        # Rooms, exits and notes are materialized by the renderer for the visible area
+        self.zone_renderer.set_model(model)
+        self.path_overlay.release()  # laid out again for this zone on the next render
+        self.camera.world_bounds = model.bounds
+        self.drawn_bounds = model.bounds or (float('inf'), float('inf'), float('-inf'), float('-inf'))
+        self.minimap.set_model(model)
+        self.minimap.update_player(self.current_room_id)
+        self.schedule_render()
 
-        self.drawn_bounds = (min_x, min_y, max_x, max_y)
-        
-        # Draw zone change notes
-        for exit_info in exits_info:
-            from_id, to_id, to_zone_id, _, _ = exit_info
-            if to_zone_id != self.displayed_zone_id:
-                to_zone_name = fetch_zone_name(to_zone_id)
-                from_room_position = fetch_room_position(from_id)
-                if from_room_position:
-                    x = from_room_position[0]
-                    y = from_room_position[1]
-                    self.place_zone_change_note(x, y, to_zone_name)
-        
-        # Store bounds for reference
-        if count > 0:
-            self.drawn_bounds = (min_x, min_y, max_x, max_y)
-            # Camera will handle fitting in display_zone
-
-    def place_zone_change_note(self, x, y, zone_name):
-        note_text = f"To {zone_name}"
-        # Add zone_note tag to enable double-click functionality
-        zone_id = self.zone_dict.get(zone_name)
-        tags = ("zone_note", f"zone_{zone_id}") if zone_id else ("zone_note",)
-        self.this.create_text(x, y - 20, text=note_text, fill=self.note_color, 
-                              font=('Helvetica', '10', 'bold'), tags=tags)
+    def schedule_render(self):
+        """Refresh the culled items once the current burst of pan/zoom events is over"""
+        if self._render_pending is None:
+            self._render_pending = self.this.after(16, self.render_view)
 
+    def render_view(self):
+        self._render_pending = None
+        start = time.perf_counter()
+        if self.world_overview.active:
+            self.world_overview.update()
+        elif self.zone_renderer.update():
+            # Zoomed or recentered: the crosshair and the route follow
+            room_id = getattr(self, 'current_room_id', None)
+            if room_id:
+                self.update_position_indicator(room_id)
+            self.path_overlay.refresh()
+        if not self.world_overview.active:
+            self.minimap.update_view()
+        get_histogram('map_render').add((time.perf_counter() - start) * 1000)
 
     def get_room_tooltip_text(self, room_id):
         """Get tooltip text for a room, including custom note if exists"""
@@ -522,15 +525,70 @@ class MapViewer:
         custom = self.room_customization.get_room_customization(room_id)
         if custom.get('note'):
             room_name = f"{room_name}\n\nNote: {custom['note']}"
+        estimate = self.landmarks.estimate_steps(self.current_room_id, room_id)
+        if estimate and estimate != (0, 0):
+            room_name = f"{room_name}\nSteps from you: {format_steps(estimate)}"
         return room_name
 
+    def active_renderer(self):
+        """Whatever draws the rooms right now: the world overview or the zone renderer"""
+        return self.world_overview if self.world_overview.active else self.zone_renderer
+
+    def show_world_overview(self):
+        """Show all zones of the current level stitched together at their gateways"""
+        if self.displayed_zone_id:
+            self.camera.save_zone_state(f"{self.displayed_zone_id}_{self.current_level}")
+        self.displayed_zone_id = None
+        self.zone_renderer.release()
+        self.hide_position_indicator()
+        self.minimap.set_model(None)
+        self.path_overlay.release()
+        
+        zone_key = f"world_{self.current_level}"
+        self.camera.current_zone_id = zone_key
+        has_saved_state = self.camera.restore_zone_state(zone_key)
+        apply_view = self.camera.apply_pending_view if has_saved_state else self.camera.fit_to_content
+        if self.world_overview.show(self.current_level):
+            self.world_overview.on_layout_ready = None
+            apply_view()
+        else:
+            # Applied once the layout is built in the background
+            self.world_overview.on_layout_ready = apply_view
+        self.schedule_render()
+
+    def toggle_world_overview(self):
+        """Switch between the world overview and the player's (or last) zone"""
+        if not self.world_overview.active:
+            self.show_world_overview()
+            return
+        zone_id = None
+        if getattr(self, 'current_room_id', None):
+            zone_id = _db.get_room_zone(self.current_room_id)
+        zone_id = zone_id or getattr(self, 'last_zone_id', None)
+        if zone_id:
+            self.display_zone(zone_id)
+            if getattr(self, 'current_room_id', None):
+                self.this.after(100, lambda: self.highlight_room(str(self.current_room_id)))
+
+    def on_canvas_motion(self, event):
+        """Show the tooltip of the room under the cursor"""
+        room_id = self.active_renderer().room_at(self.this.canvasx(event.x), self.this.canvasy(event.y))
+        room_id = str(room_id) if room_id is not None else None
+        if room_id != self.hovered_room:
+            if self.hovered_room is not None:
+                self.hide_room_name(event)
+            self.hovered_room = room_id
+            if room_id is not None:
+                self.show_room_name(event, room_id, event.x, event.y)
+        elif room_id is not None:
+            self.update_tooltip_position(event, room_id, event.x, event.y)
+
     def show_room_name(self, event, room_id, event_x, event_y):
         room_name = self.get_room_tooltip_text(room_id)
         
         if room_id not in self.tooltips:
             self.tooltips[room_id] = ToolTip(self.this)
         self.tooltips[room_id].show_tip(room_name, event_x, event_y)
-        self.this.bind("<Motion>", lambda e: self.update_tooltip_position(e, room_id, e.x, e.y))
 
     def update_tooltip_position(self, event, room_id, event_x, event_y):
         if room_id in self.tooltips:
@@ -540,7 +598,7 @@ class MapViewer:
     def hide_room_name(self, event):
         for tooltip in self.tooltips.values():
             tooltip.hide_tip()
-        self.this.unbind("<Motion>")
+        self.hovered_room = None
 
     def on_zone_select(self, event):
         selection = event.widget.curselection()
@@ -616,49 +674,97 @@ class MapViewer:
                 self.zone_listbox.event_generate('<<ListboxSelect>>')
                 break
     
-    def show_room_search_dialog(self):
-        """Show dialog to search for rooms by description"""
-        import tkinter.simpledialog as simpledialog
-        from core.fast_database import get_database
-        
-        # Create search dialog
-        search_text = simpledialog.askstring(
-            "Search Rooms",
-            "Enter text to search in room descriptions:",
-            parent=self.this
-        )
-        
-        if not search_text:
-            return
-        
-        # Search in database
-        db = get_database()
-        search_lower = search_text.lower()
-        matches = []
-        
-        # Search through all room descriptions
-        for room_id, description in db.data["descriptions_index"]:
-            if description and search_lower in description.lower():
-                room = db.get_room(room_id)
-                if room:
-                    room_name = room.get("name", "Unknown")
-                    zone_id = room.get("zone_id")
-                    zone_name = db.get_zone_name(zone_id) if zone_id else "Unknown Zone"
-                    matches.append((room_id, room_name, zone_name, description[:100]))
-        
-        if not matches:
-            import tkinter.messagebox as messagebox
-            messagebox.showinfo("Search Results", f"No rooms found containing '{search_text}'")
+    def show_jump_palette(self):
+        """Jump box: type part of a zone name, room name or room id, Enter jumps there"""
+        palette = tk.Toplevel(self.root)
+        palette.title("Jump to")
+        palette.geometry("500x360")
+        palette.transient(self.root)
+
+        if self.theme_manager:
+            theme = self.theme_manager.get_theme()
+            bg_color = theme.get('bg', self.background_color)
+            fg_color = theme.get('fg', '#FFFFFF')
+        else:
+            bg_color = self.background_color
+            fg_color = '#FFFFFF' if bg_color[1] < '5' else '#000000'
+        palette.configure(bg=bg_color)
+
+        query_var = tk.StringVar()
+        entry = tk.Entry(palette, textvariable=query_var, bg=bg_color, fg=fg_color,
+                         insertbackground=fg_color, font=('Consolas', 11))
+        entry.pack(fill=tk.X, padx=10, pady=(10, 5))
+        listbox = tk.Listbox(palette, bg=bg_color, fg=fg_color, selectbackground=self.player_marker_color,
+                             selectforeground='#FFFFFF', font=('Consolas', 10), activestyle='none')
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        results = []
+
+        def update(event=None):
+            if event is not None and event.keysym in ('Up', 'Down', 'Return', 'Escape'):
+                return
+            results[:] = self.jump_index.search(query_var.get())
+            listbox.delete(0, tk.END)
+            for kind, item_id, label, zone_id in results:
+                if kind == 'zone':
+                    listbox.insert(tk.END, f"Zone  {label}")
+                else:
+                    zone_name = _db.get_zone_name(zone_id) if zone_id else '?'
+                    listbox.insert(tk.END, f"Room  {label}  [{zone_name}] #{item_id}")
+            if results:
+                listbox.selection_set(0)
+                listbox.activate(0)
+            elif not self.jump_index.is_ready():
+                listbox.insert(tk.END, "Indexing...")
+
+        def move(step):
+            if not results:
+                return "break"
+            selection = listbox.curselection()
+            index = min(max((selection[0] if selection else -1) + step, 0), len(results) - 1)
+            listbox.selection_clear(0, tk.END)
+            listbox.selection_set(index)
+            listbox.activate(index)
+            listbox.see(index)
+            return "break"
+
+        def choose(event=None):
+            selection = listbox.curselection()
+            if not results or not selection:
+                return "break"
+            kind, item_id, _, zone_id = results[selection[0]]
+            palette.destroy()
+            self.jump_to(kind, item_id, zone_id)
+            return "break"
+
+        entry.bind('<KeyRelease>', update)
+        entry.bind('<Up>', lambda e: move(-1))
+        entry.bind('<Down>', lambda e: move(1))
+        entry.bind('<Return>', choose)
+        listbox.bind('<Double-Button-1>', choose)
+        palette.bind('<Escape>', lambda e: palette.destroy())
+        entry.focus_set()
+
+    def jump_to(self, kind, item_id, zone_id):
+        """Show a zone, or a room's zone centered on the room"""
+        if not zone_id:
             return
-        
-        # Show results in a new window
-        self.show_search_results(matches, search_text)
-    
-    def show_search_results(self, matches, search_text):
-        """Display search results in a window"""
-        # Create results window
+        self.current_level = 0
+        if kind == 'room':
+            room = _db.get_room(item_id)
+            position = room.get('position') if room else None
+            if position:
+                self.current_level = position.get('z', 0)
+        self.level_var.set(f"Level: {self.current_level}")
+        self.display_zone(zone_id)
+        if kind == 'room':
+            self.this.after(100, lambda: self.highlight_room(str(item_id)))
+            self.this.after(200, lambda: self.center_on_room(str(item_id)))
+
+    def show_room_search_dialog(self):
+        """Room description search: results stream in ranked pages while typing"""
         results_window = tk.Toplevel(self.root)
-        results_window.title(f"Search Results: '{search_text}'")
+        results_window.title("Search Rooms")
         results_window.geometry("600x400")
         
         # Apply theme if available
@@ -671,6 +777,12 @@ class MapViewer:
             bg_color = self.background_color
             fg_color = '#FFFFFF' if bg_color[1] < '5' else '#000000'
         
+        # Query entry, searched as you type
+        query_var = tk.StringVar()
+        entry = tk.Entry(results_window, textvariable=query_var, bg=bg_color, fg=fg_color,
+                         insertbackground=fg_color, font=('Consolas', 11))
+        entry.pack(fill=tk.X, padx=10, pady=(10, 0))
+        
         # Create frame with scrollbar
         frame = tk.Frame(results_window, bg=bg_color)
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -690,43 +802,89 @@ class MapViewer:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         listbox.config(yscrollcommand=scrollbar.set)
         scrollbar.config(command=listbox.yview)
-        
-        # Add results to listbox
-        room_data = []
-        for room_id, room_name, zone_name, desc_preview in matches:
-            display_text = f"[{zone_name}] {room_name} - {desc_preview}..."
-            listbox.insert(tk.END, display_text)
-            room_data.append((room_id, zone_name))
-        
         listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Add info label
         info_label = tk.Label(
             results_window,
-            text=f"Found {len(matches)} rooms. Double-click to go to room.",
+            text="Type to search room descriptions.",
             bg=bg_color,
             fg=fg_color
         )
         info_label.pack(pady=5)
         
+        room_data = []  # (room_id, zone_name, room_name) per listbox line
+        state = {'search': None, 'shown': 0, 'timer': None}
+        
+        def update_info():
+            search = state['search']
+            if search is None:
+                info_label.config(text="Type to search room descriptions.")
+            elif not search.done.is_set() or state['shown'] < len(search.pages):
+                info_label.config(text=f"Searching... {len(room_data)} rooms so far")
+            elif not room_data:
+                info_label.config(text=f"No rooms found containing '{search.query}'")
+            else:
+                info_label.config(text=f"Found {len(room_data)} rooms. Double-click to go to room.")
+        
+        def poll():
+            # Show one page per tick so long result lists never block the UI
+            search = state['search']
+            if search is None or not results_window.winfo_exists():
+                return
+            if state['shown'] < len(search.pages):
+                for room_id, room_name, zone_name, desc_preview, steps in search.pages[state['shown']]:
+                    display_text = f"{format_steps(steps):>7} [{zone_name}] {room_name} - {desc_preview}..."
+                    listbox.insert(tk.END, display_text)
+                    room_data.append((room_id, zone_name, room_name))
+                state['shown'] += 1
+            update_info()
+            if not search.done.is_set() or state['shown'] < len(search.pages):
+                results_window.after(30, poll)
+        
+        def run_search():
+            state['timer'] = None
+            if state['search'] is not None:
+                state['search'].cancel()
+            listbox.delete(0, tk.END)
+            room_data.clear()
+            state['shown'] = 0
+            query = query_var.get().strip()
+            state['search'] = None
+            if query:
+                state['search'] = DescriptionSearch(self.description_index, query, self.current_room_id).start()
+                poll()
+            update_info()
+        
+        def on_query_changed(*args):
+            # Wait for a pause in typing, a newer query cancels the running search
+            if state['timer'] is not None:
+                results_window.after_cancel(state['timer'])
+            state['timer'] = results_window.after(150, run_search)
+        
+        query_var.trace_add('write', on_query_changed)
+        entry.focus_set()
+        
+        def on_close():
+            if state['search'] is not None:
+                state['search'].cancel()
+            results_window.destroy()
+        
+        results_window.protocol("WM_DELETE_WINDOW", on_close)
+        results_window.bind('<Escape>', lambda e: on_close())
+        
         # Handle double-click to go to room
         def on_result_double_click(event):
             selection = listbox.curselection()
             if selection:
                 index = selection[0]
-                room_id, zone_name = room_data[index]
+                room_id = room_data[index][0]
                 
-                # Get zone_id from zone_name
-                zone_id = self.zone_dict.get(zone_name)
-                if zone_id:
-                    # Display the zone and highlight the room
-                    self.current_level = 0
-                    self.display_zone(zone_id)
-                    self.this.after(100, lambda: self.highlight_room(str(room_id)))
-                    self.this.after(200, lambda: self.center_on_room(str(room_id)))
+                # Display the room's zone and level and highlight the room
+                self.jump_to('room', room_id, _db.get_room_zone(room_id))
                 
                 # Close the search window
-                results_window.destroy()
+                on_close()
         
         listbox.bind('<Double-Button-1>', on_result_double_click)
         
@@ -746,8 +904,7 @@ class MapViewer:
                                      activeforeground='#FFFFFF')
                 
                 def delete_room():
-                    room_id, zone_name = room_data[index]
-                    room_name = matches[index][1]
+                    room_id, zone_name, room_name = room_data[index]
                     
                     # Confirmation dialog
                     from tkinter import messagebox
@@ -761,13 +918,13 @@ class MapViewer:
                         # Delete from database
                         db = _db
                         if db.delete_room(room_id):
+                            # Router caches, landmarks and the search index follow the graph rebuild on their own
                             # Remove from listbox
                             listbox.delete(index)
                             room_data.pop(index)
-                            matches.pop(index)
                             
                             # Update info label
-                            info_label.config(text=f"Found {len(matches)} rooms. Double-click to go to room.")
+                            update_info()
                             
                             # Refresh map if this room is in current zone
                             if self.displayed_zone_id:
@@ -782,6 +939,8 @@ class MapViewer:
                                                parent=results_window)
                 
                 context_menu.add_command(label="Delete Room", command=delete_room)
+                context_menu.add_command(label=f"Visit All {len(room_data)} Rooms",
+                                         command=lambda: self.visit_rooms([r[0] for r in room_data]))
                 context_menu.add_separator()
                 context_menu.add_command(label="Cancel", command=context_menu.destroy)
                 
@@ -794,8 +953,6 @@ class MapViewer:
     def show_item_search_dialog(self):
         """Show dialog to search for items/NPCs"""
         import tkinter.simpledialog as simpledialog
-        import json
-        import os
         from core.fast_database import get_database
         
         # Create search dialog
@@ -809,18 +966,10 @@ class MapViewer:
             return
         
         # Load items database
-        items_file = os.path.join(os.path.dirname(__file__), '../data/room_items.json')
-        
-        try:
-            if os.path.exists(items_file):
-                with open(items_file, 'r', encoding='utf-8') as f:
-                    items_data = json.load(f)
-            else:
-                import tkinter.messagebox as messagebox
-                messagebox.showinfo("No Items", "No items database found. Explore rooms to build it!")
-                return
-        except Exception as e:
-            print(f"[ITEM SEARCH] Error loading items: {e}")
+        items_data = get_storage().items('room_items')
+        if not items_data:
+            import tkinter.messagebox as messagebox
+            messagebox.showinfo("No Items", "No items database found. Explore rooms to build it!")
             return
         
         # Search for items
@@ -848,6 +997,48 @@ class MapViewer:
         # Show results
         self.show_item_search_results(matches, search_text)
     
+    def show_nearest_dialog(self):
+        """Ask what to look for and autowalk to the nearest room that has it"""
+        import tkinter.simpledialog as simpledialog
+        
+        query = simpledialog.askstring(
+            "Walk to Nearest",
+            f"Walk to the nearest room with:\n\n{QUERY_HELP}",
+            parent=self.this
+        )
+        
+        if query:
+            self.walk_to_nearest(query)
+    
+    def walk_to_nearest(self, query):
+        """Find the nearest room matching a query and hand it to autowalk"""
+        import tkinter.messagebox as messagebox
+        
+        if not self.current_room_id:
+            messagebox.showinfo("Walk to Nearest", "Current position is unknown.", parent=self.this)
+            return
+        
+        try:
+            predicate, description = build_room_predicate(
+                query, _db, self.room_customization.customizations)
+        except ValueError as e:
+            messagebox.showerror("Walk to Nearest", str(e), parent=self.this)
+            return
+        
+        result = self.zone_router.find_nearest(self.current_room_id, predicate)
+        if result is None:
+            messagebox.showinfo("Walk to Nearest", f"No reachable {description} found.", parent=self.this)
+            return
+        
+        room_id, path = result
+        print(f"[NEAREST] {description}: room {room_id}, {len(path)} steps away")
+        if not path:
+            messagebox.showinfo("Walk to Nearest", f"You are already in the nearest {description}.",
+                                parent=self.this)
+            return
+        # The search already found the route, autowalk starts on it without planning again
+        self.pathfind_to_room(room_id, path)
+    
     def show_item_search_results(self, matches, search_text):
         """Display item search results"""
         # Create results window
@@ -889,18 +1080,20 @@ class MapViewer:
                  foreground=[('selected', '#FFFFFF')])
         
         # Create treeview with columns
-        columns = ('Item/NPC', 'Location', 'Zone', 'Last Seen')
+        columns = ('Item/NPC', 'Location', 'Zone', 'Steps', 'Last Seen')
         tree = ttk.Treeview(main_frame, columns=columns, show='headings', height=20)
         
         # Define column headings and widths
         tree.heading('Item/NPC', text='Item/NPC Name')
         tree.heading('Location', text='Room')
         tree.heading('Zone', text='Zone')
+        tree.heading('Steps', text='Steps')
         tree.heading('Last Seen', text='Last Seen')
         
         tree.column('Item/NPC', width=250)
         tree.column('Location', width=200)
         tree.column('Zone', width=150)
+        tree.column('Steps', width=60)
         tree.column('Last Seen', width=150)
         
         # Add scrollbar
@@ -920,7 +1113,8 @@ class MapViewer:
                 time_str = "Unknown"
             
             # Insert with item name first
-            tree.insert('', 'end', values=(item_name, room_name, zone_name, time_str))
+            steps = format_steps(self.landmarks.estimate_steps(self.current_room_id, room_id))
+            tree.insert('', 'end', values=(item_name, room_name, zone_name, steps, time_str))
             item_data.append((room_id, zone_name, item_name))
         
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -1010,46 +1204,22 @@ class MapViewer:
                                           f"This action cannot be undone!",
                                           parent=results_window):
                         # Delete from database
-                        import json
-                        
-                        # Load current data
                         try:
-                            # Check if it's in items or NPCs
-                            with open('data/room_items.json', 'r') as f:
-                                items_data = json.load(f)
-                            with open('data/room_npcs.json', 'r') as f:
-                                npcs_data = json.load(f)
-                            
+                            storage = get_storage()
                             deleted = False
-                            room_key = str(room_id)
                             
-                            # Try to delete from items
-                            if room_key in items_data:
-                                items_list = items_data[room_key].get('items', [])
-                                if item_name in items_list:
-                                    items_list.remove(item_name)
-                                    if not items_list:
-                                        del items_data[room_key]
-                                    else:
-                                        items_data[room_key]['items'] = items_list
-                                    
-                                    with open('data/room_items.json', 'w') as f:
-                                        json.dump(items_data, f, indent=2)
-                                    deleted = True
-                            
-                            # Try to delete from NPCs if not found in items
-                            if not deleted and room_key in npcs_data:
-                                npcs_list = npcs_data[room_key].get('npcs', [])
-                                if item_name in npcs_list:
-                                    npcs_list.remove(item_name)
-                                    if not npcs_list:
-                                        del npcs_data[room_key]
-                                    else:
-                                        npcs_data[room_key]['npcs'] = npcs_list
-                                    
-                                    with open('data/room_npcs.json', 'w') as f:
-                                        json.dump(npcs_data, f, indent=2)
-                                    deleted = True
+                            # Try items first, then NPCs
+                            for namespace, key in (('room_items', 'items'), ('room_npcs', 'npcs')):
+                                room_data = storage.get(namespace, room_id)
+                                if not room_data or item_name not in room_data.get(key, []):
+                                    continue
+                                names = [name for name in room_data[key] if name != item_name]
+                                if names:
+                                    storage.put(namespace, room_id, dict(room_data, **{key: names}))
+                                else:
+                                    storage.delete(namespace, room_id)
+                                deleted = True
+                                break
                             
                             if deleted:
                                 # Remove from treeview
@@ -1070,6 +1240,8 @@ class MapViewer:
                                                parent=results_window)
                 
                 context_menu.add_command(label="Delete Item/NPC", command=delete_item)
+                context_menu.add_command(label="Visit All Result Rooms",
+                                         command=lambda: self.visit_rooms([r[0] for r in item_data]))
                 context_menu.add_separator()
                 context_menu.add_command(label="Cancel", command=context_menu.destroy)
                 
@@ -1095,53 +1267,43 @@ class MapViewer:
             self.this.itemconfig(room_tag, fill=fill_color)
     
     def update_position_indicator(self, room_id):
-        """Add crosshair lines at current position"""
-        self.this.delete("position_indicator")
-        
-        room_tag = f"{room_id}_room"
-        room_coords = self.this.bbox(room_tag)
+        """Move the crosshair lines to the current position (two persistent items, moved with coords)"""
+        center = self.zone_renderer.room_canvas_center(room_id)
+        if center is None:
+            self.hide_position_indicator()
+            return
+        x, y = center
+        
+        # Extend well beyond the zone, from its cached bounds instead of the canvas bbox
+        min_x, min_y, max_x, max_y = self.drawn_bounds
+        if min_x <= max_x:
+            min_x, min_y = self.camera.world_to_canvas(min_x, min_y)
+            max_x, max_y = self.camera.world_to_canvas(max_x, max_y)
+            min_x, min_y = min_x - POSITION_INDICATOR_MARGIN, min_y - POSITION_INDICATOR_MARGIN
+            max_x, max_y = max_x + POSITION_INDICATOR_MARGIN, max_y + POSITION_INDICATOR_MARGIN
+        else:
+            min_x, min_y = x - 2 * POSITION_INDICATOR_MARGIN, y - 2 * POSITION_INDICATOR_MARGIN
+            max_x, max_y = x + 2 * POSITION_INDICATOR_MARGIN, y + 2 * POSITION_INDICATOR_MARGIN
         
-        if room_coords:
-            x = (room_coords[0] + room_coords[2]) / 2
-            y = (room_coords[1] + room_coords[3]) / 2
-            
-            # Force update to get proper canvas bounds
-            self.this.update_idletasks()
-            
-            # Get full canvas bounds
-            canvas_bbox = self.this.bbox("all")
-            if canvas_bbox:
-                min_x, min_y, max_x, max_y = canvas_bbox
-                # Extend well beyond visible area
-                min_x -= 5000
-                max_x += 5000
-                min_y -= 5000
-                max_y += 5000
-            else:
-                min_x, min_y = x - 10000, y - 10000
-                max_x, max_y = x + 10000, y + 10000
-            
-            # Use theme-aware color
+        if self.position_items is None:
+            # Use theme-aware color (apply_theme recolors the items later on)
             color = getattr(self, 'crosshair_color', '#888888')
-            
-            self.this.create_line(
-                min_x, y,
-                max_x, y,
-                fill=color,
-                width=1,
-                tags=("position_indicator",)
-            )
-            
-            self.this.create_line(
-                x, min_y,
-                x, max_y,
-                fill=color,
-                width=1,
-                tags=("position_indicator",)
-            )
-            
+            self.position_items = (
+                self.this.create_line(min_x, y, max_x, y, fill=color, width=1, tags=("position_indicator",)),
+                self.this.create_line(x, min_y, x, max_y, fill=color, width=1, tags=("position_indicator",)))
             self.this.tag_lower("position_indicator")
-            self.this.tag_raise("connection", "position_indicator")
+        else:
+            horizontal, vertical = self.position_items
+            self.this.coords(horizontal, min_x, y, max_x, y)
+            self.this.coords(vertical, x, min_y, x, max_y)
+            if not self.position_visible:
+                self.this.itemconfig("position_indicator", state='normal')
+        self.position_visible = True
+
+    def hide_position_indicator(self):
+        if self.position_items is not None and self.position_visible:
+            self.this.itemconfig("position_indicator", state='hidden')
+        self.position_visible = False
 
     def highlight_room(self, room_id):
         # Ensure room_id is a string for tag matching
@@ -1164,6 +1326,9 @@ class MapViewer:
                     # Position changed successfully
                     print(f"[AUTO-WALK] Moved from {last_pos} to {current_pos}")
                     self.autowalk_waiting = False
+                    # Tour stops walked through on the way count as visited
+                    if getattr(self, 'autowalk_queue', None) and current_pos in self.autowalk_queue:
+                        self.autowalk_queue.remove(current_pos)
                     # Reset failed attempts since we made progress
                     if hasattr(self, 'autowalk_failed_attempts'):
                         self.autowalk_failed_attempts = {}
@@ -1173,8 +1338,8 @@ class MapViewer:
                     # Position didn't change - might have hit a wall
                     print(f"[AUTO-WALK] Position unchanged at {current_pos}, might be blocked")
         
-        # If no zone is displayed, we need to display it first
-        if not self.displayed_zone_id:
+        # If no zone is displayed, we need to display it first (the world overview shows them all)
+        if not self.displayed_zone_id and not self.world_overview.active:
             # Get the zone for this room and display it
             fetch_room_zone_id = _db.get_room_zone
             zone_id = fetch_room_zone_id(room_id)
@@ -1183,11 +1348,16 @@ class MapViewer:
                 self.display_zone(zone_id, auto_fit=False)
         
         room_tag = f"{room_id}_room"
+        # The player's room is drawn even when it is outside the culled view
+        self.zone_renderer.pin(room_id)
+        self.minimap.update_player(room_id)
+        self.path_overlay.advance(room_id)
         # Check if the room exists on canvas before trying to highlight
         if self.this.find_withtag(room_tag):
             highlight_color = getattr(self, 'player_marker_color', '#FF6EC7')
             self.this.itemconfig(room_tag, fill=highlight_color)
             self.update_position_indicator(room_id)
+            self.follow_room(room_id)
             
             # Don't auto-fit when highlighting - let manual zone selection control fitting
             # Mark that we've found a position
@@ -1199,6 +1369,8 @@ class MapViewer:
             player_zone = fetch_room_zone_id(room_id)
             if player_zone:
                 self.mark_player_zone_in_list(player_zone)
+                # Get the zones next door ready before we walk into them
+                self.render_cache.prefetch_neighbours(player_zone, self.current_level)
     
     def update_toolbar_canvas_colors(self, canvas, toolbar_theme):
         """Update colors of toolbar canvas icons when theme changes"""
@@ -1272,6 +1444,13 @@ class MapViewer:
         for item in self.this.find_withtag("position_indicator"):
             self.this.itemconfig(item, fill=self.crosshair_color)
         
+        # Zone images are drawn with the theme colors, pick the ones for the new theme
+        if hasattr(self, 'zone_renderer'):
+            self.schedule_render()
+        if hasattr(self, 'minimap') and self.displayed_zone_id:
+            self.minimap.set_model(self.zone_renderer.model)
+            self.minimap.update_player(self.current_room_id)
+        
         # Update zone listbox with theme
         if hasattr(self, 'zone_listbox'):
             listbox_fg = "#FFFFFF" if self.background_color[1] < '5' else "#000000"
@@ -1294,14 +1473,11 @@ class MapViewer:
         # Convert event coordinates to canvas coordinates
         canvas_x = self.this.canvasx(event.x)
         canvas_y = self.this.canvasy(event.y)
-        clicked_items = self.this.find_overlapping(canvas_x, canvas_y, canvas_x, canvas_y)
         
-        for item in clicked_items:
-            tags = self.this.gettags(item)
-            
-            # Check for zone note first (higher priority)
-            for tag in tags:
-                if tag.startswith("zone_"):
+        # Zone notes first (higher priority), only the few drawn note texts are checked
+        for item in self.this.find_overlapping(canvas_x, canvas_y, canvas_x, canvas_y):
+            for tag in self.this.gettags(item):
+                if tag.startswith("zone_") and tag != "zone_note":
                     try:
                         zone_id = int(tag.replace("zone_", ""))
                         # Open the clicked zone
@@ -1311,18 +1487,19 @@ class MapViewer:
                         return
                     except ValueError:
                         pass
-            
-            # Then check for room click (pathfinding)
-            for tag in tags:
-                if tag.endswith("_room"):
-                    try:
-                        target_room_id = int(tag.replace("_room", ""))
-                        self.pathfind_to_room(target_room_id)
-                        return
-                    except ValueError:
-                        pass
+        
+        # Then the room under the cursor (pathfinding)
+        target_room_id = self.active_renderer().room_at(canvas_x, canvas_y)
+        if target_room_id is not None:
+            self.pathfind_to_room(target_room_id)
+        elif self.world_overview.active:
+            # Open the zone that was double-clicked in the overview
+            zone_id = self.world_overview.zone_at(canvas_x, canvas_y)
+            if zone_id is not None:
+                self.display_zone(zone_id)
     
-    def pathfind_to_room(self, target_room_id):
+    def pathfind_to_room(self, target_room_id, path=None):
+        """Autowalk to a room, along path (commands from the current room) if already known"""
         if not hasattr(self, 'current_room_id') or not self.current_room_id:
             return
         
@@ -1337,60 +1514,58 @@ class MapViewer:
         print(f"[PATHFIND] Setting autowalk target to room {target}")
         
         # Start the autowalk process
-        self.send_next_walk_command()
+        self.send_next_walk_command(path)
     
-    def find_path(self, start, end):
-        from collections import deque
-        from core.fast_database import get_database
+    def visit_rooms(self, room_ids):
+        """Plan a visiting order for several rooms and autowalk through them"""
+        import threading
         
-        # Map exit types to direction commands
-        EXIT_TYPE_TO_COMMAND = {
-            0: "n",    # north
-            1: "ne",   # northeast  
-            2: "e",    # east
-            3: "se",   # southeast
-            4: "s",    # south
-            5: "sw",   # southwest
-            6: "w",    # west
-            7: "nw",   # northwest
-            8: "u",    # up
-            9: "d",    # down
-            10: "enter", # enter
-            11: "leave"  # leave
-        }
+        if not self.current_room_id:
+            print("[AUTO-WALK] Current position unknown, cannot plan a tour")
+            return
         
-        db = get_database()
-        queue = deque([(start, [])])
-        visited = {start}
+        start = int(self.current_room_id)
+        # Graph and costs taken together here: a rebuild meanwhile must not mix the two
+        graph, costs = self.zone_router.graph, self.zone_router.costs
+        result = {}
         
-        while queue:
-            current_room, path = queue.popleft()
-            
-            if current_room == end:
-                return path
-            
-            exits = db.get_exits_from_room(current_room)
-            for exit_info in exits:
-                next_room = exit_info["to"]
-                if next_room not in visited:
-                    visited.add(next_room)
-                    # Get command from mapping or use custom command if specified
-                    if exit_info.get("command"):
-                        direction = exit_info["command"]
-                    else:
-                        exit_type = exit_info.get("type", -1)
-                        direction = EXIT_TYPE_TO_COMMAND.get(exit_type, f"unknown_{exit_type}")
-                    new_path = path + [direction]
-                    queue.append((next_room, new_path))
+        def plan():
+            result['tour'] = plan_visit_order(graph, costs, start, room_ids)
+        
+        # Pairwise searches can take a while for many stops - keep the UI responsive
+        worker = threading.Thread(target=plan, daemon=True)
+        worker.start()
         
-        return None
+        def wait_for_plan():
+            if worker.is_alive():
+                self.this.after(100, wait_for_plan)
+                return
+            order, unreachable = result.get('tour', ([], []))
+            if unreachable:
+                print(f"[AUTO-WALK] Skipping {len(unreachable)} unreachable rooms")
+            if not order:
+                print("[AUTO-WALK] Nothing to visit")
+                return
+            print(f"[AUTO-WALK] Tour of {len(order)} rooms planned")
+            self.autowalk_queue = order[1:]
+            self.pathfind_to_room(order[0])
+        
+        wait_for_plan()
+    
+    def build_cost_model(self):
+        """Create the autowalk cost model from settings and avoided rooms"""
+        return CostModel.from_config(self.config, self.room_customization.get_route_flags())
+    
+    def find_path(self, start, end):
+        # Weighted hierarchical routing: plan on the zone/gateway graph, refine per zone
+        return self.zone_router.find_path(start, end)
     
     def execute_path(self, path):
         # Deprecated - we now recalculate path after each step
         # This is kept for backward compatibility but not used
         pass
     
-    def send_next_walk_command(self):
+    def send_next_walk_command(self, path=None):
         # Check if we have a target
         if not hasattr(self, 'autowalk_target') or not self.autowalk_target:
             return
@@ -1403,6 +1578,7 @@ class MapViewer:
         if not hasattr(self, 'current_room_id') or not self.current_room_id:
             print("[AUTO-WALK] Lost position, stopping")
             self.autowalk_target = None
+            self.path_overlay.clear()
             return
         
         current = int(self.current_room_id)
@@ -1412,6 +1588,8 @@ class MapViewer:
         if current == target:
             print(f"[AUTO-WALK] Reached target room {target}")
             self.autowalk_target = None
+            self.path_overlay.clear()
+            self.next_tour_stop()
             return
         
         # Check if we're stuck trying the same thing
@@ -1419,18 +1597,22 @@ class MapViewer:
             if self.autowalk_failed_attempts.get(current, 0) >= 3:
                 print(f"[AUTO-WALK] Failed 3 times from room {current}, giving up")
                 self.autowalk_target = None
+                self.path_overlay.clear()
                 self.autowalk_failed_attempts = {}
                 return
         else:
             self.autowalk_failed_attempts = {}
         
-        # Recalculate path from current position
-        print(f"[AUTO-WALK] Calculating path from {current} to {target}")
-        path = self.find_path(current, target)
+        # Recalculate path from current position (unless the caller just planned it)
+        if path is None:
+            print(f"[AUTO-WALK] Calculating path from {current} to {target}")
+            path = self.find_path(current, target)
         
         if not path:
             print(f"[AUTO-WALK] No path found from {current} to {target}")
             self.autowalk_target = None
+            self.path_overlay.clear()
+            self.next_tour_stop()
             return
         
         if hasattr(self, 'parent') and hasattr(self.parent, 'connection'):
@@ -1438,6 +1620,9 @@ class MapViewer:
             self.autowalk_last_position = current
             self.autowalk_last_command = path[0]
             
+            # Show the route; a re-plan that continues the shown route leaves it alone
+            self.path_overlay.show(self.zone_router.path_rooms(current, path))
+            
             # Take the first step of the recalculated path
             command = path[0]
             print(f"[AUTO-WALK] Sending: {command} (path length: {len(path)})")
@@ -1453,11 +1638,26 @@ class MapViewer:
             # Set a timeout in case position never updates (e.g., hit a wall)
             self.this.after(2000, self.check_autowalk_progress)
     
+    def next_tour_stop(self):
+        """Continue a multi-stop tour with the next room that is still unvisited"""
+        queue = getattr(self, 'autowalk_queue', None)
+        if not queue:
+            return
+        current = int(self.current_room_id) if self.current_room_id else None
+        while queue and queue[0] == current:
+            queue.pop(0)
+        if queue:
+            target = queue.pop(0)
+            print(f"[AUTO-WALK] Next stop: room {target} ({len(queue)} left after it)")
+            self.pathfind_to_room(target)
+    
     def stop_autowalk(self):
         """Stop the current autowalk"""
+        self.autowalk_queue = []
         if hasattr(self, 'autowalk_target'):
             print(f"[AUTO-WALK] Stopped (was heading to room {self.autowalk_target})")
             self.autowalk_target = None
+            self.path_overlay.clear()
             self.autowalk_waiting = False
             self.autowalk_last_position = None
             self.autowalk_failed_attempts = {}
@@ -1495,21 +1695,10 @@ class MapViewer:
         canvas_x = self.this.canvasx(event.x)
         canvas_y = self.this.canvasy(event.y)
         
-        # Find the closest item at click position
-        clicked_item = self.this.find_closest(canvas_x, canvas_y)
-        if clicked_item:
-            # Get all tags for the clicked item
-            tags = self.this.gettags(clicked_item)
-            
-            # Look for room tag
-            room_id = None
-            for tag in tags:
-                if tag.endswith('_room'):
-                    room_id = tag.replace('_room', '')
-                    break
-            
-            if room_id:
-                self.show_room_customization_dialog(room_id)
+        # Room under the cursor, from the zone's spatial index
+        room_id = self.active_renderer().room_at(canvas_x, canvas_y)
+        if room_id is not None:
+            self.show_room_customization_dialog(str(room_id))
     
     def show_room_customization_dialog(self, room_id):
         """Show dialog for customizing room"""
@@ -1517,13 +1706,15 @@ class MapViewer:
         current = self.room_customization.get_room_customization(room_id)
         current_note = current.get('note', '')
         current_color = current.get('color', None)
+        current_route = current.get('route', '')
         
         # Show dialog
         dialog = RoomCustomizationDialog(
             self.this,
             room_id,
             current_note,
-            current_color
+            current_color,
+            current_route
         )
         
         result = dialog.show()
@@ -1533,10 +1724,16 @@ class MapViewer:
             success = self.room_customization.set_room_customization(
                 room_id,
                 note=result['note'],
-                color=result['color']
+                color=result['color'],
+                route=result['route']
             )
             
             if success:
+                # Cached render models carry the room's color and note
+                self.render_cache.invalidate_zone(_db.get_room_zone(room_id))
+                # Avoided/forbidden rooms change the autowalk costs
+                if result['route'] != current_route:
+                    self.zone_router.set_cost_model(self.build_cost_model())
                 # Refresh the current zone to show changes
                 if self.displayed_zone_id:
                     self.display_zone(self.displayed_zone_id)
@@ -1554,15 +1751,27 @@ class MapViewer:
         """Let camera handle fitting content to view"""
         self.camera.fit_to_content()
     
+    def follow_room(self, room_id):
+        """Glide the view after the player's room once it nears the view's edge"""
+        center = self.zone_renderer.room_canvas_center(room_id)
+        width, height = self.this.winfo_width(), self.this.winfo_height()
+        if center is None or width <= 1 or height <= 1:
+            return
+        x, y = center
+        view_x, view_y = self.this.canvasx(0), self.this.canvasy(0)
+        edge = FOLLOW_EDGE * min(width, height)
+        inside = view_x + edge <= x <= view_x + width - edge and view_y + edge <= y <= view_y + height - edge
+        # While the camera is still gliding every move retargets it (speedwalks become one motion)
+        if self.camera.following or not inside:
+            self.camera.center_on_point(x, y)
+    
     def center_on_room(self, room_id):
         """Center the view on a specific room using camera"""
-        room_tag = f"{room_id}_room"
-        room_coords = self.this.bbox(room_tag)
+        # The room may be culled, so ask the renderer where it is
+        center = self.zone_renderer.room_canvas_center(room_id)
         
-        if room_coords:
-            # Get room center
-            room_x = (room_coords[0] + room_coords[2]) / 2
-            room_y = (room_coords[1] + room_coords[3]) / 2
+        if center:
+            room_x, room_y = center
             
             # Let camera handle centering
             self.camera.center_on_point(room_x, room_y)
\ No newline at end of file
@@ -0,0 +1,156 @@
+# minimap.py - Whole zone at a glance: one cached raster plus a viewport rectangle and the player dot
+import tkinter as tk
+from core.path_cache import LRUCache
+from map.zone_tiles import ZoneTiles
+
+# Edge length of the minimap panel (pixels)
+MINIMAP_SIZE = 180
+# Player dot radius (pixels)
+PLAYER_DOT = 3
+
+
+def zone_raster(model, size, colors):
+    """
+    Rows of Tk colors drawing a model's rooms and exit lines into size x size
+    pixels at most (aspect kept), plus the scale used.
+    colors holds 'background', 'room', 'connection' and the custom room colors.
+    """
+    x1, y1, x2, y2 = model.bounds
+    scale = (size - 1) / max(x2 - x1, y2 - y1, 1)
+    width = max(1, int((x2 - x1) * scale) + 1)
+    height = max(1, int((y2 - y1) * scale) + 1)
+    rows = [[colors['background']] * width for _ in range(height)]
+
+    connection = colors['connection']
+    for sx1, sy1, sx2, sy2, _ in model.segments:
+        ax, ay = (sx1 - x1) * scale, (sy1 - y1) * scale
+        bx, by = (sx2 - x1) * scale, (sy2 - y1) * scale
+        steps = int(max(abs(bx - ax), abs(by - ay))) + 1
+        for i in range(steps + 1):
+            t = i / steps
+            rows[int(ay + (by - ay) * t)][int(ax + (bx - ax) * t)] = connection
+
+    room_color = colors['room']
+    for room_id, x, y, _ in model.rooms:
+        style = model.styles.get(room_id)
+        rows[int((y - y1) * scale)][int((x - x1) * scale)] = style[0] if style and style[0] else room_color
+    return rows, scale
+
+
+class Minimap:
+    """
+    Small panel showing the whole displayed zone.
+    The zone is drawn once into a PhotoImage, cached per zone, level and
+    style (theme colors and room customizations), so it is only rebuilt when
+    one of those changes. Viewport and player are two canvas items that are
+    moved with coords, a pan or a step costs two coords calls.
+    Clicking or dragging on the minimap centers the map there.
+    """
+
+    def __init__(self, parent, viewer, size=MINIMAP_SIZE):
+        self.viewer = viewer
+        self.size = size
+        self.canvas = tk.Canvas(parent, width=size, height=size, highlightthickness=0,
+                                bg=viewer.background_color)
+        self.rasters = LRUCache(8, 'minimap')  # (zone, level, style version) -> (PhotoImage, scale)
+        self.model = None
+        self.scale = 1.0
+        self.origin = (0, 0)  # panel position of the zone bounds' top left corner
+        self.shown = set()    # overlay items currently visible, all start hidden
+        self.image_item = self.canvas.create_image(0, 0, anchor='nw', state='hidden')
+        self.view_item = self.canvas.create_rectangle(0, 0, 0, 0, outline=viewer.player_marker_color, width=1,
+                                                      state='hidden')
+        self.player_item = self.canvas.create_oval(0, 0, 0, 0, fill=viewer.player_marker_color, outline='',
+                                                   state='hidden')
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<B1-Motion>", self.on_click)
+
+    def colors(self):
+        viewer = self.viewer
+        colors = {'background': viewer.background_color,
+                  'room': viewer.room_color,
+                  'connection': getattr(viewer, 'connection_color', viewer.room_color)}
+        for style in self.model.styles.values():
+            if style[0]:
+                colors[style[0]] = style[0]
+        return colors
+
+    def set_model(self, model):
+        """Show a zone (None or an empty zone clears the panel)"""
+        self.model = model if model is not None and model.bounds else None
+        self.canvas.config(bg=self.viewer.background_color)
+        if self.model is None:
+            for item in (self.image_item, self.view_item, self.player_item):
+                self.show(item, False)
+            return
+        colors = self.colors()
+        key = (model.zone_id, model.level, ZoneTiles.style_version(model, colors))
+        raster = self.rasters.get(key)
+        if raster is None:
+            rows, scale = zone_raster(model, self.size, colors)
+            image = tk.PhotoImage(master=self.canvas, width=len(rows[0]), height=len(rows))
+            image.put(' '.join('{' + ' '.join(row) + '}' for row in rows))
+            raster = (image, scale)
+            self.rasters.put(key, raster)
+        image, self.scale = raster
+        self.origin = ((self.size - image.width()) // 2, (self.size - image.height()) // 2)
+        self.canvas.coords(self.image_item, *self.origin)
+        self.canvas.itemconfig(self.image_item, image=image)
+        self.show(self.image_item, True)
+        self.canvas.itemconfig(self.view_item, outline=self.viewer.player_marker_color)
+        self.canvas.itemconfig(self.player_item, fill=self.viewer.player_marker_color)
+        self.canvas.tag_raise(self.view_item)
+        self.canvas.tag_raise(self.player_item)
+
+    def to_panel(self, x, y):
+        """Panel position of a world point of the zone"""
+        return (self.origin[0] + (x - self.model.bounds[0]) * self.scale,
+                self.origin[1] + (y - self.model.bounds[1]) * self.scale)
+
+    # === OVERLAYS ===
+
+    def show(self, item, visible):
+        if visible != (item in self.shown):
+            self.canvas.itemconfig(item, state='normal' if visible else 'hidden')
+            if visible:
+                self.shown.add(item)
+            else:
+                self.shown.discard(item)
+
+    def update_view(self):
+        """Move the viewport rectangle to the map's visible area"""
+        if self.model is None:
+            return
+        viewer = self.viewer
+        map_canvas = viewer.this
+        width, height = map_canvas.winfo_width(), map_canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            return
+        camera = viewer.camera
+        x1, y1 = self.to_panel(*camera.canvas_to_world(map_canvas.canvasx(0), map_canvas.canvasy(0)))
+        x2, y2 = self.to_panel(*camera.canvas_to_world(map_canvas.canvasx(width), map_canvas.canvasy(height)))
+        self.canvas.coords(self.view_item, x1, y1, x2, y2)
+        self.show(self.view_item, True)
+
+    def update_player(self, room_id):
+        """Move the player dot to a room, hidden when the room is not in the shown zone"""
+        position = self.model.positions.get(int(room_id)) if self.model and room_id else None
+        if position is None:
+            self.show(self.player_item, False)
+            return
+        x, y = self.to_panel(*position)
+        self.canvas.coords(self.player_item, x - PLAYER_DOT, y - PLAYER_DOT, x + PLAYER_DOT, y + PLAYER_DOT)
+        self.show(self.player_item, True)
+
+    def on_click(self, event):
+        if self.model is None:
+            return
+        x = self.model.bounds[0] + (event.x - self.origin[0]) / self.scale
+        y = self.model.bounds[1] + (event.y - self.origin[1]) / self.scale
+        # Scroll there (no re-placing of the map's items while dragging)
+        camera = self.viewer.camera
+        camera.stop_follow()
+        canvas_x, canvas_y = camera.world_to_canvas(x, y)
+        map_canvas = self.viewer.this
+        camera.scroll_view_to(canvas_x - map_canvas.winfo_width() / 2, canvas_y - map_canvas.winfo_height() / 2)
+        camera.notify_view_changed()
@@ -0,0 +1,118 @@
+# path_overlay.py - Planned autowalk route drawn over the displayed zone, trimmed as it is walked
+import tkinter as tk
+
+# Line width and zone exit marker radius (pixels)
+PATH_WIDTH = 3
+EXIT_MARKER = 7
+
+
+class PathOverlay:
+    """
+    The autowalk route as polylines over the displayed zone, one per stretch
+    of the route inside the zone, with a ring where the route leaves it.
+    Items come from the viewer's ItemPool and are moved with coords:
+    walking along the route only cuts the walked rooms off the current
+    line, a re-planned route that continues the shown one changes nothing,
+    and zooming re-places the few items. The zone itself is never redrawn.
+    """
+
+    def __init__(self, viewer):
+        self.viewer = viewer
+        self.canvas = viewer.this
+        self.pool = viewer.item_pool
+        self.route = []        # room ids from the player's room to the target
+        self.position = 0      # index of the player's room in route
+        self.runs = []         # [start, end, line item or None, marker item or None] per stretch in the zone
+
+    def show(self, room_ids):
+        """Show a planned route (room ids, the player's room first)"""
+        room_ids = [int(room_id) for room_id in room_ids]
+        remaining = self.route[self.position:]
+        if room_ids and room_ids == remaining[-len(room_ids):] and len(room_ids) <= len(remaining):
+            # The same route, re-planned further along
+            self.advance(room_ids[0])
+            return
+        self.route = room_ids
+        self.position = 0
+        self.refresh()
+
+    def advance(self, room_id):
+        """The player reached a room: cut the walked part off the route"""
+        room_id = int(room_id)
+        if room_id not in self.route[self.position:]:
+            return  # Off route, autowalk re-plans and calls show
+        self.position = self.route.index(room_id, self.position)
+        transform = self.viewer.zone_renderer.drawn_transform
+        kept = []
+        for run in self.runs:
+            start, end, line, marker = run
+            if end < self.position:
+                self.pool.release([item for item in (line, marker) if item is not None])
+                continue
+            if start < self.position:
+                run[0] = start = self.position
+                if line is not None:
+                    if end - start >= 1 and transform:
+                        self.canvas.coords(line, *self._points(start, end, transform))
+                    else:
+                        self.pool.release([line])
+                        run[2] = None
+            kept.append(run)
+        self.runs = kept
+
+    def clear(self):
+        self.route = []
+        self.position = 0
+        self.release()
+
+    def release(self):
+        items = [item for _, _, line, marker in self.runs for item in (line, marker) if item is not None]
+        if items:
+            self.pool.release(items)
+        self.runs = []
+
+    def refresh(self):
+        """Lay the route out again for the displayed zone and the current transform"""
+        self.release()
+        viewer = self.viewer
+        model = viewer.zone_renderer.model
+        transform = viewer.zone_renderer.drawn_transform
+        if not self.route or model is None or transform is None or not viewer.displayed_zone_id:
+            return
+        positions = model.positions
+        route = self.route
+        color = getattr(viewer, 'player_marker_color', '#FF6EC7')
+        i = self.position
+        while i < len(route):
+            if route[i] not in positions:
+                i += 1
+                continue
+            start = i
+            while i + 1 < len(route) and route[i + 1] in positions:
+                i += 1
+            end = i
+            line = marker = None
+            if end > start:
+                arrow = tk.LAST if end == len(route) - 1 else 'none'
+                line = self.pool.acquire('line', self._points(start, end, transform), fill=color,
+                                         width=PATH_WIDTH, arrow=arrow, tags=("path_preview",))
+            if end + 1 < len(route):
+                # The route leaves the zone here
+                x, y = self._canvas_point(route[end], transform)
+                marker = self.pool.acquire('oval', (x - EXIT_MARKER, y - EXIT_MARKER, x + EXIT_MARKER, y + EXIT_MARKER),
+                                           outline=color, fill='', width=2, tags=("path_preview",))
+            self.runs.append([start, end, line, marker])
+            i += 1
+        if self.runs:
+            self.canvas.tag_raise("path_preview")
+
+    def _canvas_point(self, room_id, transform):
+        scale, ox, oy = transform
+        x, y = self.viewer.zone_renderer.model.positions[room_id]
+        return ox + scale * x, oy + scale * y
+
+    def _points(self, start, end, transform):
+        points = []
+        for room_id in self.route[start:end + 1]:
+            points.extend(self._canvas_point(room_id, transform))
+        return points
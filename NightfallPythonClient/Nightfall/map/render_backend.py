@@ -0,0 +1,265 @@
+# render_backend.py - Drawing backends of the map pipeline: the Tk canvas, or headless recording
+from collections import Counter
+from typing import Protocol
+from map.camera import Camera
+from core.storage import MEMORY_STORE, Storage
+from map.item_pool import ItemPool
+from map.zone_renderer import ZoneRenderer
+
+
+class RenderBackend(Protocol):
+    """
+    The canvas calls the map pipeline (ZoneRenderer, ItemPool, WorldOverview,
+    PathOverlay, Camera) makes. tk.Canvas provides all of them, so the
+    interactive client passes its canvas as is and the drawing path pays for
+    no wrapper. Headless runs pass a RecordingBackend instead.
+    """
+
+    # Items
+    def create_line(self, *coords, **options): ...
+    def create_polygon(self, *coords, **options): ...
+    def create_rectangle(self, *coords, **options): ...
+    def create_oval(self, *coords, **options): ...
+    def create_text(self, *coords, **options): ...
+    def create_image(self, *coords, **options): ...
+    def coords(self, item, *coords): ...
+    def itemconfig(self, item, **options): ...
+    def delete(self, *items): ...
+    def bbox(self, tag): ...
+    def tag_lower(self, tag, below=None): ...
+    def tag_raise(self, tag, above=None): ...
+
+    # View
+    def winfo_width(self): ...
+    def winfo_height(self): ...
+    def winfo_rgb(self, color): ...
+    def canvasx(self, x): ...
+    def canvasy(self, y): ...
+    def xview_moveto(self, fraction): ...
+    def yview_moveto(self, fraction): ...
+    def scan_mark(self, x, y): ...
+    def scan_dragto(self, x, y, gain=10): ...
+    def configure(self, **options): ...
+    def cget(self, option): ...
+
+    # Event loop
+    def bind(self, sequence, callback): ...
+    def after(self, ms, callback): ...
+    def after_cancel(self, timer): ...
+    def update_idletasks(self): ...
+
+
+class RecordingBackend:
+    """
+    Headless canvas of a given size (a RenderBackend).
+    Counts every call per method (calls) and the items created per type
+    (created). With keep_items the items are kept with their coords, state
+    and tags, so bbox and find_withtag answer like Tk; without it the backend
+    only hands out ids (no-op). after() callbacks wait in pending until
+    run_pending() is called.
+    """
+
+    def __init__(self, width=1200, height=800, keep_items=True):
+        self.width = width
+        self.height = height
+        self.keep_items = keep_items
+        self.calls = Counter()
+        self.created = Counter()
+        self.items = {}        # item id -> [type, coords, state, tags]
+        self.next_id = 0
+        self.view = (0.0, 0.0)
+        self.options = {'scrollregion': ''}
+        self.pending = {}      # timer id -> callback
+        self.next_timer = 0
+
+    # === ITEMS ===
+
+    def _create(self, item_type, coords, options):
+        self.calls['create_' + item_type] += 1
+        self.created[item_type] += 1
+        self.next_id += 1
+        if self.keep_items:
+            if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+                coords = coords[0]
+            tags = options.get('tags', ())
+            self.items[self.next_id] = [item_type, list(coords), options.get('state', 'normal'),
+                                        (tags,) if isinstance(tags, str) else tuple(tags)]
+        return self.next_id
+
+    def create_line(self, *coords, **options): return self._create('line', coords, options)
+    def create_polygon(self, *coords, **options): return self._create('polygon', coords, options)
+    def create_rectangle(self, *coords, **options): return self._create('rectangle', coords, options)
+    def create_oval(self, *coords, **options): return self._create('oval', coords, options)
+    def create_text(self, *coords, **options): return self._create('text', coords, options)
+    def create_image(self, *coords, **options): return self._create('image', coords, options)
+
+    def coords(self, item, *coords):
+        self.calls['coords'] += 1
+        entry = self.items.get(item)
+        if not coords:
+            return list(entry[1]) if entry else []
+        if entry:
+            if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+                coords = coords[0]
+            entry[1] = list(coords)
+
+    def itemconfig(self, item, **options):
+        self.calls['itemconfig'] += 1
+        for entry in self._entries(item):
+            if 'state' in options:
+                entry[2] = options['state']
+            if 'tags' in options:
+                tags = options['tags']
+                entry[3] = (tags,) if isinstance(tags, str) else tuple(tags)
+
+    itemconfigure = itemconfig
+
+    def delete(self, *items):
+        self.calls['delete'] += 1
+        for item in items:
+            if item == 'all':
+                self.items.clear()
+            elif isinstance(item, str):
+                for item_id in self.find_withtag(item):
+                    del self.items[item_id]
+            else:
+                self.items.pop(item, None)
+
+    def find_withtag(self, tag):
+        if tag == 'all':
+            return tuple(self.items)
+        if isinstance(tag, int):
+            return (tag,) if tag in self.items else ()
+        return tuple(item for item, entry in self.items.items() if tag in entry[3])
+
+    def bbox(self, tag):
+        """Bounds of the visible items with a tag, like Tk (hidden items are ignored)"""
+        xs, ys = [], []
+        for item in self.find_withtag(tag):
+            entry = self.items[item]
+            if entry[2] != 'hidden':
+                xs.extend(entry[1][0::2])
+                ys.extend(entry[1][1::2])
+        if not xs:
+            return None
+        return int(min(xs)), int(min(ys)), int(max(xs)) + 1, int(max(ys)) + 1
+
+    def visible_count(self):
+        return sum(1 for entry in self.items.values() if entry[2] != 'hidden')
+
+    def _entries(self, item):
+        if isinstance(item, str):
+            return [self.items[i] for i in self.find_withtag(item)]
+        entry = self.items.get(item)
+        return [entry] if entry else []
+
+    def tag_lower(self, tag, below=None): self.calls['tag_lower'] += 1
+    def tag_raise(self, tag, above=None): self.calls['tag_raise'] += 1
+    def bind(self, *args, **kwargs): pass
+
+    # === VIEW ===
+
+    def winfo_width(self): return self.width
+    def winfo_height(self): return self.height
+    def canvasx(self, x): return self.view[0] + x
+    def canvasy(self, y): return self.view[1] + y
+
+    def winfo_rgb(self, name):
+        if name.startswith('#') and len(name) == 7:
+            return tuple(int(name[i:i + 2], 16) * 257 for i in (1, 3, 5))
+        return 32896, 32896, 32896
+
+    def _region(self):
+        region = self.options.get('scrollregion')
+        return tuple(float(v) for v in str(region).split()) if region else None
+
+    def xview_moveto(self, fraction):
+        region = self._region()
+        if region:
+            self.view = (region[0] + fraction * (region[2] - region[0]), self.view[1])
+
+    def yview_moveto(self, fraction):
+        region = self._region()
+        if region:
+            self.view = (self.view[0], region[1] + fraction * (region[3] - region[1]))
+
+    def scan_mark(self, x, y):
+        self.mark = (x, y)
+
+    def scan_dragto(self, x, y, gain=1):
+        mark = getattr(self, 'mark', (0, 0))
+        self.view = (self.view[0] - (x - mark[0]) * gain, self.view[1] - (y - mark[1]) * gain)
+
+    def configure(self, **options):
+        if 'scrollregion' in options:
+            region = options['scrollregion']
+            options['scrollregion'] = ' '.join(str(v) for v in region) if region else ''
+        self.options.update(options)
+
+    config = configure
+
+    def cget(self, option):
+        return self.options.get(option, '')
+
+    def update_idletasks(self):
+        pass
+
+    # === EVENT LOOP ===
+
+    def after(self, ms, callback):
+        self.next_timer += 1
+        self.pending[self.next_timer] = callback
+        return self.next_timer
+
+    def after_cancel(self, timer):
+        self.pending.pop(timer, None)
+
+    def run_pending(self):
+        """Run the callbacks scheduled so far"""
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+
+
+class HeadlessViewer:
+    """
+    The parts of MapViewer a ZoneRenderer needs, over any backend, for
+    benchmarks and other runs without a display. render() draws a model the
+    way display_zone does: fitted to the view, or at a given zoom around
+    the zone's center. The camera keeps its zone states in an in-memory
+    Storage unless one is passed, so headless runs leave data/ alone.
+    """
+
+    def __init__(self, backend, zone_tiles=None, storage=None):
+        self.this = backend
+        self.background_color = 'white'
+        self.room_color = 'blue'
+        self.note_color = '#FFA500'
+        self.connection_color = '#808080'
+        self.player_marker_color = 'red'
+        self.camera = Camera(backend, storage=storage or Storage(MEMORY_STORE, legacy_dir=None))
+        self.item_pool = ItemPool(backend)
+        self.zone_tiles = zone_tiles
+        self.zone_renderer = ZoneRenderer(self)
+
+    def schedule_render(self):
+        pass  # render() updates right away
+
+    def render(self, model, zoom=None):
+        """Draw a model (fitted, or at zoom around its center), True if anything was drawn"""
+        renderer = self.zone_renderer
+        renderer.set_model(model)
+        camera = self.camera
+        camera.world_bounds = model.bounds
+        if not model.bounds:
+            return False
+        if zoom is None:
+            camera.fit_to_content()
+        else:
+            x1, y1, x2, y2 = model.bounds
+            camera.zoom = zoom
+            camera.offset = (self.this.canvasx(self.this.winfo_width() / 2) - zoom * (x1 + x2) / 2,
+                             self.this.canvasy(self.this.winfo_height() / 2) - zoom * (y1 + y2) / 2)
+            camera.update_scroll_region()
+        renderer.update()
+        return True
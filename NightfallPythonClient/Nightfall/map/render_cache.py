@@ -0,0 +1,112 @@
+# render_cache.py - ZoneRenderModels cached per (zone, level), neighbours built in the background
+import threading
+from core.path_cache import LRUCache
+from map.render_prep import prepare_zone, prepare_zone_arrays
+
+
+class ZoneRenderCache:
+    """
+    LRU of ZoneRenderModels keyed by (zone id, level).
+    Models of the zones next to the player's zone are built on a background
+    thread, so walking into them only has to emit canvas items.
+    The whole cache is dropped when the room graph is rebuilt; customizing a
+    room only drops the models of its zone.
+    """
+
+    def __init__(self, db, room_customization, max_models=24):
+        self.db = db
+        self.room_customization = room_customization
+        self.models = LRUCache(max_models, 'zone_render_models')
+        self.lock = threading.Lock()
+        self.prefetched_for = None
+        db.add_graph_listener(self.invalidate)
+
+    def build(self, zone_id, level):
+        """Build a model from the database (safe to call off the UI thread)"""
+        db = self.db
+        graph = db.get_graph()
+        geometry = db.get_zone_geometry()
+        if geometry is not None and geometry.graph is graph:
+            # A few array operations on the zone level's slice (NumPy)
+            model = prepare_zone_arrays(geometry, zone_id, level)
+        else:
+            rooms = db.get_rooms_in_zone(zone_id, z_level=level)
+            model = prepare_zone(graph, rooms, zone_id, level,
+                                 has_position=lambda room_id: db.get_room_position(room_id) is not None)
+
+        customization = self.room_customization
+        for room_id, _, _, _ in model.rooms:
+            custom = customization.get(room_id)
+            if custom and (custom.get('color') or custom.get('note')):
+                model.styles[room_id] = (custom.get('color'), bool(custom.get('note')))
+        for _, _, to_zone in model.notes:
+            if to_zone not in model.zone_names:
+                model.zone_names[to_zone] = db.get_zone_name(to_zone)
+        return model
+
+    def get(self, zone_id, level):
+        """Cached model of a zone level, built now if missing or outdated"""
+        key = (zone_id, level)
+        with self.lock:
+            model = self.models.get(key)
+        if model is None or model.graph is not self.db.get_graph():
+            model = self.build(zone_id, level)
+            with self.lock:
+                self.models.put(key, model)
+        return model
+
+    def cached(self, zone_id, level):
+        """Cached and current model of a zone level, None if it would have to be built"""
+        with self.lock:
+            model = self.models.get((zone_id, level))
+        if model is None or model.graph is not self.db.get_graph():
+            return None
+        return model
+
+    def invalidate(self):
+        """Drop all models (room graph changed)"""
+        with self.lock:
+            self.models.clear()
+            self.prefetched_for = None
+
+    def invalidate_zone(self, zone_id):
+        """Drop the models of one zone (a room in it was customized)"""
+        with self.lock:
+            for key in self.models.keys():
+                if key[0] == zone_id:
+                    self.models.pop(key)
+            self.prefetched_for = None
+
+    # === BACKGROUND PRECOMPUTATION ===
+
+    def prefetch_neighbours(self, zone_id, level):
+        """Build the models of zones reachable from this zone level in the background"""
+        if self.prefetched_for == (zone_id, level):
+            return
+        self.prefetched_for = (zone_id, level)
+        threading.Thread(target=self._prefetch, args=(zone_id, level), daemon=True).start()
+
+    def _prefetch(self, zone_id, level):
+        try:
+            model = self.get(zone_id, level)
+            # Level of each neighbouring zone = level of the room the exit leads into
+            targets = set()
+            for _, to_id, to_zone in model.cross_exits:
+                position = self.db.get_room_position(to_id)
+                if to_zone is not None and position:
+                    targets.add((to_zone, position[2] or 0))
+
+            built = 0
+            # Leave room in the cache for the zone on screen
+            for key in sorted(targets)[:self.models.max_size // 2]:
+                with self.lock:
+                    if key in self.models:
+                        continue
+                neighbour = self.build(*key)
+                with self.lock:
+                    self.models.put(key, neighbour)
+                built += 1
+            if built:
+                print(f"[MAP] Prepared {built} neighbouring zone models of zone {zone_id}")
+        except Exception as e:
+            print(f"[MAP] Background zone preparation failed: {e}")
@@ -0,0 +1,228 @@
+# render_prep.py - Zone render models prepared for drawing (rooms, exit lines, zone notes)
+from core.room_graph import NO_ZONE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # prepare_zone_arrays is only used with a ZoneGeometry, which needs NumPy
+
+# Room box half-size, corner radius and shadow offset
+ROOM_BOX = 20
+ROOM_RADIUS = 10
+SHADOW_OFFSET = 6
+# Room box plus shadow and padding, used for the drawn bounds
+ROOM_EXTENT = ROOM_BOX + SHADOW_OFFSET + 10
+
+
+def rounded_rect_points(x1, y1, x2, y2, radius):
+    """Polygon points of a rounded rectangle (drawn with smooth=True)"""
+    return [x1 + radius, y1, x2 - radius, y1, x2, y1, x2, y1 + radius, x2, y2 - radius, x2, y2,
+            x2 - radius, y2, x1 + radius, y2, x1, y2, x1, y2 - radius, x1, y1 + radius, x1, y1]
+
+
+def room_shapes(x, y):
+    """(shadow points, room points) of the rounded room box centered on a world point"""
+    return (rounded_rect_points(x - ROOM_BOX + SHADOW_OFFSET, y - ROOM_BOX + SHADOW_OFFSET,
+                                x + ROOM_BOX + SHADOW_OFFSET, y + ROOM_BOX + SHADOW_OFFSET, ROOM_RADIUS),
+            rounded_rect_points(x - ROOM_BOX, y - ROOM_BOX, x + ROOM_BOX, y + ROOM_BOX, ROOM_RADIUS))
+
+
+class ZoneRenderModel:
+    """
+    Everything display_zone needs to draw one zone level:
+      rooms       - [(room_id, x, y, name)]
+      positions   - {room_id: (x, y)}
+      shapes      - {room_id: (shadow points, room points)} rounded rectangles;
+                    left empty by prepare_zone_arrays (the renderer uses room_shapes)
+      segments    - [(x1, y1, x2, y2, bidirectional)] one per exit line to draw;
+                    two-way exits become a single line without arrow
+      notes       - [(x, y, to_zone_id)] one per room and neighbouring zone
+      cross_exits - [(from_id, to_id, to_zone_id)] exits leaving the zone
+      bounds      - (min_x, min_y, max_x, max_y) including room extents, None if empty
+      styles      - {room_id: (custom color or None, has note)} for customized rooms
+      zone_names  - {zone_id: name} of the zones the notes point to
+      index       - ZoneIndex spatial grids, built on first use by the renderer
+      chains      - segments merged into polylines for the low detail level, built on first use
+      arrays      - NumPy arrays of the room ids and positions for view culling
+                    (prepare_zone_arrays only, None otherwise)
+    Geometry comes from prepare_zone, styles and zone names are filled in by
+    the ZoneRenderCache. graph is the RoomGraph the model was built from.
+    """
+
+    __slots__ = ('zone_id', 'level', 'graph', 'rooms', 'positions', 'shapes', 'segments',
+                 'notes', 'cross_exits', 'bounds', 'styles', 'zone_names', 'index', 'chains', 'arrays')
+
+    def __init__(self, zone_id, level, graph=None):
+        self.zone_id = zone_id
+        self.level = level
+        self.graph = graph
+        self.rooms = []
+        self.positions = {}
+        self.shapes = {}
+        self.segments = []
+        self.notes = []
+        self.cross_exits = []
+        self.bounds = None
+        self.styles = {}
+        self.zone_names = {}
+        self.index = None
+        self.chains = None
+        self.arrays = None
+
+
+def prepare_zone(graph, rooms, zone_id, level=0, has_position=None):
+    """
+    Build the geometry of a zone level as a ZoneRenderModel.
+    rooms are (room_id, x, y, z, name) tuples as returned by get_rooms_in_zone,
+    graph is the CSR RoomGraph, has_position(room_id) tells whether a room in
+    another zone is placed on the map (notes only point to placed rooms).
+    Runs in O(rooms + exits): one id->(x, y) index, then one walk over the exits.
+    """
+    model = ZoneRenderModel(zone_id, level, graph)
+    positions = model.positions
+    shapes = model.shapes
+    min_x = min_y = float('inf')
+    max_x = max_y = float('-inf')
+
+    for room_id, x, y, z, name in rooms:
+        if (z or 0) != level:
+            continue
+        model.rooms.append((room_id, x, y, name))
+        positions[room_id] = (x, y)
+        shapes[room_id] = room_shapes(x, y)
+        min_x, min_y = min(min_x, x), min(min_y, y)
+        max_x, max_y = max(max_x, x), max(max_y, y)
+    if model.rooms:
+        model.bounds = (min_x - ROOM_EXTENT, min_y - ROOM_EXTENT,
+                           max_x + ROOM_EXTENT, max_y + ROOM_EXTENT)
+
+    room_ids = graph.room_ids
+    lines = {}       # (from_id, to_id) -> index in segments
+    noted = set()    # (from_id, to_zone_id)
+
+    for from_id, (x1, y1) in positions.items():
+        from_idx = graph.index_of.get(int(from_id))
+        if from_idx is None:
+            continue
+        for to_idx in graph.neighbours(from_idx):
+            to_id = room_ids[to_idx]
+            to_zone = graph.zone(to_idx)
+
+            if to_zone != zone_id:
+                model.cross_exits.append((from_id, to_id, to_zone))
+                key = (from_id, to_zone)
+                if key not in noted and (has_position is None or has_position(to_id)):
+                    noted.add(key)
+                    model.notes.append((x1, y1, to_zone))
+
+            to_pos = positions.get(to_id)
+            if to_pos is None or (from_id, to_id) in lines:
+                continue
+            reverse = lines.get((to_id, from_id))
+            if reverse is not None:
+                # Second direction of a two-way exit: turn the arrow into a plain line
+                segment = model.segments[reverse]
+                model.segments[reverse] = segment[:4] + (True,)
+                lines[(from_id, to_id)] = reverse
+            else:
+                lines[(from_id, to_id)] = len(model.segments)
+                model.segments.append((x1, y1, to_pos[0], to_pos[1], False))
+
+    return model
+
+
+def prepare_zone_arrays(geometry, zone_id, level=0):
+    """
+    prepare_zone from a ZoneGeometry: the rooms of the zone level are one
+    slice of its arrays, and bounds, exit lines and zone notes are computed
+    on whole arrays instead of room by room. Gives the same rooms, segments,
+    notes and cross exits (shapes are left to the renderer) and keeps the
+    room arrays on the model for the view culling of ZoneIndex.
+    """
+    model = ZoneRenderModel(zone_id, level, geometry.graph)
+    zone_id = int(zone_id)
+    indices = geometry.level_indices(zone_id, level)
+    count = len(indices)
+    if not count:
+        return model
+    ids, xs, ys = geometry.room_ids[indices], geometry.xs[indices], geometry.ys[indices]
+    id_list, x_list, y_list = ids.tolist(), xs.tolist(), ys.tolist()
+    model.rooms = list(zip(id_list, x_list, y_list, geometry.names[indices].tolist()))
+    model.positions = dict(zip(id_list, zip(x_list, y_list)))
+    model.bounds = (xs.min().item() - ROOM_EXTENT, ys.min().item() - ROOM_EXTENT,
+                    xs.max().item() + ROOM_EXTENT, ys.max().item() + ROOM_EXTENT)
+
+    source, targets = geometry.exits_from(indices)
+    target_zones = geometry.zone_of[targets]
+
+    # Exits into other zones, and one note per room and zone they lead to a placed room in
+    leaving = target_zones != zone_id
+    if leaving.any():
+        out_source, out_targets, out_zones = source[leaving], targets[leaving], target_zones[leaving]
+        model.cross_exits = [(from_id, to_id, None if to_zone == NO_ZONE else to_zone)
+                             for from_id, to_id, to_zone in zip(ids[out_source].tolist(),
+                                                                geometry.room_ids[out_targets].tolist(),
+                                                                out_zones.tolist())]
+        placed = geometry.placed[out_targets]
+        note_source, note_zones = out_source[placed], out_zones[placed]
+        if len(note_source):
+            _, first = np.unique(np.stack((note_source, note_zones), axis=1), axis=0, return_index=True)
+            first.sort()
+            note_source, note_zones = note_source[first], note_zones[first]
+            model.notes = [(x, y, None if to_zone == NO_ZONE else to_zone)
+                           for x, y, to_zone in zip(xs[note_source].tolist(), ys[note_source].tolist(),
+                                                    note_zones.tolist())]
+
+    # Exits inside the zone level: first exit of each room pair is the line, two-way if both exist
+    local = np.full(len(geometry.room_ids), -1, dtype=np.int64)
+    local[indices] = np.arange(count)
+    target_local = local[targets]
+    inside = target_local >= 0
+    a, b = source[inside], target_local[inside]
+    _, first = np.unique(a * count + b, return_index=True)  # duplicate exits to the same room
+    first.sort()
+    a, b = a[first], b[first]
+    _, first, pair_counts = np.unique(np.minimum(a, b) * count + np.maximum(a, b),
+                                      return_index=True, return_counts=True)
+    by_occurrence = np.argsort(first)
+    first, two_way = first[by_occurrence], pair_counts[by_occurrence] == 2
+    a, b = a[first], b[first]
+    model.segments = list(zip(xs[a].tolist(), ys[a].tolist(), xs[b].tolist(), ys[b].tolist(), two_way.tolist()))
+
+    model.arrays = {'ids': ids, 'xs': xs, 'ys': ys}
+    return model
+
+
+def merge_segments(segments):
+    """
+    Chain exit segments that share end points into polylines (flat point lists).
+    Direction is ignored - used where lines are drawn without arrows.
+    """
+    by_point = {}
+    for i, (x1, y1, x2, y2, _) in enumerate(segments):
+        by_point.setdefault((x1, y1), []).append(i)
+        by_point.setdefault((x2, y2), []).append(i)
+
+    used = [False] * len(segments)
+    chains = []
+    for start in range(len(segments)):
+        if used[start]:
+            continue
+        used[start] = True
+        x1, y1, x2, y2, _ = segments[start]
+        points = [x1, y1, x2, y2]
+        end = (x2, y2)
+        while True:
+            next_segment = None
+            for i in by_point[end]:
+                if not used[i]:
+                    next_segment = i
+                    break
+            if next_segment is None:
+                break
+            used[next_segment] = True
+            nx1, ny1, nx2, ny2, _ = segments[next_segment]
+            end = (nx2, ny2) if (nx1, ny1) == end else (nx1, ny1)
+            points.extend(end)
+        chains.append(points)
+    return chains
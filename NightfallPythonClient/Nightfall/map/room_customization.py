@@ -1,81 +1,85 @@
 # room_customization.py
-import json
-import os
 import tkinter as tk
 from tkinter import ttk, colorchooser, messagebox
+from core.storage import get_storage
 
 class RoomCustomization:
     def __init__(self):
-        self.customizations_file = os.path.join(os.path.dirname(__file__), '../data/room_customizations.json')
-        self.customizations = self.load_customizations()
-    
-    def load_customizations(self):
-        """Load room customizations from JSON file"""
-        if os.path.exists(self.customizations_file):
-            try:
-                with open(self.customizations_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"[Customization] Error loading customizations: {e}")
-        return {}
+        self.storage = get_storage()
+
+    @property
+    def customizations(self):
+        """{room_id: {note, color, route}} snapshot for iterating - single rooms are read with get()"""
+        return self.storage.items('room_customizations')
     
-    def save_customizations(self):
-        """Save room customizations to JSON file"""
+    def store_customization(self, room_id, custom):
+        """Keep a room's customization (removed when empty), written to disk in the background"""
         try:
-            os.makedirs(os.path.dirname(self.customizations_file), exist_ok=True)
-            with open(self.customizations_file, 'w', encoding='utf-8') as f:
-                json.dump(self.customizations, f, indent=2, ensure_ascii=False)
+            if custom:
+                self.storage.put('room_customizations', room_id, custom)
+            else:
+                self.storage.delete('room_customizations', room_id)
             return True
         except Exception as e:
             print(f"[Customization] Error saving customizations: {e}")
             return False
     
+    def get(self, room_id, default=None):
+        """Customization of one room (no snapshot), default if it has none"""
+        return self.storage.get('room_customizations', room_id, default)
+    
     def get_room_customization(self, room_id):
         """Get customization for a specific room"""
-        return self.customizations.get(str(room_id), {})
+        return self.get(room_id, {})
     
-    def set_room_customization(self, room_id, note=None, color=None):
+    def set_room_customization(self, room_id, note=None, color=None, route=None):
         """Set customization for a specific room"""
         room_id = str(room_id)
-        if room_id not in self.customizations:
-            self.customizations[room_id] = {}
+        custom = dict(self.get(room_id, {}))
         
         if note is not None:
             if note.strip():  # Only save non-empty notes
-                self.customizations[room_id]['note'] = note
-            elif 'note' in self.customizations[room_id]:
-                del self.customizations[room_id]['note']
+                custom['note'] = note
+            elif 'note' in custom:
+                del custom['note']
         
         if color is not None:
             if color:  # Only save valid colors
-                self.customizations[room_id]['color'] = color
-            elif 'color' in self.customizations[room_id]:
-                del self.customizations[room_id]['color']
-        
-        # Remove room entry if no customizations remain
-        if not self.customizations[room_id]:
-            del self.customizations[room_id]
-        
-        return self.save_customizations()
+                custom['color'] = color
+            elif 'color' in custom:
+                del custom['color']
+        
+        if route is not None:
+            if route:  # 'avoid' or 'forbid' for the route planner
+                custom['route'] = route
+            elif 'route' in custom:
+                del custom['route']
+        
+        # The room entry is removed if no customizations remain
+        return self.store_customization(room_id, custom)
+    
+    def get_route_flags(self):
+        """Get {room_id: 'avoid'/'forbid'} for all rooms with a routing preference"""
+        return {int(room_id): custom['route'] for room_id, custom in self.customizations.items()
+                if custom.get('route')}
     
     def clear_room_customization(self, room_id):
         """Clear all customizations for a room"""
         room_id = str(room_id)
-        if room_id in self.customizations:
-            del self.customizations[room_id]
-            return self.save_customizations()
+        if self.get(room_id) is not None:
+            return self.store_customization(room_id, None)
         return True
 
 
 class RoomCustomizationDialog:
-    def __init__(self, parent, room_id, current_note="", current_color=None):
+    def __init__(self, parent, room_id, current_note="", current_color=None, current_route=""):
         self.room_id = room_id
         self.result = None
         
         # Create dialog window
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(f"Room {room_id} Customization")
-        self.dialog.geometry("400x300")
+        self.dialog.geometry("400x360")
         self.dialog.resizable(False, False)
         
         # Make dialog modal
@@ -122,6 +126,15 @@ class RoomCustomizationDialog:
                           command=lambda c=color: self.set_color(c))
             btn.pack(side=tk.LEFT, padx=1)
         
+        # Routing section - how the autowalk planner treats this room
+        route_frame = ttk.LabelFrame(self.dialog, text="Autowalk", padding=10)
+        route_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.route_var = tk.StringVar(value=current_route or "")
+        ttk.Radiobutton(route_frame, text="Normal", variable=self.route_var, value="").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(route_frame, text="Avoid", variable=self.route_var, value="avoid").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(route_frame, text="Never enter", variable=self.route_var, value="forbid").pack(side=tk.LEFT, padx=5)
+        
         # Buttons
         button_frame = ttk.Frame(self.dialog)
         button_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -156,12 +169,14 @@ class RoomCustomizationDialog:
         """Clear all customizations"""
         self.note_text.delete('1.0', tk.END)
         self.clear_color()
+        self.route_var.set("")
     
     def save(self):
         """Save and close dialog"""
         note = self.note_text.get('1.0', tk.END).strip()
         color = self.color_var.get()
-        self.result = {'note': note, 'color': color}
+        route = self.route_var.get()
+        self.result = {'note': note, 'color': color, 'route': route}
         self.dialog.destroy()
     
     def cancel(self):
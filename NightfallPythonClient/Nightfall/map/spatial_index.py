@@ -0,0 +1,105 @@
+# spatial_index.py - Uniform grid over world coordinates for culling and hit-testing
+from map.render_prep import ROOM_BOX
+
+# World units per grid cell (a room box is 40 units wide, rooms are ~60 apart)
+GRID_CELL = 240
+
+
+class SpatialGrid:
+    """
+    Buckets keys by the grid cells their bounding box touches.
+    query() returns every key whose box may intersect a rectangle.
+    """
+
+    def __init__(self, cell_size=GRID_CELL):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> [keys]
+
+    def insert(self, key, x1, y1, x2, y2):
+        size = self.cell_size
+        for cx in range(int(min(x1, x2) // size), int(max(x1, x2) // size) + 1):
+            for cy in range(int(min(y1, y2) // size), int(max(y1, y2) // size) + 1):
+                self.cells.setdefault((cx, cy), []).append(key)
+
+    def insert_point(self, key, x, y):
+        size = self.cell_size
+        self.cells.setdefault((int(x // size), int(y // size)), []).append(key)
+
+    def query(self, x1, y1, x2, y2):
+        """Keys in the cells overlapping the rectangle"""
+        size = self.cell_size
+        cx1, cx2 = int(x1 // size), int(x2 // size)
+        cy1, cy2 = int(y1 // size), int(y2 // size)
+        found = set()
+        if (cx2 - cx1 + 1) * (cy2 - cy1 + 1) > len(self.cells):
+            # Rectangle larger than the populated area: walk the populated cells
+            for (cx, cy), keys in self.cells.items():
+                if cx1 <= cx <= cx2 and cy1 <= cy <= cy2:
+                    found.update(keys)
+        else:
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    keys = self.cells.get((cx, cy))
+                    if keys:
+                        found.update(keys)
+        return found
+
+
+class PointArray:
+    """
+    Points in NumPy arrays with the query() of SpatialGrid: one comparison
+    over all points instead of a walk over grid cells, exact instead of
+    cell-rounded. Pays off for view-sized rectangles over a whole zone, a
+    grid stays faster for the small boxes of hit-testing.
+    """
+
+    def __init__(self, keys, xs, ys):
+        self.keys = keys
+        self.xs = xs
+        self.ys = ys
+
+    def query(self, x1, y1, x2, y2):
+        xs, ys = self.xs, self.ys
+        inside = (xs >= x1) & (xs <= x2) & (ys >= y1) & (ys <= y2)
+        return set(self.keys[inside].tolist())
+
+
+class ZoneIndex:
+    """
+    Spatial grids of one ZoneRenderModel: rooms, exit segments and zone
+    notes. rooms_in culls the view with a mask over the model's NumPy
+    arrays when it has them; room_at (run on every mouse move) and the
+    segment and note lookups always use the grids.
+    """
+
+    def __init__(self, model, cell_size=GRID_CELL):
+        self.positions = model.positions
+        arrays = model.arrays
+        self.room_points = PointArray(arrays['ids'], arrays['xs'], arrays['ys']) if arrays is not None else None
+        self.rooms = SpatialGrid(cell_size)
+        self.segments = SpatialGrid(cell_size)
+        self.notes = SpatialGrid(cell_size)
+        for room_id, x, y, _ in model.rooms:
+            self.rooms.insert_point(room_id, x, y)
+        for i, (x1, y1, x2, y2, _) in enumerate(model.segments):
+            self.segments.insert(i, x1, y1, x2, y2)
+        for i, (x, y, _) in enumerate(model.notes):
+            self.notes.insert_point(i, x, y)
+
+    def rooms_in(self, x1, y1, x2, y2):
+        """Rooms in a view-sized rectangle (may include rooms of the grid cells around it)"""
+        if self.room_points is not None:
+            return self.room_points.query(x1, y1, x2, y2)
+        return self.rooms.query(x1, y1, x2, y2)
+
+    def room_at(self, x, y, radius=ROOM_BOX):
+        """Room whose box (half-size radius) contains the world point, the closest if several"""
+        best, best_distance = None, None
+        for room_id in self.rooms.query(x - radius, y - radius, x + radius, y + radius):
+            rx, ry = self.positions[room_id]
+            dx, dy = abs(rx - x), abs(ry - y)
+            if dx <= radius and dy <= radius:
+                distance = dx * dx + dy * dy
+                if best is None or distance < best_distance:
+                    best, best_distance = room_id, distance
+        return best
@@ -0,0 +1,162 @@
+# world_layout.py - Places all zones of a level on one world plane, stitched at their gateways
+from collections import deque
+
+# Unit vectors of the compass exit types (see EXIT_TYPE_TO_COMMAND), y grows southwards
+DIRECTION_VECTORS = {
+    0: (0, -1), 1: (1, -1), 2: (1, 0), 3: (1, 1),
+    4: (0, 1), 5: (-1, 1), 6: (-1, 0), 7: (-1, -1),
+}
+# Distance between the two rooms of a gateway, about one room spacing
+GATEWAY_STEP = 60
+# Space kept between zones pushed apart and between unconnected zone groups
+ZONE_GAP = 200
+# How often an overlapping zone is pushed further out before any free spot is taken
+MAX_PUSHES = 8
+
+
+def convex_hull(points):
+    """Convex hull (monotone chain) of (x, y) points, counter-clockwise"""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+class ZonePlacement:
+    """Where one zone sits on the world plane; bounds and hull are in world coordinates"""
+
+    __slots__ = ('zone_id', 'name', 'room_count', 'local_bounds', 'local_hull', 'offset')
+
+    def __init__(self, zone_id, name, room_count, local_bounds, local_hull):
+        self.zone_id = zone_id
+        self.name = name
+        self.room_count = room_count
+        self.local_bounds = local_bounds
+        self.local_hull = local_hull
+        self.offset = (0, 0)
+
+    @property
+    def bounds(self):
+        dx, dy = self.offset
+        x1, y1, x2, y2 = self.local_bounds
+        return x1 + dx, y1 + dy, x2 + dx, y2 + dy
+
+    def hull(self):
+        dx, dy = self.offset
+        return [(x + dx, y + dy) for x, y in self.local_hull]
+
+
+class WorldLayout:
+    """
+    All zones of a level with a world offset each.
+    Zones are placed breadth first from the largest one: a neighbour goes
+    where its gateway room lies one step from the room leading into it, and
+    is pushed further along that direction while it overlaps placed zones.
+    Zone groups without gateways between them are lined up to the right.
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.zones = {}   # zone id -> ZonePlacement
+        self.bounds = None
+
+    @classmethod
+    def build(cls, db, level=0, room_extent=36):
+        layout = cls(level)
+        graph = db.get_graph()
+        positions = {}  # room id -> (x, y) inside its zone
+        for zone_id, zone_name in db.get_all_zones():
+            rooms = [(room_id, x, y) for room_id, x, y, z, _ in db.get_rooms_in_zone(zone_id, z_level=level)
+                     if (z or 0) == level]
+            if not rooms:
+                continue
+            xs = [x for _, x, _ in rooms]
+            ys = [y for _, _, y in rooms]
+            bounds = (min(xs) - room_extent, min(ys) - room_extent, max(xs) + room_extent, max(ys) + room_extent)
+            hull = convex_hull([(x, y) for _, x, y in rooms])
+            layout.zones[zone_id] = ZonePlacement(zone_id, zone_name, len(rooms), bounds, hull)
+            for room_id, x, y in rooms:
+                positions[int(room_id)] = (x, y)
+
+        # Gateways: one walk over the exit graph
+        gateways = {}  # zone id -> [(from room, to room, to zone, direction)]
+        room_ids, zone_of, targets, directions = graph.room_ids, graph.zone_of, graph.targets, graph.directions
+        for i in range(len(graph)):
+            from_zone = zone_of[i]
+            if from_zone not in layout.zones or room_ids[i] not in positions:
+                continue
+            for edge in range(graph.offsets[i], graph.offsets[i + 1]):
+                j = targets[edge]
+                to_zone = zone_of[j]
+                if to_zone != from_zone and to_zone in layout.zones and room_ids[j] in positions:
+                    gateways.setdefault(from_zone, []).append((room_ids[i], room_ids[j], to_zone, directions[edge]))
+
+        layout._place(positions, gateways)
+        return layout
+
+    def _place(self, positions, gateways):
+        placed = []        # ZonePlacements in placing order
+        placed_ids = set()
+        order = sorted(self.zones, key=lambda zone_id: -self.zones[zone_id].room_count)
+        for root in order:
+            if root in placed_ids:
+                continue
+            root_zone = self.zones[root]
+            if placed:
+                # New group of connected zones: line it up right of everything placed
+                max_x = max(zone.bounds[2] for zone in placed)
+                min_y = min(zone.bounds[1] for zone in placed)
+                root_zone.offset = (max_x + ZONE_GAP - root_zone.local_bounds[0], min_y - root_zone.local_bounds[1])
+            placed.append(root_zone)
+            placed_ids.add(root)
+            queue = deque([root])
+            while queue:
+                zone_id = queue.popleft()
+                zone = self.zones[zone_id]
+                for from_id, to_id, to_zone, direction in gateways.get(zone_id, ()):
+                    if to_zone in placed_ids:
+                        continue
+                    neighbour = self.zones[to_zone]
+                    dx, dy = DIRECTION_VECTORS.get(direction, (1, 0))
+                    fx, fy = positions[from_id]
+                    tx, ty = positions[to_id]
+                    offset = (zone.offset[0] + fx + dx * GATEWAY_STEP - tx,
+                              zone.offset[1] + fy + dy * GATEWAY_STEP - ty)
+                    neighbour.offset = self._free_offset(neighbour, offset, (dx, dy), placed)
+                    placed.append(neighbour)
+                    placed_ids.add(to_zone)
+                    queue.append(to_zone)
+
+        if placed:
+            all_bounds = [zone.bounds for zone in placed]
+            self.bounds = (min(b[0] for b in all_bounds), min(b[1] for b in all_bounds),
+                           max(b[2] for b in all_bounds), max(b[3] for b in all_bounds))
+
+    @staticmethod
+    def _free_offset(zone, offset, direction, placed):
+        """offset, pushed along direction until the zone overlaps no placed zone"""
+        x1, y1, x2, y2 = zone.local_bounds
+        step_x = ((x2 - x1) / 2 + ZONE_GAP) * direction[0]
+        step_y = ((y2 - y1) / 2 + ZONE_GAP) * direction[1]
+        for _ in range(MAX_PUSHES):
+            box = (x1 + offset[0], y1 + offset[1], x2 + offset[0], y2 + offset[1])
+            if not any(box[0] < b[2] and b[0] < box[2] and box[1] < b[3] and b[1] < box[3]
+                       for b in (other.bounds for other in placed)):
+                return offset
+            offset = (offset[0] + step_x, offset[1] + step_y)
+        # Crowded spot: below everything placed so far
+        max_y = max(other.bounds[3] for other in placed)
+        return offset[0], max_y + ZONE_GAP - y1
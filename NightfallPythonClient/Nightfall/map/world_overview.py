@@ -0,0 +1,227 @@
+# world_overview.py - All zones of a level on one canvas, zone hulls far out, streamed rooms close up
+import threading
+from map.spatial_index import SpatialGrid
+from map.world_layout import WorldLayout
+from map.zone_renderer import ZoneRenderer, VIEW_MARGIN
+
+# Below this zoom zones are drawn as hulls with their name, above it as rooms
+OVERVIEW_ROOM_ZOOM = 0.05
+# Zones with rooms on the canvas at once, the ones nearest the view center win
+MAX_STREAMED_ZONES = 12
+# Grid cell for the zone bounds (world units), zones are thousands of units wide
+ZONE_GRID_CELL = 2000
+
+
+class WorldOverview:
+    """
+    World map mode of the MapViewer.
+    The WorldLayout is built on a background thread. Zoomed out, every zone
+    in the view is one pooled hull polygon plus its name. Zoomed in, the
+    zones in the view get a ZoneRenderer each, shifted by the zone's world
+    offset; their models come from the ZoneRenderCache and are built in the
+    background, a zone keeps its hull until its model is ready. Zones that
+    leave the view hand their items back to the pool.
+    """
+
+    def __init__(self, viewer, db):
+        self.viewer = viewer
+        self.db = db
+        self.canvas = viewer.this
+        self.camera = viewer.camera
+        self.pool = viewer.item_pool
+        self.active = False
+        self.level = 0
+        self.layouts = {}         # level -> WorldLayout
+        self.grids = {}           # level -> SpatialGrid of zone ids
+        self.building = set()     # levels whose layout is being built
+        self.loading = set()      # (zone, level) models being built
+        self.renderers = {}       # zone id -> ZoneRenderer
+        self.hull_items = {}      # zone id -> [canvas items]
+        self.hull_transform = None
+        self.on_layout_ready = None
+        db.add_graph_listener(self.invalidate)
+
+    def invalidate(self):
+        self.layouts = {}
+        self.grids = {}
+
+    # === MODE ===
+
+    def show(self, level):
+        """Enter overview mode for a level, True once the layout is available"""
+        self.hide()
+        self.active = True
+        self.level = level
+        layout = self.layout()
+        if layout is not None:
+            self.camera.world_bounds = layout.bounds
+            return True
+        return False
+
+    def hide(self):
+        """Leave overview mode and release every item"""
+        self.active = False
+        for renderer in self.renderers.values():
+            renderer.release()
+        self.renderers = {}
+        self.release_hulls(list(self.hull_items))
+
+    def layout(self):
+        """Layout of the current level, None while it is being built"""
+        layout = self.layouts.get(self.level)
+        if layout is None and self.level not in self.building:
+            self.building.add(self.level)
+            threading.Thread(target=self._build_layout, args=(self.level,), daemon=True).start()
+        return layout
+
+    def _build_layout(self, level):
+        try:
+            layout = WorldLayout.build(self.db, level)
+            grid = SpatialGrid(ZONE_GRID_CELL)
+            for zone_id, zone in layout.zones.items():
+                grid.insert(zone_id, *zone.bounds)
+            self.grids[level] = grid
+            self.layouts[level] = layout
+            print(f"[MAP] World layout of level {level}: {len(layout.zones)} zones")
+        except Exception as e:
+            print(f"[MAP] World layout failed: {e}")
+        finally:
+            self.building.discard(level)
+
+    # === DRAWING ===
+
+    def update(self):
+        """Bring the overview in line with the current view (called by MapViewer.render_view)"""
+        if not self.active:
+            return False
+        layout = self.layouts.get(self.level)
+        if layout is None:
+            if self.level in self.building:
+                self.canvas.after(100, self.viewer.schedule_render)
+            return False
+        if self.camera.world_bounds is not layout.bounds:
+            # Layout just became ready
+            self.camera.world_bounds = layout.bounds
+            if self.on_layout_ready:
+                self.on_layout_ready()
+
+        scale, ox, oy = self.camera.transform()
+        canvas = self.canvas
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            width, height = 800, 600
+        margin = VIEW_MARGIN * max(width, height)
+        x1 = (canvas.canvasx(0) - margin - ox) / scale
+        y1 = (canvas.canvasy(0) - margin - oy) / scale
+        x2 = (canvas.canvasx(width) + margin - ox) / scale
+        y2 = (canvas.canvasy(height) + margin - oy) / scale
+        visible = self.grids[self.level].query(x1, y1, x2, y2)
+
+        streamed = set()
+        if scale >= OVERVIEW_ROOM_ZOOM and visible:
+            center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+
+            def distance(zone_id):
+                bx1, by1, bx2, by2 = layout.zones[zone_id].bounds
+                return abs((bx1 + bx2) / 2 - center_x) + abs((by1 + by2) / 2 - center_y)
+            streamed = set(sorted(visible, key=distance)[:MAX_STREAMED_ZONES])
+
+        # Stream rooms out
+        for zone_id in [z for z in self.renderers if z not in streamed]:
+            self.renderers.pop(zone_id).release()
+
+        # Stream rooms in, zones without a model yet keep their hull
+        hulls = set(visible)
+        for zone_id in streamed:
+            renderer = self.renderers.get(zone_id)
+            if renderer is None:
+                model = self._model(zone_id)
+                if model is None:
+                    continue
+                renderer = ZoneRenderer(self.viewer)
+                renderer.offset = layout.zones[zone_id].offset
+                renderer.set_model(model)
+                self.renderers[zone_id] = renderer
+            renderer.update()
+            hulls.discard(zone_id)
+
+        self.release_hulls([z for z in self.hull_items if z not in hulls])
+        if self.hull_items and (scale, ox, oy) != self.hull_transform:
+            # Zoomed or recentered: move the hulls kept on the canvas
+            for zone_id, items in self.hull_items.items():
+                for item, coords in zip(items, self._hull_coords(layout.zones[zone_id], scale, ox, oy)):
+                    canvas.coords(item, *coords)
+        for zone_id in hulls:
+            if zone_id not in self.hull_items:
+                self._draw_hull(layout.zones[zone_id], scale, ox, oy)
+        self.hull_transform = (scale, ox, oy)
+        if self.loading:
+            self.canvas.after(100, self.viewer.schedule_render)
+        return True
+
+    def _model(self, zone_id):
+        """Cached render model of a zone, None while it is built in the background"""
+        render_cache = self.viewer.render_cache
+        key = (zone_id, self.level)
+        model = render_cache.cached(*key)
+        if model is None and key not in self.loading:
+            self.loading.add(key)
+            threading.Thread(target=self._load, args=(key,), daemon=True).start()
+        return model
+
+    def _load(self, key):
+        try:
+            self.viewer.render_cache.get(*key)
+        except Exception as e:
+            print(f"[MAP] Could not load zone {key[0]}: {e}")
+        finally:
+            self.loading.discard(key)
+
+    def _hull_coords(self, zone, scale, ox, oy):
+        """Canvas coords of a zone's hull shape (polygon, or rectangle for tiny hulls) and its name"""
+        x1, y1, x2, y2 = zone.bounds
+        points = [v for x, y in zone.hull() for v in (ox + scale * x, oy + scale * y)]
+        if len(points) < 6:
+            points = [ox + scale * x1, oy + scale * y1, ox + scale * x2, oy + scale * y2]
+        return points, (ox + scale * (x1 + x2) / 2, oy + scale * (y1 + y2) / 2)
+
+    def _draw_hull(self, zone, scale, ox, oy):
+        viewer = self.viewer
+        shape, label = self._hull_coords(zone, scale, ox, oy)
+        color = getattr(viewer, 'connection_color', viewer.room_color)
+        tags = ('zone_hull', f"hull_{zone.zone_id}")
+        if len(shape) >= 6:
+            item = self.pool.acquire('polygon', shape, fill=viewer.room_color, outline=color,
+                                     smooth=False, tags=tags)
+        else:
+            item = self.pool.acquire('rectangle', shape, fill=viewer.room_color, outline=color, tags=tags)
+        self.hull_items[zone.zone_id] = [item, self.pool.acquire('text', label, text=zone.name, fill=viewer.note_color,
+                                                                 font=('Helvetica', '9', 'bold'), tags=tags)]
+
+    def release_hulls(self, zone_ids):
+        items = []
+        for zone_id in zone_ids:
+            items.extend(self.hull_items.pop(zone_id, ()))
+        if items:
+            self.pool.release(items)
+
+    # === HIT-TESTING ===
+
+    def room_at(self, canvas_x, canvas_y):
+        for renderer in self.renderers.values():
+            room_id = renderer.room_at(canvas_x, canvas_y)
+            if room_id is not None:
+                return room_id
+        return None
+
+    def zone_at(self, canvas_x, canvas_y):
+        """Zone whose bounds contain a canvas point, None if none"""
+        layout = self.layouts.get(self.level)
+        if layout is None:
+            return None
+        x, y = self.camera.canvas_to_world(canvas_x, canvas_y)
+        for zone_id in self.grids[self.level].query(x, y, x, y):
+            x1, y1, x2, y2 = layout.zones[zone_id].bounds
+            if x1 <= x <= x2 and y1 <= y <= y2:
+                return zone_id
+        return None
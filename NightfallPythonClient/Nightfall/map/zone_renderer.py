@@ -0,0 +1,344 @@
+# zone_renderer.py - Viewport culled, level-of-detail drawing of a ZoneRenderModel
+import tkinter as tk
+from map.render_prep import ROOM_BOX, merge_segments, room_shapes
+from map.spatial_index import ZoneIndex
+
+# Levels of detail, picked from the current zoom
+LOD_DOTS = 0     # rooms as dots, exits merged into plain polylines
+LOD_SIMPLE = 1   # plain room squares and lines, no shadows, arrows or text
+LOD_FULL = 2     # everything, with tooltips
+
+SIMPLE_DETAIL_ZOOM = 0.08
+FULL_DETAIL_ZOOM = 0.35
+
+# Extra area drawn around the visible part, as a fraction of the canvas size
+VIEW_MARGIN = 0.5
+
+# Smallest hit radius in pixels, so dots stay clickable when zoomed out
+HIT_PIXELS = 3
+
+
+class ZoneRenderer:
+    """
+    Materializes canvas items only for the parts of a zone inside the viewport
+    (plus a margin) and at a detail level matching the zoom.
+    Items are placed in canvas space through the camera's world->canvas
+    transform. update() diffs the wanted items against the drawn ones after
+    every pan; when the transform changed (zoom, centering) the drawn items
+    are placed again from world coordinates. Either way only visible items
+    are touched, acquired from or released to the viewer's ItemPool.
+    viewer.this is any RenderBackend: the Tk canvas, or a RecordingBackend
+    when drawing headless (see HeadlessViewer).
+    Below full detail a pre-rendered zone image (ZoneTiles) replaces the room
+    and exit items once it is ready; only the pinned room stays a vector item.
+    """
+
+    def __init__(self, viewer):
+        self.viewer = viewer
+        self.canvas = viewer.this
+        self.camera = viewer.camera
+        self.pool = viewer.item_pool
+        self.tiles = getattr(viewer, 'zone_tiles', None)
+        self.offset = (0, 0)       # world position of the model's origin (zones placed in the world overview)
+        self.model = None
+        self.image_item = None
+        self.image = None          # PhotoImage shown by image_item (Tk needs the reference)
+        self.image_source = None   # (pyramid, transform) the shown image was cut for
+        self.image_view = None     # canvas rectangle the shown image covers
+        self.tk_colors = {}        # Tk color name -> '#rrggbb' for the zone images
+        self.reset()
+
+    def reset(self):
+        self.lod = None
+        self.drawn_transform = None
+        self.room_items = {}     # room id -> [canvas items]
+        self.segment_items = {}  # segment index -> canvas item
+        self.note_items = {}     # note index -> canvas item
+        self.chain_items = []    # merged polylines at LOD_DOTS
+        self.pinned = set()      # rooms drawn even when off screen
+
+    def set_model(self, model):
+        """Start showing a model (nothing is drawn until update)"""
+        self.clear()
+        self.hide_image()
+        self.model = model
+        self.reset()
+        if model.index is None:
+            model.index = ZoneIndex(model)
+
+    # === TRANSFORM ===
+
+    def transform(self):
+        """(scale, offset x, offset y) with canvas = offset + scale * model coordinates, None without a model"""
+        if not self.model or not self.model.bounds:
+            return None
+        scale, ox, oy = self.camera.transform()
+        return scale, ox + scale * self.offset[0], oy + scale * self.offset[1]
+
+    def room_canvas_center(self, room_id):
+        """Canvas position of a room's center, drawn or not"""
+        transform = self.transform()
+        position = self.model.positions.get(int(room_id)) if self.model else None
+        if transform is None or position is None:
+            return None
+        scale, ox, oy = transform
+        return ox + scale * position[0], oy + scale * position[1]
+
+    def room_at(self, canvas_x, canvas_y):
+        """Room drawn at a canvas point, from the zone's spatial index (None if none)"""
+        transform = self.drawn_transform
+        if transform is None or self.model.index is None:
+            return None
+        scale, ox, oy = transform
+        return self.model.index.room_at((canvas_x - ox) / scale, (canvas_y - oy) / scale,
+                                        max(ROOM_BOX, HIT_PIXELS / scale))
+
+    @staticmethod
+    def _to_canvas(points, scale, ox, oy):
+        return [ox + scale * v if i % 2 == 0 else oy + scale * v for i, v in enumerate(points)]
+
+    # === UPDATES ===
+
+    def pin(self, room_id):
+        """Keep a room (the player's) drawn wherever the view is"""
+        if not self.model or int(room_id) not in self.model.positions:
+            return
+        self.pinned = {int(room_id)}
+        transform = self.drawn_transform
+        if transform and int(room_id) not in self.room_items:
+            self._draw_room(int(room_id), *transform)
+
+    def update(self):
+        """Bring the canvas items in line with the current view, True if the transform changed"""
+        transform = self.transform()
+        if transform is None:
+            return False
+        scale, ox, oy = transform
+        canvas = self.canvas
+        model = self.model
+
+        if scale >= FULL_DETAIL_ZOOM:
+            lod = LOD_FULL
+        elif scale >= SIMPLE_DETAIL_ZOOM:
+            lod = LOD_SIMPLE
+        else:
+            lod = LOD_DOTS
+        moved = transform != self.drawn_transform
+        if moved:
+            # Place everything again from world coordinates (pooled, so no item churn)
+            self.clear()
+            self.lod = lod
+            self.drawn_transform = transform
+
+        # Visible world rectangle plus margin
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            width, height = 800, 600
+        margin = VIEW_MARGIN * max(width, height)
+        x1 = (canvas.canvasx(0) - margin - ox) / scale
+        y1 = (canvas.canvasy(0) - margin - oy) / scale
+        x2 = (canvas.canvasx(width) + margin - ox) / scale
+        y2 = (canvas.canvasy(height) + margin - oy) / scale
+
+        index = model.index
+        if lod != LOD_FULL and self._show_image(transform, width, height, margin):
+            # The zone image has the rooms and exits, keep only the player's room on top
+            rooms, segments, notes = set(self.pinned), set(), set()
+            if self.chain_items:
+                self.pool.release(self.chain_items)
+                self.chain_items = []
+        else:
+            if self.image_source is not None:
+                self.hide_image()
+            rooms = index.rooms_in(x1, y1, x2, y2) | self.pinned
+            segments = index.segments.query(x1, y1, x2, y2) if lod != LOD_DOTS else set()
+            notes = index.notes.query(x1, y1, x2, y2) if lod == LOD_FULL else set()
+
+        # Drop what left the area
+        stale = []
+        for room_id in [r for r in self.room_items if r not in rooms]:
+            stale.extend(self.room_items.pop(room_id))
+        for i in [s for s in self.segment_items if s not in segments]:
+            stale.append(self.segment_items.pop(i))
+        for i in [n for n in self.note_items if n not in notes]:
+            stale.append(self.note_items.pop(i))
+        if stale:
+            self.pool.release(stale)
+
+        # Create what entered it
+        new_lines = False
+        for i in segments:
+            if i not in self.segment_items:
+                self.segment_items[i] = self._draw_segment(i, lod, scale, ox, oy)
+                new_lines = True
+        if lod == LOD_DOTS and not self.chain_items and model.segments and self.image_source is None:
+            if model.chains is None:
+                model.chains = merge_segments(model.segments)
+            color = getattr(self.viewer, 'connection_color', self.viewer.room_color)
+            for chain in model.chains:
+                self.chain_items.append(self.pool.acquire(
+                    'line', self._to_canvas(chain, scale, ox, oy),
+                    fill=color, width=1, arrow='none', tags=("connection",)))
+            new_lines = True
+        for room_id in rooms:
+            if room_id not in self.room_items:
+                self._draw_room(room_id, scale, ox, oy)
+        for i in notes:
+            if i not in self.note_items:
+                self.note_items[i] = self._draw_note(i, scale, ox, oy)
+
+        if new_lines:
+            # Exits stay behind the rooms, the position crosshair behind everything
+            canvas.tag_lower("connection")
+            canvas.tag_lower("position_indicator")
+        return moved
+
+    # === ZONE IMAGES ===
+
+    def _show_image(self, transform, width, height, margin):
+        """Show the zone image for the view, False while there is none (keeps the vector items)"""
+        if self.tiles is None or not self.tiles.available:
+            return False
+        pyramid = self.tiles.get(self.model, self._tile_colors())
+        if pyramid is None:
+            self.hide_image()
+            if self.tiles.is_pending():
+                # Look again once the background rendering is done
+                self.canvas.after(100, self.viewer.schedule_render)
+            return False
+
+        canvas = self.canvas
+        visible = (canvas.canvasx(0), canvas.canvasy(0), canvas.canvasx(width), canvas.canvasy(height))
+        covered = self.image_view
+        source = self.image_source
+        if (source and source[0] is pyramid and source[1] == transform and covered[0] <= visible[0] and
+                covered[1] <= visible[1] and covered[2] >= visible[2] and covered[3] >= visible[3]):
+            return True  # Panned inside the part already cut out
+
+        view = (visible[0] - margin, visible[1] - margin, visible[2] + margin, visible[3] + margin)
+        result = self.tiles.view_image(pyramid, self.model.bounds, *transform, view)
+        self.image_source = (pyramid, transform)
+        self.image_view = view
+        if result is None:
+            if self.image_item is not None:
+                canvas.itemconfig(self.image_item, state='hidden')
+            return True
+        self.image, x, y = result
+        if self.image_item is None:
+            self.image_item = canvas.create_image(x, y, image=self.image, anchor='nw', tags=('zone_image',))
+        else:
+            canvas.coords(self.image_item, x, y)
+            canvas.itemconfig(self.image_item, image=self.image, state='normal')
+        canvas.tag_lower(self.image_item)
+        return True
+
+    def release(self):
+        """Give every item back and forget the model (nothing is shown until set_model)"""
+        self.clear()
+        self.hide_image()
+        if self.image_item is not None:
+            self.canvas.delete(self.image_item)
+            self.image_item = None
+        self.model = None
+        self.reset()
+
+    def hide_image(self):
+        if self.image_item is not None:
+            self.canvas.itemconfig(self.image_item, state='hidden')
+        self.image = None
+        self.image_source = None
+        self.image_view = None
+
+    def _tile_colors(self):
+        """Colors of the current theme and the zone's custom rooms, resolved for Pillow"""
+        viewer = self.viewer
+        names = {'background': getattr(viewer, 'background_color', '#000000'),
+                 'room': viewer.room_color,
+                 'connection': getattr(viewer, 'connection_color', viewer.room_color)}
+        colors = {key: self._rgb(name) for key, name in names.items()}
+        for style in self.model.styles.values():
+            if style[0]:
+                colors[style[0]] = self._rgb(style[0])
+        return colors
+
+    def _rgb(self, name):
+        rgb = self.tk_colors.get(name)
+        if rgb is None:
+            try:
+                r, g, b = self.canvas.winfo_rgb(name)
+                rgb = f"#{r // 257:02x}{g // 257:02x}{b // 257:02x}"
+            except tk.TclError:
+                rgb = '#808080'
+            self.tk_colors[name] = rgb
+        return rgb
+
+    def clear(self):
+        """Release all materialized items to the pool"""
+        items = [i for ids in self.room_items.values() for i in ids]
+        items.extend(self.segment_items.values())
+        items.extend(self.note_items.values())
+        items.extend(self.chain_items)
+        if items:
+            self.pool.release(items)
+        self.room_items, self.segment_items, self.note_items, self.chain_items = {}, {}, {}, []
+
+    # === ITEMS ===
+
+    def _room_fill(self, room_id):
+        viewer = self.viewer
+        if str(room_id) == str(getattr(viewer, 'current_highlight', None)):
+            return getattr(viewer, 'player_marker_color', '#FF6EC7')
+        style = self.model.styles.get(room_id)
+        return (style and style[0]) or viewer.room_color
+
+    def _draw_room(self, room_id, scale, ox, oy):
+        x, y = self.model.positions[room_id]
+        cx, cy = ox + scale * x, oy + scale * y
+        room_tag = f"{room_id}_room"
+        fill = self._room_fill(room_id)
+
+        if self.lod == LOD_FULL:
+            items = self._draw_full_room(room_id, cx, cy, fill, scale, ox, oy)
+        elif self.lod == LOD_SIMPLE:
+            half = ROOM_BOX * scale
+            items = [self.pool.acquire('rectangle', (cx - half, cy - half, cx + half, cy + half),
+                                       fill=fill, outline='', tags=(room_tag,))]
+        else:
+            items = [self.pool.acquire('rectangle', (cx - 1.5, cy - 1.5, cx + 1.5, cy + 1.5),
+                                       fill=fill, outline='', tags=(room_tag,))]
+        self.room_items[room_id] = items
+
+    def _draw_full_room(self, room_id, x, y, fill, scale, ox, oy):
+        """Rounded room with its shadow and the custom note marker"""
+        viewer = self.viewer
+        shapes = self.model.shapes.get(room_id)
+        shadow_points, room_points = shapes or room_shapes(*self.model.positions[room_id])
+        background = getattr(viewer, 'background_color', '#000000')
+        shadow_color = "#202020" if background[1] < '5' else "gray80"
+        items = [self.pool.acquire('polygon', self._to_canvas(shadow_points, scale, ox, oy), fill=shadow_color,
+                                   outline='', tags=(f"{room_id}_shadow",), smooth=True),
+                 self.pool.acquire('polygon', self._to_canvas(room_points, scale, ox, oy), fill=fill,
+                                   outline='', tags=(f"{room_id}_room",), smooth=True)]
+        style = self.model.styles.get(room_id)
+        if style and style[1]:
+            box_size = ROOM_BOX * scale
+            items.append(self.pool.acquire('text', (x + box_size - 5 * scale, y - box_size + 5 * scale),
+                                           text="N", font=('Arial', 8, 'bold'), fill=viewer.note_color,
+                                           tags=(f"{room_id}_note",)))
+        return items
+
+    def _draw_note(self, i, scale, ox, oy):
+        """'To <zone>' label above a room with exits into another zone (double-click opens it)"""
+        x, y, to_zone = self.model.notes[i]
+        zone_name = self.model.zone_names.get(to_zone)
+        tags = ("zone_note", f"zone_{to_zone}") if to_zone else ("zone_note",)
+        return self.pool.acquire('text', (ox + scale * x, oy + scale * (y - 20)), text=f"To {zone_name}",
+                                 fill=self.viewer.note_color, font=('Helvetica', '10', 'bold'), tags=tags)
+
+    def _draw_segment(self, i, lod, scale, ox, oy):
+        x1, y1, x2, y2, bidirectional = self.model.segments[i]
+        color = getattr(self.viewer, 'connection_color', self.viewer.room_color)
+        coords = (ox + scale * x1, oy + scale * y1, ox + scale * x2, oy + scale * y2)
+        arrow = tk.LAST if lod == LOD_FULL and not bidirectional else 'none'
+        return self.pool.acquire('line', coords, arrow=arrow, fill=color,
+                                 width=2 if lod == LOD_FULL else 1, tags=("connection",))
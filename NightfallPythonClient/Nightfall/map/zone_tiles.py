@@ -0,0 +1,182 @@
+# zone_tiles.py - Pre-rendered zone images for zoomed-out views (needs Pillow, optional)
+import hashlib
+import math
+import os
+import threading
+from core.path_cache import LRUCache
+from map.render_prep import ROOM_BOX
+
+try:
+    from PIL import Image, ImageDraw, ImageTk
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+TILE_VERSION = 1
+# Scale of the largest pyramid image (where vector rooms take over) and its size cap
+TILE_BASE_SCALE = 0.35
+TILE_MAX_SIZE = 4096
+# Pyramid images are halved down to this size
+TILE_MIN_SIZE = 64
+
+
+def render_zone_image(model, scale, colors):
+    """
+    Draw the rooms and exit lines of a model at scale as a Pillow image.
+    colors maps the Tk color names used by the model (background, room,
+    connection and custom room colors) to '#rrggbb'.
+    """
+    x1, y1, x2, y2 = model.bounds
+    width = max(1, math.ceil((x2 - x1) * scale))
+    height = max(1, math.ceil((y2 - y1) * scale))
+    image = Image.new('RGB', (width, height), colors['background'])
+    draw = ImageDraw.Draw(image)
+
+    connection = colors['connection']
+    for sx1, sy1, sx2, sy2, _ in model.segments:
+        draw.line(((sx1 - x1) * scale, (sy1 - y1) * scale, (sx2 - x1) * scale, (sy2 - y1) * scale),
+                  fill=connection, width=1)
+
+    half = max(ROOM_BOX * scale, 1.5)
+    room_color = colors['room']
+    for room_id, x, y, _ in model.rooms:
+        style = model.styles.get(room_id)
+        fill = colors.get(style[0], room_color) if style and style[0] else room_color
+        cx, cy = (x - x1) * scale, (y - y1) * scale
+        draw.rectangle((cx - half, cy - half, cx + half, cy + half), fill=fill)
+    return image
+
+
+def image_pyramid(base, base_scale):
+    """[(scale, image)] from base down to TILE_MIN_SIZE, halving each step"""
+    pyramid = [(base_scale, base)]
+    image, scale = base, base_scale
+    while max(image.size) // 2 >= TILE_MIN_SIZE:
+        image = image.reduce(2)
+        scale /= 2
+        pyramid.append((scale, image))
+    return pyramid
+
+
+class ZoneTiles:
+    """
+    Image pyramids of zone levels, shown as one canvas image instead of
+    thousands of room items when zoomed out.
+    Pyramids are rendered on a background thread and kept on disk in
+    data/cache/tiles, keyed by the world file's hash plus a version of the
+    room customizations and theme colors the image was drawn with.
+    Without Pillow nothing is rendered and the map stays vector only.
+    """
+
+    def __init__(self, db, max_zones=8):
+        self.db = db
+        self.available = PIL_AVAILABLE
+        self.cache_dir = os.path.join(os.path.dirname(__file__), '../data/cache/tiles')
+        self.pyramids = LRUCache(max_zones, 'zone_tiles')
+        self.pending = set()
+        self.lock = threading.Lock()
+        if not self.available:
+            print("[MAP] Pillow not installed, zoomed out zones are drawn as vectors")
+        db.add_graph_listener(self.invalidate)
+
+    def invalidate(self):
+        with self.lock:
+            self.pyramids.clear()
+
+    @staticmethod
+    def style_version(model, colors):
+        """Short hash of everything besides the world file that shows in the image"""
+        styles = sorted((room_id, style[0]) for room_id, style in model.styles.items() if style[0])
+        text = repr((TILE_VERSION, sorted(colors.items()), styles,
+                     len(model.rooms), len(model.segments)))
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+    def get(self, model, colors):
+        """Pyramid of a model, None while it is being prepared (or without Pillow)"""
+        if not self.available or not model.bounds:
+            return None
+        key = (model.zone_id, model.level, self.style_version(model, colors))
+        with self.lock:
+            pyramid = self.pyramids.get(key)
+            if pyramid is not None or key in self.pending:
+                return pyramid
+            self.pending.add(key)
+        threading.Thread(target=self._prepare, args=(key, model, dict(colors)), daemon=True).start()
+        return None
+
+    def is_pending(self):
+        return bool(self.pending)
+
+    def _prepare(self, key, model, colors):
+        try:
+            x1, y1, x2, y2 = model.bounds
+            base_scale = min(TILE_BASE_SCALE, TILE_MAX_SIZE / max(x2 - x1, y2 - y1))
+            cache_file = self._cache_file(key)
+            base = None
+            if cache_file and os.path.exists(cache_file):
+                try:
+                    base = Image.open(cache_file)
+                    base.load()
+                except Exception as e:
+                    print(f"[MAP] Could not load zone image {cache_file}: {e}")
+                    base = None
+            if base is None:
+                base = render_zone_image(model, base_scale, colors)
+                if cache_file:
+                    self._save(base, cache_file)
+            pyramid = image_pyramid(base, base_scale)
+            with self.lock:
+                self.pyramids.put(key, pyramid)
+        except Exception as e:
+            print(f"[MAP] Zone image preparation failed: {e}")
+        finally:
+            with self.lock:
+                self.pending.discard(key)
+
+    def _cache_file(self, key):
+        world_hash = self.db.world_file_hash()
+        if world_hash is None:
+            return None
+        zone_id, level, version = key
+        return os.path.join(self.cache_dir, f"zone_{zone_id}_{level}_{world_hash[:16]}_{version}.png")
+
+    def _save(self, image, cache_file):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = cache_file + '.tmp'
+            image.save(tmp_file, format='PNG')
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"[MAP] Could not save zone image: {e}")
+
+    # === DISPLAY ===
+
+    @staticmethod
+    def view_image(pyramid, bounds, scale, ox, oy, view):
+        """
+        Part of a pyramid covering the canvas rectangle view = (x1, y1, x2, y2)
+        at the camera transform, as (PhotoImage, canvas x, canvas y) or None if
+        the zone is outside the view. Only the visible part is resized.
+        """
+        # Smallest pyramid image that is not coarser than the view
+        level_scale, image = pyramid[0]
+        for candidate_scale, candidate in pyramid:
+            if candidate_scale >= scale:
+                level_scale, image = candidate_scale, candidate
+
+        factor = scale / level_scale  # canvas pixels per image pixel
+        zone_x, zone_y = ox + scale * bounds[0], oy + scale * bounds[1]
+        left = max(view[0], zone_x)
+        top = max(view[1], zone_y)
+        right = min(view[2], zone_x + image.size[0] * factor)
+        bottom = min(view[3], zone_y + image.size[1] * factor)
+        if right - left < 1 or bottom - top < 1:
+            return None
+
+        crop = (int((left - zone_x) / factor), int((top - zone_y) / factor),
+                math.ceil((right - zone_x) / factor), math.ceil((bottom - zone_y) / factor))
+        part = image.crop(crop)
+        size = (max(1, round((crop[2] - crop[0]) * factor)), max(1, round((crop[3] - crop[1]) * factor)))
+        if part.size != size:
+            part = part.resize(size, Image.BILINEAR)
+        return ImageTk.PhotoImage(part), zone_x + crop[0] * factor, zone_y + crop[1] * factor
@@ -12,6 +12,7 @@ import time
 from pathlib import Path
 from datetime import datetime
 import json
+from core.counters import snapshot as counter_snapshot, histogram_snapshot
 
 class NightfallProfiler:
     def __init__(self, output_dir="profiling_results"):
@@ -38,6 +39,17 @@ class NightfallProfiler:
         self.profiler.dump_stats(str(stats_file))
         print(f"[PROFILER] Raw stats saved to: {stats_file}")
         
+        # Cache hit/miss counters
+        for name, counts in counter_snapshot().items():
+            print(f"[PROFILER] Cache {name}: {counts['hits']} hits, {counts['misses']} misses "
+                  f"({counts['hit_rate']:.0%}), {counts['evictions']} evictions, "
+                  f"{counts['invalidations']} invalidations")
+        
+        # Frame/render timings
+        for name, timings in histogram_snapshot().items():
+            print(f"[PROFILER] Timing {name}: {timings['count']} samples, mean {timings['mean_ms']}ms, "
+                  f"max {timings['max_ms']}ms, {timings['skipped']} frames skipped")
+        
         # Generate reports
         self._generate_text_report()
         self._generate_json_report()
@@ -55,6 +67,23 @@ class NightfallProfiler:
             print(f"Profiling Report - Session: {self.session_name}")
             print("=" * 80)
             
+            # Cache counters
+            print("\n### CACHE COUNTERS ###")
+            print("-" * 80)
+            print(f"{'Cache':<24}{'Hits':>10}{'Misses':>10}{'Hit rate':>10}{'Evicted':>10}{'Invalidated':>13}")
+            for name, counts in counter_snapshot().items():
+                print(f"{name:<24}{counts['hits']:>10}{counts['misses']:>10}{counts['hit_rate']:>10.1%}"
+                      f"{counts['evictions']:>10}{counts['invalidations']:>13}")
+            
+            # Frame/render timing histograms
+            print("\n### TIMING HISTOGRAMS ###")
+            print("-" * 80)
+            for name, timings in histogram_snapshot().items():
+                print(f"{name}: {timings['count']} samples, mean {timings['mean_ms']}ms, "
+                      f"max {timings['max_ms']}ms, {timings['skipped']} frames skipped")
+                for label, count in timings['buckets'].items():
+                    print(f"    {label:>8} {count:>8}")
+            
             # Create stats object
             stats = pstats.Stats(self.profiler)
             
@@ -117,6 +146,8 @@ class NightfallProfiler:
         report_data = {
             'session': self.session_name,
             'total_functions': len(stats_dict),
+            'cache_counters': counter_snapshot(),
+            'timing_histograms': histogram_snapshot(),
             'top_100_by_time': dict(sorted_stats[:100])
         }
         
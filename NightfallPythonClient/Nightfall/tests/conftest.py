@@ -0,0 +1,55 @@
+# conftest.py - Shared fixtures: a generated world file loaded by the real FastDatabase
+import json
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    import Levenshtein  # noqa: F401
+except ImportError:
+    # Only the fuzzy description match uses it, no test needs the real package
+    sys.modules['Levenshtein'] = types.ModuleType('Levenshtein')
+
+import core.storage
+from core.fast_database import FastDatabase
+from core.storage import Storage
+from map.room_customization import RoomCustomization
+from worlds import make_world
+
+
+@pytest.fixture
+def world():
+    return make_world()
+
+
+@pytest.fixture
+def world_file(tmp_path, world):
+    path = tmp_path / 'nightfall_world.json'
+    path.write_text(json.dumps(world, indent=2), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def db(world_file):
+    database = FastDatabase(world_file)
+    assert database.loaded
+    return database
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """A Storage in a temp dir served by get_storage() instead of data/client_data.sqlite3"""
+    store = Storage(str(tmp_path / 'client_data.sqlite3'), legacy_dir=str(tmp_path))
+    monkeypatch.setattr(core.storage, '_storage_instance', store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def customization(storage):
+    """RoomCustomization on the temp storage"""
+    return RoomCustomization()
@@ -0,0 +1,230 @@
+# fake_canvas.py - In-memory stand-in for a Tk canvas, enough for the map drawing code
+import itertools
+
+
+class FakeCanvas:
+    """
+    Keeps items as {id: (kind, coords, options, tags)} and implements the
+    canvas calls the map code makes: creating, moving, scaling and deleting
+    items, the scrolled view and after() timers (run with run_timers()).
+    """
+
+    def __init__(self, width=800, height=600):
+        self.width, self.height = width, height
+        self.items = {}
+        self.view = [0.0, 0.0]  # Canvas coordinate at the window's top left
+        self.options = {}
+        self.timers = {}
+        self.bindings = {}
+        self._ids = itertools.count(1)
+        self._mark = None
+
+    # === ITEMS ===
+
+    def _create(self, kind, args, options):
+        coords = list(args[0]) if len(args) == 1 and isinstance(args[0], (list, tuple)) else list(args)
+        tags = options.pop('tags', ())
+        tags = (tags,) if isinstance(tags, str) else tuple(tags)
+        item = next(self._ids)
+        self.items[item] = [kind, [float(v) for v in coords], options, tags]
+        return item
+
+    def create_rectangle(self, *args, **options):
+        return self._create('rectangle', args, options)
+
+    def create_oval(self, *args, **options):
+        return self._create('oval', args, options)
+
+    def create_line(self, *args, **options):
+        return self._create('line', args, options)
+
+    def create_polygon(self, *args, **options):
+        return self._create('polygon', args, options)
+
+    def create_text(self, *args, **options):
+        return self._create('text', args, options)
+
+    def create_image(self, *args, **options):
+        return self._create('image', args, options)
+
+    def find_withtag(self, tag):
+        if tag == 'all':
+            return tuple(self.items)
+        if isinstance(tag, int):
+            return (tag,) if tag in self.items else ()
+        return tuple(item for item, (_, _, _, tags) in self.items.items() if tag in tags)
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def kinds(self, tag='all'):
+        """Item kinds of the visible items matching a tag, for assertions"""
+        return sorted(self.items[item][0] for item in self.visible(tag))
+
+    def coords(self, tag, *coords):
+        found = self.find_withtag(tag)
+        if not found:
+            return []
+        if coords:
+            coords = coords[0] if len(coords) == 1 else coords
+            self.items[found[0]][1] = [float(v) for v in coords]
+            return None
+        return list(self.items[found[0]][1])
+
+    def itemconfig(self, tag, **options):
+        tags = options.pop('tags', None)
+        for item in self.find_withtag(tag):
+            self.items[item][2].update(options)
+            if tags is not None:
+                self.items[item][3] = (tags,) if isinstance(tags, str) else tuple(tags)
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, tag, option):
+        found = self.find_withtag(tag)
+        return self.items[found[0]][2].get(option, '') if found else ''
+
+    def gettags(self, tag):
+        found = self.find_withtag(tag)
+        return self.items[found[0]][3] if found else ()
+
+    def type(self, tag):
+        found = self.find_withtag(tag)
+        return self.items[found[0]][0] if found else None
+
+    def delete(self, *tags):
+        for tag in tags:
+            for item in self.find_withtag(tag):
+                del self.items[item]
+
+    def move(self, tag, dx, dy):
+        for item in self.find_withtag(tag):
+            coords = self.items[item][1]
+            self.items[item][1] = [v + (dx if i % 2 == 0 else dy) for i, v in enumerate(coords)]
+
+    def scale(self, tag, x, y, sx, sy):
+        for item in self.find_withtag(tag):
+            coords = self.items[item][1]
+            self.items[item][1] = [x + (v - x) * sx if i % 2 == 0 else y + (v - y) * sy
+                                   for i, v in enumerate(coords)]
+
+    def visible(self, tag='all'):
+        """Items matching a tag that are not hidden"""
+        return [item for item in self.find_withtag(tag) if self.items[item][2].get('state') != 'hidden']
+
+    def bbox(self, tag='all'):
+        points = [self.items[item][1] for item in self.visible(tag)]
+        xs = [v for coords in points for v in coords[0::2]]
+        ys = [v for coords in points for v in coords[1::2]]
+        if not xs:
+            return None
+        return (int(min(xs)), int(min(ys)), int(max(xs)) + 1, int(max(ys)) + 1)
+
+    def tag_lower(self, *args):
+        pass
+
+    def tag_raise(self, *args):
+        pass
+
+    lift = tag_raise
+
+    def tag_bind(self, tag, sequence, func, add=None):
+        self.bindings[(tag, sequence)] = func
+
+    # === VIEW ===
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def canvasx(self, x):
+        return self.view[0] + x
+
+    def canvasy(self, y):
+        return self.view[1] + y
+
+    def _region(self):
+        region = self.options.get('scrollregion')
+        if not region:
+            return None
+        return [float(v) for v in (region.split() if isinstance(region, str) else region)]
+
+    def xview_moveto(self, fraction):
+        region = self._region()
+        if region:
+            self.view[0] = region[0] + fraction * (region[2] - region[0])
+
+    def yview_moveto(self, fraction):
+        region = self._region()
+        if region:
+            self.view[1] = region[1] + fraction * (region[3] - region[1])
+
+    def xview(self):
+        region = self._region()
+        if not region:
+            return (0.0, 1.0)
+        size = region[2] - region[0]
+        return ((self.view[0] - region[0]) / size, (self.view[0] + self.width - region[0]) / size)
+
+    def yview(self):
+        region = self._region()
+        if not region:
+            return (0.0, 1.0)
+        size = region[3] - region[1]
+        return ((self.view[1] - region[1]) / size, (self.view[1] + self.height - region[1]) / size)
+
+    def scan_mark(self, x, y):
+        self._mark = (x, y)
+
+    def scan_dragto(self, x, y, gain=10):
+        mx, my = self._mark
+        self.view[0] -= (x - mx) * gain
+        self.view[1] -= (y - my) * gain
+        self._mark = (x, y)
+
+    def configure(self, **options):
+        self.options.update(options)
+
+    config = configure
+
+    def cget(self, option):
+        value = self.options.get(option, '')
+        if isinstance(value, (list, tuple)):
+            return ' '.join(str(v) for v in value)  # Tk hands lists back as strings
+        return value
+
+    def update_idletasks(self):
+        pass
+
+    def winfo_rgb(self, color):
+        if not color.startswith('#'):
+            return {'white': (65535, 65535, 65535), 'black': (0, 0, 0)}.get(color, (32896, 32896, 32896))
+        return tuple(int(color[i:i + 2], 16) * 257 for i in (1, 3, 5))
+
+    # === EVENTS ===
+
+    def bind(self, sequence, func=None, add=None):
+        self.bindings[sequence] = func
+
+    def after(self, delay, func=None, *args):
+        timer = f"after#{next(self._ids)}"
+        self.timers[timer] = (delay, func, args)
+        return timer
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, timer):
+        self.timers.pop(timer, None)
+
+    def run_timers(self, limit=1000):
+        """Run pending after() callbacks (including ones they schedule) in order"""
+        for _ in range(limit):
+            if not self.timers:
+                return
+            timer = next(iter(self.timers))
+            _, func, args = self.timers.pop(timer)
+            func(*args)
+        raise AssertionError("timers keep rescheduling")
@@ -0,0 +1,181 @@
+# test_camera.py - World-to-canvas transform, zooming, fitting and saved states of the camera
+from types import SimpleNamespace
+
+import pytest
+
+from fake_canvas import FakeCanvas
+from core.storage import Storage
+import map.camera
+from core.counters import get_histogram
+from map.camera import FRAME_MS, Camera
+
+BOUNDS = (-100, -50, 500, 250)
+
+
+@pytest.fixture
+def camera(storage):
+    camera = Camera(FakeCanvas(800, 600))
+    camera.world_bounds = BOUNDS
+    return camera
+
+
+def test_transform_round_trip(camera):
+    camera.zoom, camera.offset = 2.5, (30.0, -40.0)
+    assert camera.transform() == (2.5, 30.0, -40.0)
+    assert camera.world_to_canvas(10, 20) == (55.0, 10.0)
+    assert camera.canvas_to_world(*camera.world_to_canvas(-7, 13)) == pytest.approx((-7, 13))
+
+
+def test_zoom_keeps_the_point_under_the_mouse(camera):
+    calls = []
+    camera.on_view_changed = lambda: calls.append(camera.zoom)
+    camera.canvas.view = [120.0, 80.0]
+    world = camera.canvas_to_world(120 + 300, 80 + 200)
+    camera.on_zoom(SimpleNamespace(x=300, y=200, delta=500))
+    assert camera.zoom == pytest.approx(1.001 ** 500)
+    assert camera.world_to_canvas(*world) == pytest.approx((420, 280))
+    assert calls == [camera.zoom]
+
+    camera.on_zoom(SimpleNamespace(x=0, y=0, delta=-100000))
+    assert camera.zoom == 0.001
+
+
+def test_fit_to_content_centers_the_zone(camera):
+    camera.fit_to_content(padding=50)
+    assert camera.zoom == pytest.approx(min(700 / 600, 500 / 300))
+    cx, cy = camera.world_to_canvas((BOUNDS[0] + BOUNDS[2]) / 2, (BOUNDS[1] + BOUNDS[3]) / 2)
+    assert (cx, cy) == pytest.approx((400, 300))
+    region = [float(v) for v in camera.canvas.cget('scrollregion').split()]
+    x1, y1 = camera.world_to_canvas(*BOUNDS[:2])
+    assert region[:2] == pytest.approx((x1 - 2000, y1 - 2000))
+
+
+def test_center_on_point(camera):
+    camera.zoom_at(0, 0, 2.0)
+    camera.center_on_point(*camera.world_to_canvas(250, 100), animate=False)
+    assert camera.world_to_canvas(250, 100) == pytest.approx((400, 300))
+    assert not camera.following
+
+
+class Clock:
+    """perf_counter stand-in that only moves when told to"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(map.camera, 'time', SimpleNamespace(perf_counter=clock))
+    return clock
+
+
+def run_frames(camera, clock, frame_ms=FRAME_MS, limit=200):
+    """Run the glide frame by frame, frame_ms apart; the view corner after each frame"""
+    views = []
+    while camera.canvas.timers and len(views) < limit:
+        clock.now += frame_ms / 1000
+        timer = next(iter(camera.canvas.timers))
+        _, func, args = camera.canvas.timers.pop(timer)
+        func(*args)
+        views.append(tuple(camera.canvas.view))
+    return views
+
+
+def glide_camera(camera):
+    camera.fit_to_content()
+    camera.zoom_at(400, 300, 2.0)
+    return camera
+
+
+def test_center_on_point_glides_there(camera, clock):
+    glide_camera(camera)
+    frames = get_histogram('camera_follow').count
+    calls = []
+    camera.on_view_changed = lambda: calls.append(1)
+    transform = camera.transform()
+    camera.center_on_point(*camera.world_to_canvas(400, 200))
+    assert camera.following and camera.canvas.view == [0.0, 0.0] and not calls
+
+    views = run_frames(camera, clock)
+    assert not camera.following and camera.follow_target is None
+    assert camera.world_to_canvas(400, 200)[0] - camera.canvas.view[0] == pytest.approx(400, abs=1)
+    assert camera.world_to_canvas(400, 200)[1] - camera.canvas.view[1] == pytest.approx(300, abs=1)
+    # Monotone approach with shrinking steps, the transform is left alone
+    xs = [0.0] + [view[0] for view in views]
+    steps = [b - a for a, b in zip(xs, xs[1:])]
+    assert all(step >= 0 for step in steps) and steps[0] > steps[-1]
+    assert 3 < len(views) < 100 and len(calls) == len(views)
+    assert camera.transform() == transform
+    assert get_histogram('camera_follow').count - frames == len(views)
+
+
+def test_late_frame_covers_the_skipped_frames(camera, clock):
+    glide_camera(camera)
+    target = camera.world_to_canvas(400, 200)
+    camera.center_on_point(*target)
+    smooth = run_frames(camera, clock, limit=4)[-1]
+
+    camera.canvas.view = [0.0, 0.0]
+    skipped = get_histogram('camera_follow').skipped
+    camera.center_on_point(*target)
+    late = run_frames(camera, clock, frame_ms=4 * FRAME_MS + 1, limit=1)[-1]
+    assert late == pytest.approx(smooth, rel=0.02)
+    assert get_histogram('camera_follow').skipped - skipped == 3
+
+
+def test_moves_during_a_glide_retarget_it(camera, clock):
+    glide_camera(camera)
+    camera.center_on_point(*camera.world_to_canvas(400, 200))
+    run_frames(camera, clock, limit=2)
+    camera.center_on_point(*camera.world_to_canvas(300, 100))
+    assert len(camera.canvas.timers) == 1
+    run_frames(camera, clock)
+    assert camera.world_to_canvas(300, 100)[0] - camera.canvas.view[0] == pytest.approx(400, abs=1)
+
+
+def test_far_targets_are_jumped_to(camera, clock):
+    glide_camera(camera)
+    camera.center_on_point(*camera.world_to_canvas(100000, 100000))
+    assert not camera.following and not camera.canvas.timers
+    assert camera.world_to_canvas(100000, 100000) == pytest.approx((400, 300))
+
+
+def test_panning_stops_the_glide(camera, clock):
+    glide_camera(camera)
+    camera.center_on_point(*camera.world_to_canvas(400, 200))
+    camera.start_pan(SimpleNamespace(x=0, y=0))
+    assert not camera.following and not camera.canvas.timers and camera.follow_target is None
+
+
+def test_zone_state_round_trip(camera, storage):
+    camera.zoom_at(10, 10, 3.0)
+    camera.save_zone_state("7")
+    saved = storage.get('camera_states', "7")
+    assert saved["zoom"] == 3.0 and tuple(saved["offset"]) == (-20.0, -20.0)
+
+    restored = Camera(FakeCanvas())
+    assert restored.restore_zone_state("7")
+    assert restored.transform() == (3.0, -20.0, -20.0)
+    storage.put('camera_states', "8", {"zoom": 0.5, "view_x": 0, "view_y": 0})  # Saved before offsets existed
+    assert restored.restore_zone_state("8") and restored.offset == (0.0, 0.0)
+    assert not restored.restore_zone_state("9") and restored.transform() == (1.0, 0.0, 0.0)
+
+
+def test_zoom_and_pan_reach_the_disk_on_flush(camera, storage, tmp_path):
+    camera.current_zone_id = "1_0"
+    for delta in (120, 120, -60):
+        camera.on_zoom(SimpleNamespace(x=10, y=10, delta=delta))
+    camera.start_pan(SimpleNamespace(x=0, y=0))
+    camera.on_pan(SimpleNamespace(x=30, y=5))
+    assert not camera.canvas.timers and storage.pending
+    camera.flush_states()
+    assert not storage.pending
+
+    reader = Storage(str(tmp_path / 'client_data.sqlite3'), legacy_dir=None)
+    assert reader.get('camera_states', "1_0")["zoom"] == pytest.approx(camera.zoom)
+    reader.close()
@@ -0,0 +1,63 @@
+# test_description_search.py - Candidate lookup and ranking of the room description search
+import pytest
+
+from core.description_search import UNREACHABLE, DescriptionIndex, DescriptionSearch, normalize
+from worlds import ISLAND_ROOM, shortest_steps
+
+
+@pytest.fixture
+def description_index(db):
+    index = DescriptionIndex(db)
+    index.start()
+    assert index._ready.wait(5)
+    return index
+
+
+def run_search(index, query, origin=None):
+    search = DescriptionSearch(index, query, origin).start()
+    assert search.done.wait(5)
+    return [entry for page in search.pages for entry in page]
+
+
+@pytest.mark.parametrize("query", ["trees", "number 1", "ber 10 wi", "ees 0 0", "clearing", "zzz"])
+def test_candidates_hold_every_match(description_index, db, query):
+    query = normalize(query)
+    matches = {room_id for room_id, text in db.data["descriptions_index"] if query in normalize(text)}
+    candidates = description_index.candidates(query)
+    assert matches <= set(candidates)
+
+
+def test_whole_word_match_ranks_before_partial_ones(description_index):
+    results = run_search(description_index, "clearing number 1", origin=50)
+    assert results[0][0] == 1
+    assert {room_id for room_id, *_ in results} == {1} | set(range(10, 20)) | set(range(100, 109))
+
+
+def test_ties_are_ranked_by_steps_from_the_player(description_index, db):
+    results = run_search(description_index, "trees 3", origin=1)
+    steps = [distance[0] if distance else UNREACHABLE for *_, distance in results]
+    assert steps == sorted(steps)
+    assert results[0][4] is not None
+
+
+def test_steps_are_the_shortest_walks(description_index, world):
+    steps = shortest_steps(world, 50)
+    results = run_search(description_index, "clearing", origin=50)
+    assert len(results) == len(world["rooms"])
+    for room_id, *_, distance in results:
+        assert (distance[0] if distance else None) == steps.get(room_id)
+    assert results[-1][0] == ISLAND_ROOM
+
+
+def test_room_name_match_ranks_first(description_index, db):
+    db.data["rooms"]["30"]["name"] = "Clearing with trees"
+    results = run_search(description_index, "trees", origin=1)
+    assert results[0][0] == 30
+
+
+def test_cancelled_search_delivers_nothing(description_index):
+    search = DescriptionSearch(description_index, "clearing")
+    search.cancel()
+    search.start()
+    assert search.done.wait(5)
+    assert search.pages == []
@@ -0,0 +1,42 @@
+# test_jump_index.py - Ranking of the jump palette's zone and room index
+import pytest
+
+from core.jump_index import JumpIndex
+
+
+@pytest.fixture
+def jump_index(db):
+    index = JumpIndex(db)
+    index.start()
+    assert index._ready.wait(5)
+    return index
+
+
+def test_zone_ranks_before_rooms_holding_its_name(jump_index):
+    results = jump_index.search("zone 2")
+    assert results[0] == ('zone', 2, 'Zone 2', 2)
+    # Then the closest other names: rooms of zone 2 before any room of another zone
+    zones = [zone_id for kind, _, _, zone_id in results if kind == 'room']
+    assert zones and zones == sorted(zones, key=lambda zone_id: zone_id != 2)
+
+
+def test_name_prefix_ranks_first_and_shorter_names_win(jump_index):
+    results = jump_index.search("room 1")
+    assert results[0][:3] == ('room', 1, 'Room 1 of zone 1')
+    prefixed = [label for _, _, label, _ in results if label.lower().startswith("room 1")]
+    assert [label for _, _, label, _ in results[:len(prefixed)]] == prefixed
+
+
+def test_typo_still_finds_the_zone(jump_index):
+    assert jump_index.search("zome 3")[0][:2] == ('zone', 3)
+
+
+def test_room_id_query(jump_index, db):
+    kind, room_id, label, zone_id = jump_index.search("42")[0]
+    assert (kind, room_id, zone_id) == ('room', 42, db.get_room(42)["zone_id"])
+    assert label == db.get_room(42)["name"]
+
+
+def test_result_limit(jump_index):
+    assert len(jump_index.search("room", limit=5)) == 5
+    assert jump_index.search("   ") == []
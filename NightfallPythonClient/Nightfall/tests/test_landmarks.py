@@ -0,0 +1,108 @@
+# test_landmarks.py - Landmark bounds stay admissible and survive the disk cache
+from collections import deque
+
+from core.landmarks import UNREACHABLE, LandmarkIndex, bfs_steps
+
+
+def steps_from(graph, source):
+    """Reference BFS: steps from source to every reachable room index"""
+    steps = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for next_node in graph.neighbours(node):
+            if next_node not in steps:
+                steps[next_node] = steps[node] + 1
+                queue.append(next_node)
+    return steps
+
+
+def ready_index(db, cache_dir, count=4):
+    index = LandmarkIndex(db, count=count, home_zone=1)
+    index.cache_dir = str(cache_dir)
+    index.start()
+    index._thread.join()
+    return index
+
+
+def test_bfs_steps_match_the_reference(db):
+    graph = db.get_graph()
+    for source in (0, len(graph) // 2):
+        expected = steps_from(graph, source)
+        steps = bfs_steps(len(graph), graph.offsets, graph.targets, source)
+        assert {idx: s for idx, s in enumerate(steps) if s != UNREACHABLE} == expected
+
+
+def test_bounds_enclose_the_true_distance(db, tmp_path):
+    graph = db.get_graph()
+    index = ready_index(db, tmp_path)
+    assert index.is_ready() and len(index.landmarks) == 4
+    for u in range(0, len(graph), 3):
+        steps = steps_from(graph, u)
+        for v in range(len(graph)):
+            low = index.lower_bound(u, v)
+            assert 0 <= low
+            if v not in steps:
+                continue
+            assert low <= steps[v]
+            high = index.upper_bound(u, v)
+            assert high is None or high >= steps[v]
+
+
+def test_landmark_tables_are_exact_for_the_landmarks(db, tmp_path):
+    graph = db.get_graph()
+    index = ready_index(db, tmp_path)
+    assert graph.zone(index.landmarks[0]) == 1
+    forward, backward = index.tables_for(graph)
+    for landmark, fwd in zip(index.landmarks, forward):
+        steps = steps_from(graph, landmark)
+        assert [steps.get(v, UNREACHABLE) for v in range(len(graph))] == list(fwd)
+    for landmark, bwd in zip(index.landmarks, backward):
+        assert all(bwd[u] == steps_from(graph, u).get(landmark, UNREACHABLE) for u in range(0, len(graph), 5))
+
+
+def test_estimate_steps(db, tmp_path):
+    graph = db.get_graph()
+    index = ready_index(db, tmp_path)
+    start, end = graph.room_ids[0], graph.room_ids[-2]
+    low, high = index.estimate_steps(start, end)
+    true = steps_from(graph, 0)[graph.index(end)]
+    assert 1 <= low <= true <= high
+    assert index.estimate_steps(start, start) == (0, 0)
+    assert index.estimate_steps(start, 999999) is None
+
+
+def test_tables_are_cached_per_world_file(db, tmp_path):
+    index = ready_index(db, tmp_path)
+    cached = list(tmp_path.glob('landmarks_*_4.bin'))
+    assert len(cached) == 1
+
+    again = LandmarkIndex(db, count=4, home_zone=1)
+    again.cache_dir = str(tmp_path)
+    again._compute = None  # Must come from the cache
+    again._prepare(again.generation)
+    assert again.is_ready() and again.landmarks == index.landmarks
+    assert again.tables_for(db.get_graph()) == index.tables_for(db.get_graph())
+
+
+def test_only_the_latest_generation_publishes(db, tmp_path):
+    index = LandmarkIndex(db, count=4, home_zone=1)
+    index.cache_dir = str(tmp_path)
+    index.generation = 2
+    index._prepare(1)  # Superseded: neither published nor cached
+    assert not index.is_ready() and index.graph is None
+    assert not list(tmp_path.glob('landmarks_*'))
+
+    index = ready_index(db, tmp_path)
+    graph = db.get_graph()
+    assert db.delete_room(8)
+    assert index.tables_for(graph) is None  # Tables of the old graph are never handed out
+    index._thread.join()
+    assert index.is_ready() and index.graph is db.get_graph()
+
+
+def test_world_file_hash_follows_the_file(db, world_file):
+    first = db.world_file_hash()
+    assert first == db.world_file_hash() and len(first) == 40
+    assert db.delete_room(8)  # Saves the world file
+    assert db.world_file_hash() != first
@@ -0,0 +1,90 @@
+# test_map_viewer.py - MapViewer drawing helpers run against a stand-in viewer on a fake canvas
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from core.pathfinding import ZoneRouter
+from fake_canvas import FakeCanvas
+from map.map import POSITION_INDICATOR_MARGIN, MapViewer
+from map.render_cache import ZoneRenderCache
+from test_zone_renderer import renderer_for, zoom
+
+
+@pytest.fixture
+def viewer(db, customization):
+    model = ZoneRenderCache(db, customization).get(1, 0)
+    canvas, renderer = renderer_for(model)
+    renderer.update()
+    viewer = SimpleNamespace(this=canvas, camera=renderer.camera, zone_renderer=renderer,
+                             drawn_bounds=model.bounds, position_items=None, position_visible=False)
+    for name in ('update_position_indicator', 'hide_position_indicator'):
+        setattr(viewer, name, types.MethodType(getattr(MapViewer, name), viewer))
+    return viewer
+
+
+def crosshair(viewer):
+    horizontal, vertical = viewer.position_items
+    return viewer.this.coords(horizontal), viewer.this.coords(vertical)
+
+
+def test_crosshair_is_moved_not_recreated(viewer):
+    canvas = viewer.this
+    viewer.update_position_indicator(2)
+    items = viewer.position_items
+    model = viewer.zone_renderer.model
+    x, y = model.positions[2]
+    x1, y1, x2, y2 = model.bounds
+    margin = POSITION_INDICATOR_MARGIN
+    assert crosshair(viewer) == ([x1 - margin, y, x2 + margin, y], [x, y1 - margin, x, y2 + margin])
+
+    created = len(canvas.items)
+    viewer.update_position_indicator(20)
+    x, y = model.positions[20]
+    assert viewer.position_items == items and len(canvas.items) == created
+    assert crosshair(viewer)[0][1] == y and crosshair(viewer)[1][0] == x
+
+
+def test_crosshair_follows_the_camera(viewer):
+    viewer.update_position_indicator(20)
+    zoom(viewer.zone_renderer, 0.5)
+    viewer.update_position_indicator(20)
+    cx, cy = viewer.zone_renderer.room_canvas_center(20)
+    horizontal, vertical = crosshair(viewer)
+    assert horizontal[1] == horizontal[3] == cy and vertical[0] == vertical[2] == cx
+    assert horizontal[0] == viewer.camera.world_to_canvas(*viewer.drawn_bounds[:2])[0] - POSITION_INDICATOR_MARGIN
+
+
+def test_crosshair_hides_for_rooms_off_the_map(viewer):
+    canvas = viewer.this
+    viewer.update_position_indicator(2)
+    viewer.update_position_indicator(1)  # Room on another level
+    assert not viewer.position_visible
+    assert all(canvas.itemcget(item, 'state') == 'hidden' for item in viewer.position_items)
+    viewer.update_position_indicator(3)
+    assert all(canvas.itemcget(item, 'state') == 'normal' for item in viewer.position_items)
+
+
+# === AUTOWALK ===
+
+@pytest.fixture
+def walker(db):
+    sent, shown = [], []
+
+    def no_planning(start, end):
+        raise AssertionError("the route was planned already")
+    walker = SimpleNamespace(this=FakeCanvas(), current_room_id=2, zone_router=ZoneRouter(db),
+                             path_overlay=SimpleNamespace(show=shown.append, clear=lambda: None),
+                             parent=SimpleNamespace(connection=SimpleNamespace(send=sent.append)),
+                             find_path=no_planning, check_autowalk_progress=lambda: None,
+                             sent=sent, shown=shown)
+    for name in ('pathfind_to_room', 'send_next_walk_command'):
+        setattr(walker, name, types.MethodType(getattr(MapViewer, name), walker))
+    return walker
+
+
+def test_autowalk_starts_on_a_known_route(walker):
+    path = walker.zone_router.find_path(2, 100)
+    walker.pathfind_to_room(100, path)
+    assert walker.sent == [path[0]] and walker.autowalk_target == 100
+    assert walker.shown == [walker.zone_router.path_rooms(2, path)]
@@ -0,0 +1,126 @@
+# test_minimap.py - Zone raster, its cache and the viewport/player overlays of the minimap
+from types import SimpleNamespace
+
+import pytest
+
+from fake_canvas import FakeCanvas
+from map import minimap
+from map.camera import Camera
+from map.minimap import PLAYER_DOT, Minimap, zone_raster
+from map.render_cache import ZoneRenderCache
+
+COLORS = {'background': '#000000', 'room': '#c0c0c0', 'connection': '#808080', '#ff0000': '#ff0000'}
+
+
+class PhotoImage:
+    """Records the pixels put into it instead of needing a Tk root"""
+    created = 0
+
+    def __init__(self, master=None, width=0, height=0):
+        PhotoImage.created += 1
+        self._width, self._height = width, height
+        self.data = None
+
+    def put(self, data):
+        self.data = data
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+
+@pytest.fixture(autouse=True)
+def canvas_without_tk(monkeypatch, storage):
+    tk = SimpleNamespace(Canvas=lambda parent, width, height, **options: FakeCanvas(width, height),
+                         PhotoImage=PhotoImage)
+    monkeypatch.setattr(minimap, 'tk', tk)
+
+
+def model_for(db, customization, customizations):
+    """Zone 1 model with exactly these room customizations"""
+    for room_id in customization.customizations:
+        customization.clear_room_customization(room_id)
+    for room_id, custom in customizations.items():
+        customization.store_customization(room_id, custom)
+    return ZoneRenderCache(db, customization).get(1, 0)
+
+
+@pytest.fixture
+def model(db, customization):
+    return model_for(db, customization, {"2": {"color": "#ff0000"}})
+
+
+@pytest.fixture
+def viewer():
+    canvas = FakeCanvas(400, 300)
+    camera = Camera(canvas)
+    return SimpleNamespace(this=canvas, camera=camera, background_color='#000000', room_color='#c0c0c0',
+                           connection_color='#808080', player_marker_color='#ff6ec7')
+
+
+def pixel(rows, scale, bounds, x, y):
+    return rows[int((y - bounds[1]) * scale)][int((x - bounds[0]) * scale)]
+
+
+def test_raster_draws_rooms_and_exit_lines(model):
+    rows, scale = zone_raster(model, 100, COLORS)
+    x1, y1, x2, y2 = model.bounds
+    assert max(len(rows), len(rows[0])) == 100
+    assert (len(rows[0]), len(rows)) == (int((x2 - x1) * scale) + 1, int((y2 - y1) * scale) + 1)
+    assert pixel(rows, scale, model.bounds, *model.positions[2]) == '#ff0000'
+    for room_id, x, y, _ in model.rooms:
+        if room_id != 2:
+            assert pixel(rows, scale, model.bounds, x, y) == '#c0c0c0'
+    sx1, sy1, sx2, sy2, _ = model.segments[0]
+    assert pixel(rows, scale, model.bounds, (sx1 + sx2) / 2, (sy1 + sy2) / 2) == '#808080'
+    assert rows[0][0] == '#000000'
+
+
+def test_raster_is_cached_per_style(db, customization, model, viewer):
+    panel = Minimap(None, viewer)
+    created = PhotoImage.created
+    panel.set_model(model)
+    image = panel.canvas.itemcget(panel.image_item, 'image')
+    assert image.data.count('{') == image.height()
+    panel.set_model(model_for(db, customization, {"2": {"color": "#ff0000"}}))
+    assert PhotoImage.created - created == 1
+    panel.set_model(model_for(db, customization, {"3": {"color": "#ff0000"}}))
+    assert PhotoImage.created - created == 2
+    panel.set_model(None)
+    assert panel.canvas.visible() == []
+
+
+def test_viewport_and_player_follow_the_map(model, viewer):
+    panel = Minimap(None, viewer)
+    panel.set_model(model)
+    camera, canvas = viewer.camera, viewer.this
+    camera.world_bounds = model.bounds
+    camera.fit_to_content()
+    camera.zoom_at(200, 150, 3.0)
+    panel.update_view()
+    corner = camera.canvas_to_world(canvas.canvasx(0), canvas.canvasy(0))
+    assert panel.canvas.coords(panel.view_item)[:2] == pytest.approx(panel.to_panel(*corner))
+
+    panel.update_player(2)
+    x, y = panel.to_panel(*model.positions[2])
+    assert panel.canvas.coords(panel.player_item) == pytest.approx([x - PLAYER_DOT, y - PLAYER_DOT,
+                                                                     x + PLAYER_DOT, y + PLAYER_DOT])
+    assert panel.player_item in panel.canvas.visible()
+    panel.update_player(100)  # In another zone
+    assert panel.player_item not in panel.canvas.visible()
+
+
+def test_click_centers_the_map_there(model, viewer):
+    panel = Minimap(None, viewer)
+    panel.set_model(model)
+    camera, canvas = viewer.camera, viewer.this
+    camera.world_bounds = model.bounds
+    camera.fit_to_content()
+    camera.zoom_at(200, 150, 4.0)
+    target = model.positions[20]
+    x, y = panel.to_panel(*target)
+    panel.on_click(SimpleNamespace(x=x, y=y))
+    center = camera.canvas_to_world(canvas.canvasx(200), canvas.canvasy(150))
+    assert center == pytest.approx(target, abs=1 / panel.scale)
@@ -0,0 +1,26 @@
+# test_path_cache.py - Bounded LRU caches and their counters
+from core.counters import get_counter
+from core.path_cache import MISSING, LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2, 'test_lru_evict')
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the oldest
+    cache.put('c', 3)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert len(cache) == 2
+    assert cache.get('b', MISSING) is MISSING
+
+
+def test_counters_track_cache_use():
+    cache = LRUCache(1, 'test_lru_counts')
+    cache.get('x')
+    cache.put('x', None)
+    assert cache.get('x', MISSING) is None  # Cached None is a hit
+    cache.put('y', 1)
+    cache.clear()
+    cache.clear()  # Clearing an empty cache is not an invalidation
+    counts = get_counter('test_lru_counts').as_dict()
+    assert counts == {'hits': 1, 'misses': 1, 'evictions': 1, 'invalidations': 1, 'hit_rate': 0.5}
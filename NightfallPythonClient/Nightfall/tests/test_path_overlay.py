@@ -0,0 +1,84 @@
+# test_path_overlay.py - Autowalk route drawn over the zone and trimmed while walking
+import pytest
+
+from core.pathfinding import ZoneRouter
+from map.path_overlay import EXIT_MARKER, PathOverlay
+from map.render_cache import ZoneRenderCache
+from test_zone_renderer import renderer_for
+from worlds import walk
+
+
+@pytest.fixture
+def router(db):
+    return ZoneRouter(db)
+
+
+@pytest.fixture
+def overlay(db, customization):
+    model = ZoneRenderCache(db, customization).get(1, 0)
+    canvas, renderer = renderer_for(model, 4000, 4000)
+    renderer.update()
+    renderer.viewer.displayed_zone_id = 1
+    return PathOverlay(renderer.viewer)
+
+
+def canvas_points(overlay, room_ids):
+    scale, ox, oy = overlay.viewer.zone_renderer.drawn_transform
+    positions = overlay.viewer.zone_renderer.model.positions
+    return [v for room_id in room_ids for v in (ox + scale * positions[room_id][0], oy + scale * positions[room_id][1])]
+
+
+def test_path_rooms_replays_the_commands(router, world):
+    path = router.find_path(2, 100)
+    assert router.path_rooms(2, path) == walk(world, 2, path)
+    assert router.path_rooms(2, path[:2] + ['jump'] + path[2:]) == walk(world, 2, path[:2])
+    assert router.path_rooms(123456, path) == []
+
+
+def test_route_inside_the_zone_ends_in_an_arrow(overlay, router):
+    route = router.path_rooms(2, router.find_path(2, 30))
+    overlay.show(route)
+    canvas = overlay.canvas
+    [(start, end, line, marker)] = overlay.runs
+    assert (start, end, marker) == (0, len(route) - 1, None)
+    assert canvas.coords(line) == pytest.approx(canvas_points(overlay, route))
+    assert canvas.itemcget(line, 'arrow') == 'last'
+
+
+def test_route_leaving_the_zone_gets_a_ring(overlay, router):
+    route = router.path_rooms(2, router.find_path(2, 100))
+    overlay.show(route)
+    canvas = overlay.canvas
+    positions = overlay.viewer.zone_renderer.model.positions
+    inside = [room_id for room_id in route if room_id in positions]
+    start, end, line, marker = overlay.runs[0]
+    assert route[start:end + 1] == inside[:end - start + 1]
+    assert canvas.itemcget(line, 'arrow') == 'none'
+    x, y = canvas_points(overlay, [route[end]])
+    assert canvas.coords(marker) == pytest.approx([x - EXIT_MARKER, y - EXIT_MARKER, x + EXIT_MARKER, y + EXIT_MARKER])
+
+
+def test_walking_trims_the_line_without_new_items(overlay, router):
+    route = router.path_rooms(2, router.find_path(2, 30))
+    overlay.show(route)
+    canvas = overlay.canvas
+    items = dict(canvas.items)
+    line = overlay.runs[0][2]
+
+    overlay.advance(route[2])
+    assert canvas.coords(line) == pytest.approx(canvas_points(overlay, route[2:]))
+    overlay.show(route[2:])  # Re-planned from there: the same route
+    overlay.advance(999)     # Off the route: autowalk re-plans
+    assert overlay.position == 2 and overlay.runs[0][2] == line
+    assert canvas.items.keys() == items.keys()
+
+    overlay.advance(route[-1])
+    assert not canvas.visible('path_preview')
+
+
+def test_clear_releases_the_items(overlay, router):
+    overlay.show(router.path_rooms(2, router.find_path(2, 100)))
+    assert overlay.canvas.visible('path_preview')
+    overlay.clear()
+    assert not overlay.runs and not overlay.route
+    assert not overlay.canvas.visible('path_preview')
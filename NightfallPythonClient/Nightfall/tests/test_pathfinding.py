@@ -0,0 +1,174 @@
+# test_pathfinding.py - Plans and costs of the weighted zone/gateway router
+import random
+
+import pytest
+
+from core.landmarks import LandmarkIndex
+from core.pathfinding import ROUTE_AVOID, ROUTE_FORBID, CostModel, ZoneRouter
+from core.room_graph import RoomGraph
+from worlds import ISLAND_ROOM, shortest_costs, shortest_steps, walk
+
+
+@pytest.fixture
+def router(db):
+    return ZoneRouter(db)
+
+
+def reference_cost(world, model):
+    """Exit cost function for worlds.shortest_costs that follows a CostModel"""
+    rooms = world["rooms"]
+
+    def exit_cost(from_id, exit_info):
+        to_id = int(exit_info["to"])
+        flag = model.route_flags.get(to_id)
+        if flag == ROUTE_FORBID:
+            return None
+        cost = model.command_cost if exit_info.get("command") else model.step_cost
+        if rooms[str(from_id)]["zone_id"] != rooms[str(to_id)]["zone_id"]:
+            cost += model.zone_change_cost
+        if flag == ROUTE_AVOID:
+            cost += model.avoid_cost
+        return cost
+    return exit_cost
+
+
+def route_cost(world, model, start, path):
+    rooms = walk(world, start, path)
+    exit_cost = reference_cost(world, model)
+    total = 0.0
+    for a, b in zip(rooms, rooms[1:]):
+        exit_info = next(e for e in world["exits"][str(a)] if int(e["to"]) == b)
+        total += exit_cost(a, exit_info)
+    return total
+
+
+def test_same_zone_plan_is_direct(router, world):
+    index_of = router.graph.index_of
+    assert router.plan(index_of[1], index_of[30]) == [index_of[1], index_of[30]]
+    assert walk(world, 1, router.find_path(1, 30))[-1] == 30
+    assert router.find_path(5, 5) == []
+
+
+def test_cross_zone_plan_hops_between_gateways(router, world):
+    graph = router.graph
+    waypoints = router.plan(graph.index_of[1], graph.index_of[100])
+    assert graph.room_ids[waypoints[0]] == 1 and graph.room_ids[waypoints[-1]] == 100
+    for idx in waypoints[1:-1]:
+        assert idx in router.gateways[graph.zone_of[idx]]
+    zones = [graph.zone_of[idx] for idx in waypoints]
+    assert zones[0] == 1 and zones[-1] == 3 and 2 in zones
+    assert walk(world, 1, router.find_path(1, 100))[-1] == 100
+
+
+def test_unit_costs_give_shortest_routes(db, world):
+    router = ZoneRouter(db, CostModel(step_cost=1, command_cost=1, zone_change_cost=0))
+    rng = random.Random(7)
+    room_ids = [int(room_id) for room_id in world["rooms"]]
+    for _ in range(150):
+        start, end = rng.choice(room_ids), rng.choice(room_ids)
+        steps = shortest_steps(world, start).get(end)
+        path = router.find_path(start, end)
+        if steps is None:
+            assert path is None
+            continue
+        assert walk(world, start, path)[-1] == end
+        assert len(path) == steps
+
+
+def test_weighted_routes_are_cheapest(db, world):
+    model = CostModel(route_flags={40: ROUTE_AVOID, 45: ROUTE_AVOID, 80: ROUTE_FORBID})
+    router = ZoneRouter(db, model)
+    rng = random.Random(3)
+    room_ids = [int(room_id) for room_id in world["rooms"]]
+    for start in rng.sample(room_ids, 12):
+        costs = shortest_costs(world, start, reference_cost(world, model))
+        for end in rng.sample(room_ids, 12):
+            path = router.find_path(start, end)
+            if end not in costs:
+                assert path is None
+                continue
+            assert route_cost(world, model, start, path) == pytest.approx(costs[end])
+
+
+def test_landmark_heuristic_keeps_routes_cheapest(db, world, tmp_path):
+    landmarks = LandmarkIndex(db, count=4, home_zone=1)
+    landmarks.cache_dir = str(tmp_path)
+    landmarks.start()
+    landmarks._thread.join()
+    model = CostModel(route_flags={40: ROUTE_AVOID})
+    router = ZoneRouter(db, model, landmarks=landmarks)
+    assert router._heuristic(0) is not None
+    for start in (1, 17, 50, 77):
+        costs = shortest_costs(world, start, reference_cost(world, model))
+        for end in (2, 36, 60, 108):
+            assert route_cost(world, model, start, router.find_path(start, end)) == pytest.approx(costs[end])
+
+
+def test_cost_model_compiles_edge_costs():
+    rooms = {str(i): {"id": i, "zone_id": 2 if i == 3 else 1} for i in range(1, 7)}
+    exits = {"1": [{"to": 2, "type": 0}, {"to": 2, "type": 10, "command": "open door"},
+                   {"to": 3, "type": 2}, {"to": 5, "type": 4}, {"to": 6, "type": 6}]}
+    graph = RoomGraph(rooms, exits)
+    model = CostModel(step_cost=1, command_cost=3, zone_change_cost=2, avoid_cost=25,
+                      route_flags={5: ROUTE_AVOID, 6: ROUTE_FORBID})
+    assert list(model.compile(graph)) == [1, 3, 3, 26, float('inf')]
+
+
+def test_forbidden_rooms_are_never_entered(db, world):
+    router = ZoneRouter(db, CostModel(route_flags={8: ROUTE_FORBID}))
+    for end in (30, 100):
+        assert 8 not in walk(world, 1, router.find_path(1, end))
+    assert router.find_path(1, 8) is None
+
+
+def test_unreachable_and_unknown_rooms(router):
+    assert router.find_path(1, ISLAND_ROOM) is None
+    assert router.find_path(1, 123456) is None
+
+
+def test_find_nearest_picks_the_cheapest_match(router, world):
+    model = router.cost_model
+    targets = {30, 64, 100}
+    costs = shortest_costs(world, 1, reference_cost(world, model))
+    room_id, path = router.find_nearest(1, targets.__contains__)
+    assert costs[room_id] == min(costs[t] for t in targets)
+    assert walk(world, 1, path)[-1] == room_id
+    assert route_cost(world, model, 1, path) == pytest.approx(costs[room_id])
+    assert router.find_nearest(1, lambda room_id: room_id == 1) == (1, [])
+    assert router.find_nearest(1, {ISLAND_ROOM}.__contains__) is None
+    assert router.find_nearest(123456, targets.__contains__) is None
+
+
+def test_routes_to_a_destination_grow_its_tree(router, world):
+    graph = router.graph
+    end = graph.index_of[100]
+    planned = list(router.refine(router.plan(graph.index_of[1], end)))
+    first = router.find_path(1, 100)
+    assert first == planned
+    assert router.tree_cache.keys() == [(graph, end)]
+    tree = router.tree_cache.get((graph, end))
+    assert len(tree) == len(first)  # Only the rooms of the route, no search over the world
+
+    # Autowalk re-plans from every room it reaches: the rest of the same route
+    route = walk(world, 1, first)
+    for i, room_id in enumerate(route):
+        assert router.find_path(room_id, 100) == first[i:]
+
+    others = {start: router.find_path(start, 100) for start in (2, 20, 45, 70, 99)}
+    for start, path in others.items():
+        assert walk(world, start, path)[-1] == 100
+        assert router.find_path(start, 100) == path
+    assert router.find_path(1, 100) == first
+    assert router.find_path(ISLAND_ROOM, 100) is None
+    assert tree[graph.index_of[ISLAND_ROOM]] == -1
+
+
+def test_graph_change_drops_cached_routes(router, db):
+    router.find_path(1, 100)
+    router.find_path(1, 100)
+    old_graph = router.graph
+    assert len(router.tree_cache) and len(router.segment_cache)
+    assert db.delete_room(8)
+    assert router.graph is db.get_graph() is not old_graph
+    assert not len(router.tree_cache) and not len(router.segment_cache)
+    assert router.find_path(1, 8) is None
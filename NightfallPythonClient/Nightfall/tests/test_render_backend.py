@@ -0,0 +1,99 @@
+# test_render_backend.py - Headless drawing through the RecordingBackend
+import pytest
+
+from map import camera
+from map.render_backend import HeadlessViewer, RecordingBackend, RenderBackend
+from map.render_cache import ZoneRenderCache
+from map.zone_renderer import LOD_FULL
+
+
+@pytest.fixture(autouse=True)
+def temp_storage(storage):
+    pass
+
+
+@pytest.fixture
+def model(db, customization):
+    customization.store_customization("2", {"note": "chest"})
+    return ZoneRenderCache(db, customization).get(1, 0)
+
+
+def test_recording_backend_has_every_protocol_call():
+    calls = [name for name, value in vars(RenderBackend).items() if callable(value) and not name.startswith('_')]
+    assert 'create_line' in calls and 'winfo_rgb' in calls
+    assert all(callable(getattr(RecordingBackend, name, None)) for name in calls)
+
+
+def test_headless_viewer_keeps_off_the_users_storage(model, monkeypatch):
+    def no_storage():
+        raise AssertionError("headless runs must not open data/client_data.sqlite3")
+    monkeypatch.setattr(camera, 'get_storage', no_storage)
+    viewer = HeadlessViewer(RecordingBackend(400, 300))
+    assert viewer.render(model)
+    viewer.camera.save_zone_state("1_0")
+    assert viewer.camera.storage.get('camera_states', "1_0")
+
+
+def test_backend_records_calls_and_items():
+    backend = RecordingBackend(200, 100)
+    line = backend.create_line(0, 0, 10, 10, tags=("connection",))
+    box = backend.create_rectangle((5, 5, 20, 30), tags="room")
+    backend.coords(line, 0, 0, 40, 50)
+    backend.itemconfig(box, state='hidden')
+    assert backend.calls == {'create_line': 1, 'create_rectangle': 1, 'coords': 1, 'itemconfig': 1}
+    assert backend.created == {'line': 1, 'rectangle': 1}
+    assert backend.find_withtag('room') == (box,) and backend.coords(box) == [5, 5, 20, 30]
+    assert backend.bbox('all') == (0, 0, 41, 51) and backend.visible_count() == 1
+    backend.delete('connection')
+    assert backend.find_withtag('all') == (box,)
+
+
+def test_backend_without_items_only_counts():
+    backend = RecordingBackend(keep_items=False)
+    items = [backend.create_oval(0, 0, 1, 1) for _ in range(3)]
+    backend.coords(items[0], 1, 1, 2, 2)
+    assert items == [1, 2, 3] and not backend.items
+    assert backend.calls['create_oval'] == 3 and backend.coords(items[0]) == []
+
+
+def test_backend_view_and_timers():
+    backend = RecordingBackend(200, 100)
+    backend.configure(scrollregion=(-100, -100, 300, 100))
+    assert backend.cget('scrollregion') == '-100 -100 300 100'
+    backend.xview_moveto(0.5)
+    assert (backend.canvasx(0), backend.canvasy(0)) == (100.0, 0.0)
+    ran = []
+    backend.after(10, lambda: ran.append(1))
+    backend.after_cancel(backend.after(10, lambda: ran.append(2)))
+    backend.run_pending()
+    assert ran == [1] and not backend.pending
+
+
+def test_headless_viewer_draws_a_zone(model):
+    backend = RecordingBackend(400, 300)
+    viewer = HeadlessViewer(backend)
+    assert viewer.render(model)
+    renderer = viewer.zone_renderer
+    drawn = {item for items in renderer.room_items.values() for item in items}
+    drawn |= set(renderer.segment_items.values()) | set(renderer.note_items.values())
+    assert backend.visible_count() == len(drawn) > 0
+
+    assert viewer.render(model, zoom=1.0) and renderer.lod == LOD_FULL
+    scale, ox, oy = renderer.transform()
+    assert scale == 1.0
+    center = ((model.bounds[0] + model.bounds[2]) / 2, (model.bounds[1] + model.bounds[3]) / 2)
+    assert (ox + center[0], oy + center[1]) == pytest.approx((200, 150))
+    created = backend.created.copy()
+    assert viewer.render(model, zoom=1.0)
+    assert backend.created == created  # Drawn again from the pool
+
+
+def test_full_detail_items_carry_their_tags(model):
+    backend = RecordingBackend(4000, 4000)
+    viewer = HeadlessViewer(backend)
+    viewer.render(model, zoom=1.0)
+    assert backend.find_withtag('2_note') and not backend.find_withtag('3_note')
+    assert backend.find_withtag('2_shadow') and backend.find_withtag('2_room')
+    for x, y, to_zone in model.notes:
+        assert backend.find_withtag(f"zone_{to_zone}")
+    assert len(backend.find_withtag('zone_note')) == len(model.notes)
@@ -0,0 +1,58 @@
+# test_render_cache.py - Zone render models cached per (zone, level) and dropped on changes
+import pytest
+
+from map.render_cache import ZoneRenderCache
+from map.render_prep import room_shapes
+
+
+@pytest.fixture
+def cache(db, customization):
+    customization.set_room_customization(2, color="#ff0000")
+    customization.set_room_customization(3, note="shop")
+    customization.set_room_customization(4, route="avoid")
+    return ZoneRenderCache(db, customization, max_models=4)
+
+
+def test_models_are_reused_and_styled(cache):
+    model = cache.get(1, 0)
+    assert cache.get(1, 0) is model
+    assert model.styles == {2: ("#ff0000", False), 3: (None, True)}
+    assert model.zone_names == {2: "Zone 2"}
+    assert {to_zone for _, _, to_zone in model.cross_exits} == {2}
+    # Shapes are prepared up front, or by the renderer for the rooms it draws
+    assert all(shapes == room_shapes(*model.positions[room_id]) for room_id, shapes in model.shapes.items())
+
+
+def test_styles_are_read_per_room(cache, customization, monkeypatch):
+    def no_snapshot(namespace):
+        raise AssertionError("building a model must not copy every customization")
+    monkeypatch.setattr(customization.storage, 'items', no_snapshot)
+    assert cache.build(1, 0).styles == {2: ("#ff0000", False), 3: (None, True)}
+    assert customization.get(2) == {"color": "#ff0000"} and customization.get(5) is None
+    assert customization.get_room_customization(5) == {}
+
+
+def test_lru_keeps_the_latest_zone_levels(cache):
+    for key in [(1, 0), (1, 1), (2, 0), (2, 1), (3, 0)]:
+        cache.get(*key)
+    assert set(cache.models.keys()) == {(1, 1), (2, 0), (2, 1), (3, 0)}
+
+
+def test_customizing_a_room_drops_only_its_zone(cache):
+    first, second = cache.get(1, 0), cache.get(2, 0)
+    cache.invalidate_zone(1)
+    assert cache.get(1, 0) is not first
+    assert cache.get(2, 0) is second
+
+
+def test_graph_rebuild_drops_every_model(cache, db):
+    model = cache.get(2, 0)
+    db.build_graph()
+    assert not len(cache.models)
+    rebuilt = cache.get(2, 0)
+    assert rebuilt is not model and rebuilt.graph is db.get_graph()
+
+
+def test_prefetch_builds_the_neighbouring_zones(cache):
+    cache._prefetch(2, 0)
+    assert set(cache.models.keys()) == {(1, 0), (2, 0), (3, 0)}
@@ -0,0 +1,105 @@
+# test_render_prep.py - Zone geometry prepared for drawing matches the world's exits
+import pytest
+
+from core.zone_geometry import ZoneGeometry
+from map.render_prep import ROOM_EXTENT, prepare_zone, prepare_zone_arrays
+from worlds import ISLAND_ZONE
+
+
+def reference_lines(world, zone_id, level):
+    """{frozenset of the two room ids: bidirectional} for exits between rooms of one zone level"""
+    rooms = world["rooms"]
+
+    def on_level(room_id):
+        room = rooms.get(str(room_id))
+        return room and room["zone_id"] == zone_id and room["position"]["z"] == level
+
+    pairs = {(int(a), int(e["to"])) for a, exits in world["exits"].items() for e in exits
+             if on_level(a) and on_level(e["to"]) and int(a) != int(e["to"])}
+    return {frozenset(pair): (pair[1], pair[0]) in pairs for pair in pairs}
+
+
+def prepared(db, zone_id, level):
+    rooms = db.data["rooms"]
+    return prepare_zone(db.get_graph(), db.get_rooms_in_zone(zone_id), zone_id, level,
+                        has_position=lambda room_id: rooms.get(str(room_id), {}).get("position") is not None)
+
+
+@pytest.mark.parametrize("zone_id", [1, 2, 3])
+def test_segments_merge_two_way_exits(db, world, zone_id):
+    geometry = prepared(db, zone_id, 0)
+    positions = geometry.positions
+    by_position = {position: room_id for room_id, position in positions.items()}
+    lines = {}
+    for x1, y1, x2, y2, bidirectional in geometry.segments:
+        pair = frozenset((by_position[(x1, y1)], by_position[(x2, y2)]))
+        assert pair not in lines  # One line per exit pair
+        lines[pair] = bidirectional
+    assert lines == reference_lines(world, zone_id, 0)
+
+
+def test_level_filter_and_bounds(db, world):
+    geometry = prepared(db, 1, 0)
+    assert len(geometry.rooms) == 35 and 1 not in geometry.positions
+    xs = [x for _, x, _, _ in geometry.rooms]
+    ys = [y for _, _, y, _ in geometry.rooms]
+    assert geometry.bounds == (min(xs) - ROOM_EXTENT, min(ys) - ROOM_EXTENT,
+                               max(xs) + ROOM_EXTENT, max(ys) + ROOM_EXTENT)
+
+    upper = prepared(db, 1, 1)
+    assert [room[0] for room in upper.rooms] == [1] and upper.segments == []
+    assert prepared(db, 1, 5).bounds is None
+
+
+def test_notes_point_to_neighbouring_zones(db, world):
+    notes = prepared(db, 2, 0).notes
+    rooms = world["rooms"]
+    expected = set()
+    for room_id, exits in world["exits"].items():
+        room = rooms[room_id]
+        if room["zone_id"] != 2 or room["position"]["z"] != 0:
+            continue
+        for exit_info in exits:
+            to_zone = rooms[str(exit_info["to"])]["zone_id"]
+            if to_zone != 2:
+                expected.add((room["position"]["x"], room["position"]["y"], to_zone))
+    assert len(notes) == len(set(notes)) and set(notes) == expected
+    assert {to_zone for _, _, to_zone in notes} == {1, 3}
+
+
+# === NUMPY PATH ===
+
+@pytest.fixture
+def geometry(db):
+    pytest.importorskip("numpy")
+    return ZoneGeometry(db.get_graph(), db.data["rooms"])
+
+
+def test_zone_geometry_groups_rooms_by_zone_level(db, geometry):
+    for zone_id, _ in db.get_all_zones():
+        if zone_id == ISLAND_ZONE:
+            continue
+        assert geometry.zone_levels(zone_id) == [0, 1]
+        for level in (0, 1):
+            room_ids = sorted(geometry.room_ids[geometry.level_indices(zone_id, level)].tolist())
+            assert room_ids == sorted(r[0] for r in prepared(db, zone_id, level).rooms)
+    assert len(geometry.level_indices(99, 0)) == 0
+
+
+def test_integer_positions_stay_integers(db, geometry):
+    assert geometry.xs.dtype.kind == 'i' and geometry.ys.dtype.kind == 'i'
+    model = prepare_zone_arrays(geometry, 1, 0)
+    assert all(type(v) is int for x, y in model.positions.values() for v in (x, y))
+    assert all(type(v) is int for v in model.bounds)
+
+
+@pytest.mark.parametrize("zone_id", [1, 2, 3])
+@pytest.mark.parametrize("level", [0, 1])
+def test_arrays_match_per_room_preparation(db, geometry, zone_id, level):
+    expected, model = prepared(db, zone_id, level), prepare_zone_arrays(geometry, zone_id, level)
+    assert sorted(model.rooms) == sorted(expected.rooms)
+    assert model.positions == expected.positions
+    assert model.bounds == expected.bounds
+    assert sorted(model.segments) == sorted(expected.segments)
+    assert sorted(model.notes, key=str) == sorted(expected.notes, key=str)
+    assert sorted(model.cross_exits, key=str) == sorted(expected.cross_exits, key=str)
@@ -0,0 +1,119 @@
+# test_room_graph.py - CSR layout, reverse index and round trip of the exit graph
+import json
+import os
+
+from core import fast_database
+from core.fast_database import FastDatabase
+from core.room_graph import NO_ZONE, RoomGraph
+
+
+def test_edges_follow_exit_lists(world):
+    graph = RoomGraph(world["rooms"], world["exits"])
+    assert len(graph) == len(world["rooms"])
+    assert graph.offsets[0] == 0 and graph.offsets[-1] == graph.edge_count
+    for room_id in graph.room_ids:
+        idx = graph.index(room_id)
+        expected = [(e["to"], e.get("command") or None) for e in world["exits"].get(str(room_id), ())]
+        got = [(graph.room_ids[graph.targets[edge]], graph.commands.get(edge)) for edge in graph.edges(idx)]
+        assert got == expected
+
+
+def test_reverse_index_lists_incoming_edges(world):
+    graph = RoomGraph(world["rooms"], world["exits"])
+    for idx in range(len(graph)):
+        incoming = graph.rev_edges[graph.rev_offsets[idx]:graph.rev_offsets[idx + 1]]
+        assert all(graph.targets[edge] == idx for edge in incoming)
+        assert sorted(incoming) == [e for e in range(graph.edge_count) if graph.targets[e] == idx]
+        for edge in graph.edges(idx):
+            assert graph.edge_source[edge] == idx
+
+
+def test_exit_dict_round_trip(world):
+    graph = RoomGraph(world["rooms"], world["exits"])
+    assert graph.to_exit_dict() == world["exits"]
+    assert graph.edge_command(next(e for e in range(graph.edge_count) if e in graph.commands)) == "enter portal"
+
+
+def test_unknown_targets_and_zones():
+    rooms = {"1": {"id": 1, "zone_id": 4}, "2": {"id": 2}}
+    graph = RoomGraph(rooms, {"1": [{"to": 2, "type": 2}, {"to": 99, "type": 4}]})
+    assert graph.edge_count == 1
+    assert graph.zone(graph.index(1)) == 4
+    assert graph.zone_of[graph.index(2)] == NO_ZONE and graph.zone(graph.index(2)) is None
+    assert graph.index(99) is None
+    assert graph.exits_from(99) == []
+
+
+# === FASTDATABASE ===
+
+def test_database_serves_exits_from_the_graph(db, world):
+    assert "exits" not in db.data
+    assert db.get_graph().edge_count == sum(len(exits) for exits in world["exits"].values())
+    assert db.get_exits_from_room(1) == world["exits"]["1"]
+
+
+def test_delete_room_drops_its_exits_and_saves(db, world_file):
+    incoming = [int(room_id) for room_id, exits in db.get_graph().to_exit_dict().items()
+                if any(e["to"] == 8 for e in exits)]
+    assert incoming and db.delete_room(8)
+    assert db.get_room(8) is None and db.get_graph().index(8) is None
+    assert all(e["to"] != 8 for room_id in incoming for e in db.get_exits_from_room(room_id))
+
+    reloaded = FastDatabase(world_file)
+    assert "8" not in reloaded.data["rooms"]
+    assert 8 not in reloaded.data["zone_rooms"]["1"]
+    assert reloaded.get_graph().to_exit_dict() == db.get_graph().to_exit_dict()
+
+
+def test_save_keeps_exit_records_the_graph_drops(world, world_file):
+    exits = world["exits"]
+    exits["2"].append({"to": 99999, "type": 2})                     # Target not in the world
+    exits["3"].append({"to": 4, "command": "climb", "note": "rope"})  # No type, extra field
+    with open(world_file, 'w', encoding='utf-8') as f:
+        json.dump(world, f, indent=2)
+    db = FastDatabase(world_file)
+    assert db.delete_room(8)
+
+    text = open(world_file, encoding='utf-8').read()
+    assert text.startswith('{\n  "')
+    saved = json.loads(text)["exits"]
+    assert "8" not in saved and all(e["to"] != 8 for records in saved.values() for e in records)
+    for room_id, records in exits.items():
+        if room_id != "8":
+            assert saved.get(room_id, []) == [e for e in records if e["to"] != 8]
+    assert {"to": 99999, "type": 2} in saved["2"]
+    assert {"to": 4, "command": "climb", "note": "rope"} in saved["3"]
+
+
+def test_failed_save_keeps_the_room_and_the_file(db, world_file, monkeypatch):
+    before = open(world_file, encoding='utf-8').read()
+    graph = db.get_graph()
+
+    def broken_dump(data, f):
+        f.write("{ half a world")
+        raise OSError("disk full")
+    monkeypatch.setattr(fast_database.json, 'dump', broken_dump)
+    assert not db.delete_room(8)
+    assert open(world_file, encoding='utf-8').read() == before
+    assert not os.path.exists(world_file + '.tmp')
+    assert db.get_room(8) is not None and db.get_graph().index(8) is not None
+    assert db.get_graph() is not graph  # Reloaded from the untouched file
+
+
+def test_rooms_in_zone_follow_zone_rooms(world, world_file):
+    world["zone_rooms"]["1"].reverse()
+    room_id = world["zone_rooms"]["1"][3]
+    world["rooms"][str(room_id)]["position"]["z"] = None  # Counts as level 0
+    with open(world_file, 'w', encoding='utf-8') as f:
+        json.dump(world, f, indent=2)
+    db = FastDatabase(world_file)
+
+    for level in (None, 0, 1):
+        expected = []
+        for rid in world["zone_rooms"]["1"]:
+            room = world["rooms"][str(rid)]
+            pos = room["position"]
+            if level is None or pos["z"] == level or (level == 0 and pos["z"] is None):
+                expected.append((room["id"], pos["x"], pos["y"], pos["z"], room["name"]))
+        assert db.get_rooms_in_zone(1, level) == expected
+    assert (room_id, None) in [(r[0], r[3]) for r in db.get_rooms_in_zone(1, 0)]
@@ -0,0 +1,46 @@
+# test_room_query.py - Query parsing and room predicates of "walk to the nearest ..."
+import pytest
+
+from core.room_query import build_room_predicate
+
+
+@pytest.fixture
+def entities(storage):
+    storage.put('room_items', 4, {"items": ["Rusty Sword"]})
+    storage.put('room_npcs', 9, {"npcs": ["town guard"]})
+    storage.put('room_npcs', 11, {"npcs": ["Guard captain"]})
+    return storage
+
+
+CUSTOMIZATIONS = {"3": {"note": "Bank vault"}, "5": {"color": "#FF0000"}, "6": {"note": "bank", "color": "#00ff00"}}
+
+
+def test_items_and_npcs_match_case_insensitively(entities, db):
+    predicate, label = build_room_predicate("guard", db, CUSTOMIZATIONS)
+    assert label == "'guard'"
+    assert [room_id for room_id in range(1, 20) if predicate(room_id)] == [9, 11]
+    predicate, _ = build_room_predicate("sword", db, CUSTOMIZATIONS)
+    assert predicate(4) and not predicate(9)
+
+
+def test_note_and_color_queries(db):
+    predicate, label = build_room_predicate("note: bank", db, CUSTOMIZATIONS)
+    assert label == "room with note 'bank'"
+    assert {room_id for room_id in range(10) if predicate(room_id)} == {3, 6}
+    predicate, label = build_room_predicate("color:", db, CUSTOMIZATIONS)
+    assert label == "room with color"
+    assert {room_id for room_id in range(10) if predicate(room_id)} == {5, 6}
+    predicate, _ = build_room_predicate("color:#ff0000", db, CUSTOMIZATIONS)
+    assert {room_id for room_id in range(10) if predicate(room_id)} == {5}
+
+
+def test_name_pattern(db):
+    predicate, label = build_room_predicate("name:^room 1\\d of zone 1$", db, {})
+    assert label == "room named /^room 1\\d of zone 1$/"
+    assert [room_id for room_id in range(1, 40) if predicate(room_id)] == list(range(10, 20))
+
+
+@pytest.mark.parametrize("query", ["", "   ", "name:", "name:[unclosed"])
+def test_invalid_queries_raise(db, query):
+    with pytest.raises(ValueError):
+        build_room_predicate(query, db, {})
@@ -0,0 +1,75 @@
+# test_route_planner.py - Tour improvement (2-opt), cost matrix and visiting order
+import itertools
+import random
+
+from core import route_planner
+from core.pathfinding import ZoneRouter
+from core.route_planner import (NO_ROUTE, cost_matrix, cost_rows, nearest_neighbour_order,
+                                plan_visit_order, tour_cost, two_opt)
+
+
+def random_matrix(n, rng, asymmetric=True):
+    points = [(rng.random() * 100, rng.random() * 100) for _ in range(n)]
+    matrix = [[abs(ax - bx) + abs(ay - by) for bx, by in points] for ax, ay in points]
+    if asymmetric:
+        for row in matrix:
+            for j in range(n):
+                row[j] += rng.random() * 20
+    return matrix
+
+
+def test_two_opt_keeps_the_start_and_never_gets_worse():
+    rng = random.Random(3)
+    for _ in range(50):
+        matrix = random_matrix(9, rng)
+        start = nearest_neighbour_order(matrix)
+        order = two_opt(matrix, start)
+        assert order[0] == 0 and sorted(order) == list(range(9))
+        assert tour_cost(matrix, order) <= tour_cost(matrix, start) + 1e-9
+
+
+def test_two_opt_result_has_no_improving_reversal():
+    rng = random.Random(5)
+    for _ in range(30):
+        matrix = random_matrix(8, rng)
+        order = two_opt(matrix, nearest_neighbour_order(matrix))
+        cost = tour_cost(matrix, order)
+        for i, j in itertools.combinations(range(1, 8), 2):
+            reversed_order = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+            assert tour_cost(matrix, reversed_order) >= cost - 1e-9
+
+
+def test_two_opt_untangles_a_line():
+    positions = [0, 7, 2, 9, 4, 1, 8, 3, 6, 5]
+    matrix = [[abs(a - b) for b in positions] for a in positions]
+    order = two_opt(matrix, list(range(len(positions))))
+    assert tour_cost(matrix, order) == 9
+
+
+def test_cost_matrix_matches_in_process_rows(db):
+    graph = db.get_graph()
+    router = ZoneRouter(db)
+    nodes = list(range(0, len(graph), 7))
+    rows = cost_rows(graph.offsets, graph.targets, router.costs, nodes, nodes)
+    assert cost_matrix(graph, router.costs, nodes, workers=1) == rows
+    assert all(rows[i][i] == 0.0 for i in range(len(nodes)))
+
+
+def test_plan_visit_order(db):
+    graph = db.get_graph()
+    router = ZoneRouter(db)
+    stops = [graph.room_ids[i] for i in (5, 40, 77, 90)]
+    order, unreachable = plan_visit_order(graph, router.costs, 1, stops + [1, 999999], workers=1)
+    assert sorted(order) == sorted(stops)
+    assert unreachable == [999999]
+    nodes = [graph.index(1)] + [graph.index(room_id) for room_id in order]
+    matrix = cost_rows(graph.offsets, graph.targets, router.costs, nodes, nodes)
+    assert all(matrix[0][i] < NO_ROUTE for i in range(len(nodes)))
+
+
+def test_parallel_cost_matrix_matches(db, monkeypatch):
+    monkeypatch.setattr(route_planner, 'PARALLEL_MIN_STOPS', 8)  # Spawned workers even for a small world
+    graph = db.get_graph()
+    router = ZoneRouter(db)
+    nodes = list(range(0, len(graph), 3))
+    assert cost_matrix(graph, router.costs, nodes, workers=2) == cost_matrix(graph, router.costs, nodes, workers=1)
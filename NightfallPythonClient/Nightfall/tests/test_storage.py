@@ -0,0 +1,109 @@
+# test_storage.py - Legacy JSON import and write-behind flushing of the Storage
+import json
+
+import pytest
+
+from core.storage import MEMORY_STORE, Storage
+
+
+@pytest.fixture
+def legacy_dir(tmp_path):
+    (tmp_path / 'camera_states.json').write_text(json.dumps({"3": {"zoom": 2.0}, "7": {"zoom": 0.5}}))
+    (tmp_path / 'room_items.json').write_text("{ not json")
+    return tmp_path
+
+
+def open_store(legacy_dir):
+    return Storage(str(legacy_dir / 'client_data.sqlite3'), str(legacy_dir))
+
+
+def test_legacy_file_is_imported_once(legacy_dir):
+    store = open_store(legacy_dir)
+    assert store.items('camera_states') == {"3": {"zoom": 2.0}, "7": {"zoom": 0.5}}
+    store.delete('camera_states', 3)
+    store.close()
+
+    # The old file stays as a backup but is not imported again
+    assert (legacy_dir / 'camera_states.json').exists()
+    store = open_store(legacy_dir)
+    assert store.items('camera_states') == {"7": {"zoom": 0.5}}
+    store.close()
+
+
+def test_unreadable_legacy_file_is_retried(legacy_dir):
+    store = open_store(legacy_dir)
+    assert store.items('room_items') == {}
+    store.close()
+    (legacy_dir / 'room_items.json').write_text(json.dumps({"12": ["sword"]}))
+    store = open_store(legacy_dir)
+    assert store.get('room_items', 12) == ["sword"]
+    store.close()
+
+
+def test_import_keeps_newer_values_and_skips_empty_entries(legacy_dir):
+    store = open_store(legacy_dir)
+    # A value stored before the namespace was marked as migrated
+    with store.conn:
+        store.conn.execute("INSERT INTO kv VALUES ('camera_states', '3', ?)", (json.dumps({"zoom": 4.0}),))
+    store.close()
+    (legacy_dir / 'camera_states.json').write_text(json.dumps({"3": {"zoom": 2.0}, "5": None, "7": {"zoom": 0.5}}))
+
+    store = open_store(legacy_dir)
+    assert store.items('camera_states') == {"3": {"zoom": 4.0}, "7": {"zoom": 0.5}}
+    store.close()
+    store = open_store(legacy_dir)
+    assert store.items('camera_states') == {"3": {"zoom": 4.0}, "7": {"zoom": 0.5}}
+    assert store.conn.execute("SELECT namespace FROM migrated").fetchall() == [('camera_states',)]
+    store.close()
+
+
+def test_file_without_an_object_is_not_marked_as_imported(legacy_dir):
+    (legacy_dir / 'room_npcs.json').write_text(json.dumps(["guard"]))
+    store = open_store(legacy_dir)
+    assert store.items('room_npcs') == {}
+    assert store.conn.execute("SELECT 1 FROM migrated WHERE namespace = 'room_npcs'").fetchone() is None
+    store.close()
+
+
+def test_writes_reach_the_disk_on_flush(legacy_dir):
+    store = open_store(legacy_dir)
+    store.put('preferences', 'theme', 'dark')
+    store.put('preferences', 'font', 12)
+    store.delete('preferences', 'font')
+    assert store.pending
+    store.flush()
+    assert not store.pending
+    reader = open_store(legacy_dir)
+    assert reader.items('preferences') == {'theme': 'dark'}
+    reader.close()
+    store.close()
+
+
+def test_reads_come_from_memory(legacy_dir):
+    store = open_store(legacy_dir)
+    store.put('room_npcs', 1, ['guard'])
+    assert store.get('room_npcs', 1) == ['guard'] and store.get('room_npcs', 9, 'none') == 'none'
+    store.delete('room_npcs', 1)
+    assert store.items('room_npcs') == {}
+    store.close()
+
+
+def test_items_is_a_snapshot(legacy_dir):
+    store = open_store(legacy_dir)
+    store.put('room_npcs', 1, ['guard'])
+    snapshot = store.items('room_npcs')
+    store.put('room_npcs', 2, ['cat'])
+    snapshot['3'] = ['changed outside']
+    assert snapshot.keys() == {'1', '3'}
+    assert store.items('room_npcs') == {'1': ['guard'], '2': ['cat']}
+    store.close()
+
+
+def test_memory_store_leaves_the_disk_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = Storage(MEMORY_STORE, legacy_dir=None)
+    store.put('camera_states', '1', {'zoom': 2.0})
+    store.flush()
+    assert store.get('camera_states', '1') == {'zoom': 2.0}
+    store.close()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,116 @@
+# test_world_layout.py - Zones stitched on one plane and the streamed world overview
+import time
+
+import pytest
+
+from fake_canvas import FakeCanvas
+from map.render_backend import HeadlessViewer
+from map.render_cache import ZoneRenderCache
+from map.world_layout import ZONE_GAP, WorldLayout, convex_hull
+from map.world_overview import OVERVIEW_ROOM_ZOOM, WorldOverview
+from worlds import ISLAND_ZONE
+
+
+def overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def test_convex_hull_drops_inner_points():
+    points = [(0, 0), (10, 0), (10, 10), (0, 10), (5, 5), (3, 7), (10, 5), (0, 0)]
+    hull = convex_hull(points)
+    assert sorted(hull) == [(0, 0), (0, 10), (10, 0), (10, 10)]
+    assert convex_hull([(1, 1), (2, 2)]) == [(1, 1), (2, 2)]
+
+
+def test_zones_are_placed_without_overlap(db):
+    layout = WorldLayout.build(db, 0)
+    assert set(layout.zones) == {1, 2, 3, ISLAND_ZONE}
+    zones = list(layout.zones.values())
+    for i, a in enumerate(zones):
+        for b in zones[i + 1:]:
+            assert not overlap(a.bounds, b.bounds)
+        assert layout.bounds[0] <= a.bounds[0] and a.bounds[2] <= layout.bounds[2]
+
+
+def test_neighbours_follow_their_gateway_direction(db):
+    zones = WorldLayout.build(db, 0).zones
+    # Zone 2 is east of zone 1 and zone 3 east of zone 2, joined by east/west exits
+    assert zones[2].bounds[0] >= zones[1].bounds[2]
+    assert zones[3].bounds[0] >= zones[2].bounds[2]
+    # The unconnected island is lined up right of everything else
+    assert zones[ISLAND_ZONE].bounds[0] == max(zones[z].bounds[2] for z in (1, 2, 3)) + ZONE_GAP
+
+
+def test_hull_follows_the_offset(db):
+    zone = WorldLayout.build(db, 0).zones[2]
+    dx, dy = zone.offset
+    assert zone.hull() == [(x + dx, y + dy) for x, y in zone.local_hull]
+    assert {(600, 0), (600, 600), (0, 600)} <= set(zone.local_hull)  # Corners of the square zone
+
+
+# === OVERVIEW ===
+
+@pytest.fixture
+def overview(db, customization):
+    canvas = FakeCanvas(800, 600)
+    viewer = HeadlessViewer(canvas)
+    viewer.note_color = '#ffff00'
+    viewer.render_cache = ZoneRenderCache(db, customization)
+    viewer.schedule_render = lambda: None
+    overview = WorldOverview(viewer, db)
+    if not overview.show(0):
+        overview._build_layout(0)  # Build it here instead of waiting for the thread
+        assert overview.show(0)
+    return overview
+
+
+def wait_for_models(overview):
+    while overview.loading:
+        time.sleep(0.01)
+
+
+def test_zoomed_out_zones_are_hulls(overview):
+    camera = overview.camera
+    camera.fit_to_content()
+    camera.zoom_at(400, 300, OVERVIEW_ROOM_ZOOM / 2)
+    assert overview.update()
+    assert set(overview.hull_items) == {1, 2, 3, ISLAND_ZONE} and not overview.renderers
+    x1, y1, x2, y2 = overview.layouts[0].zones[2].bounds
+    assert overview.zone_at(*camera.world_to_canvas((x1 + x2) / 2, (y1 + y2) / 2)) == 2
+
+
+def test_hulls_are_moved_not_redrawn(overview):
+    camera = overview.camera
+    camera.fit_to_content()
+    camera.zoom_at(400, 300, OVERVIEW_ROOM_ZOOM / 2)
+    overview.update()
+    items = {zone_id: list(hull) for zone_id, hull in overview.hull_items.items()}
+    acquired = []
+    acquire = overview.pool.acquire
+    overview.pool.acquire = lambda *args, **options: acquired.append(args) or acquire(*args, **options)
+    camera.zoom_at(400, 300, camera.zoom * 0.8)
+    assert overview.update()
+    assert overview.hull_items == items and not acquired
+    scale, ox, oy = camera.transform()
+    zone = overview.layouts[0].zones[2]
+    x1, y1, x2, y2 = zone.bounds
+    label = overview.canvas.coords(items[2][1])
+    assert label == pytest.approx([ox + scale * (x1 + x2) / 2, oy + scale * (y1 + y2) / 2])
+
+
+def test_zoomed_in_zones_stream_their_rooms(overview):
+    camera = overview.camera
+    zone = overview.layouts[0].zones[2]
+    camera.zoom = 1.0
+    camera.center_on_point(*camera.world_to_canvas(*zone.hull()[0]))
+    overview.update()
+    wait_for_models(overview)
+    overview.update()
+    assert 2 in overview.renderers and 2 not in overview.hull_items
+    renderer = overview.renderers[2]
+    room_id, x, y, _ = renderer.model.rooms[0]
+    assert overview.room_at(*camera.world_to_canvas(x + zone.offset[0], y + zone.offset[1])) == room_id
+
+    overview.hide()
+    assert not overview.renderers and not overview.hull_items
+    assert not overview.canvas.visible()
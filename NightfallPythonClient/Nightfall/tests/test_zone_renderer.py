@@ -0,0 +1,207 @@
+# test_zone_renderer.py - Viewport culling, levels of detail and spatial grids of the zone renderer
+from collections import Counter
+
+import pytest
+
+from fake_canvas import FakeCanvas
+from map.item_pool import POOLED_TAG, ItemPool
+from map.render_backend import HeadlessViewer
+from map.render_cache import ZoneRenderCache
+from map.render_prep import ROOM_BOX, merge_segments, room_shapes
+from map.spatial_index import SpatialGrid, ZoneIndex
+from map.zone_renderer import FULL_DETAIL_ZOOM, LOD_DOTS, LOD_FULL, LOD_SIMPLE, SIMPLE_DETAIL_ZOOM
+
+
+@pytest.fixture(autouse=True)
+def temp_storage(storage):
+    pass
+
+
+@pytest.fixture
+def model(db, customization):
+    return ZoneRenderCache(db, customization).get(1, 0)
+
+
+def renderer_for(model, width=200, height=200):
+    canvas = FakeCanvas(width, height)
+    renderer = HeadlessViewer(canvas).zone_renderer
+    renderer.set_model(model)
+    renderer.camera.world_bounds = model.bounds
+    return canvas, renderer
+
+
+def zoom(renderer, factor):
+    camera = renderer.camera
+    camera.zoom_at(0, 0, camera.zoom * factor)
+
+
+# === SPATIAL GRID ===
+
+def test_grid_query_returns_every_key_in_the_rectangle():
+    grid = SpatialGrid(cell_size=50)
+    points = {i: ((i * 37) % 500 - 100, (i * 91) % 700 - 200) for i in range(200)}
+    for key, (x, y) in points.items():
+        grid.insert_point(key, x, y)
+    grid.insert('wide', -400, 0, 400, 10)
+    for rect in [(0, 0, 120, 80), (-90, -190, -10, 300), (-1000, -1000, 1000, 1000)]:
+        x1, y1, x2, y2 = rect
+        found = grid.query(*rect)
+        assert {k for k, (x, y) in points.items() if x1 <= x <= x2 and y1 <= y <= y2} <= found
+        assert 'wide' in found or y1 > 10 or y2 < 0
+    assert grid.query(5000, 5000, 5100, 5100) == set()
+
+
+def test_merged_chains_cover_every_segment(model):
+    chains = merge_segments(model.segments)
+    links = {frozenset(((c[i], c[i + 1]), (c[i + 2], c[i + 3]))) for c in chains for i in range(0, len(c) - 2, 2)}
+    assert links == {frozenset(((x1, y1), (x2, y2))) for x1, y1, x2, y2, _ in model.segments}
+    assert len(chains) < len(model.segments)
+
+
+def test_room_at_finds_the_box_under_a_point(model):
+    index = ZoneIndex(model)
+    for room_id, (x, y) in model.positions.items():
+        assert index.room_at(x, y) == room_id
+        assert index.room_at(x + ROOM_BOX, y - ROOM_BOX) == room_id
+    x, y = model.positions[2]
+    assert index.room_at(x + ROOM_BOX + 1, y) is None
+    assert index.room_at(x + 70, y, radius=60) == 8  # The closer of two boxes
+    assert index.room_at(-5000, -5000) is None
+
+
+def test_array_models_hit_test_through_the_grid(db, customization):
+    pytest.importorskip("numpy")
+    model = ZoneRenderCache(db, customization).get(2, 0)
+    assert model.arrays is not None
+    index = ZoneIndex(model)
+    assert isinstance(index.rooms, SpatialGrid) and isinstance(index.segments, SpatialGrid)
+    for room_id, (x, y) in model.positions.items():
+        assert index.room_at(x + ROOM_BOX, y) == room_id
+    rect = (100, 100, 400, 300)
+    inside = {room_id for room_id, (x, y) in model.positions.items() if 100 <= x <= 400 and 100 <= y <= 300}
+    assert index.rooms_in(*rect) == inside <= index.rooms.query(*rect)
+
+
+# === CULLING ===
+
+def test_only_rooms_near_the_view_are_drawn(model):
+    canvas, renderer = renderer_for(model)
+    renderer.update()
+    assert renderer.lod == LOD_FULL
+    # 200x200 view plus 100 margin at zoom 1: world -100..300, looked up in 240 unit cells
+    near = {room_id for room_id, x, y, _ in model.rooms if x <= 300 and y <= 300}
+    cells = {room_id for room_id, x, y, _ in model.rooms if x < 480 and y < 480}
+    assert near <= set(renderer.room_items) <= cells
+    assert 0 < len(renderer.segment_items) < len(model.segments)
+
+    canvas.view = [360.0, 360.0]  # Pan to the opposite corner
+    renderer.update()
+    # World 260..660 now, cells from 240 on
+    near = {room_id for room_id, x, y, _ in model.rooms if x >= 260 and y >= 260}
+    cells = {room_id for room_id, x, y, _ in model.rooms if x >= 240 and y >= 240}
+    assert near <= set(renderer.room_items) <= cells
+    drawn = {item for items in renderer.room_items.values() for item in items}
+    drawn |= set(renderer.segment_items.values()) | set(renderer.note_items.values())
+    assert drawn == set(canvas.visible())
+
+
+def test_pinned_room_stays_drawn(model):
+    canvas, renderer = renderer_for(model)
+    renderer.update()
+    renderer.pin(36)  # Far corner, outside the view
+    assert 36 in renderer.room_items
+    canvas.view = [50.0, 0.0]
+    renderer.update()
+    assert 36 in renderer.room_items
+    assert renderer.room_canvas_center(36) == model.positions[36]
+
+
+# === LEVELS OF DETAIL ===
+
+def test_detail_follows_the_zoom(model):
+    canvas, renderer = renderer_for(model, 4000, 4000)
+    renderer.update()
+    assert renderer.lod == LOD_FULL and canvas.kinds('2_shadow') == ['polygon']
+
+    zoom(renderer, (FULL_DETAIL_ZOOM + SIMPLE_DETAIL_ZOOM) / 2)
+    renderer.update()
+    assert renderer.lod == LOD_SIMPLE
+    assert set(renderer.room_items) == set(model.positions)
+    assert not canvas.find_withtag('2_shadow') and not canvas.find_withtag('zone_note')
+    assert all(canvas.itemcget(item, 'arrow') in ('', 'none') for item in renderer.segment_items.values())
+
+    zoom(renderer, SIMPLE_DETAIL_ZOOM / 2 / renderer.transform()[0])
+    renderer.update()
+    assert renderer.lod == LOD_DOTS
+    assert not renderer.segment_items and len(renderer.chain_items) == len(model.chains)
+    assert renderer.transform()[0] == pytest.approx(SIMPLE_DETAIL_ZOOM / 2)
+
+
+def test_full_detail_draws_arrows_and_notes(model):
+    canvas, renderer = renderer_for(model, 4000, 4000)
+    renderer.update()
+    arrows = [i for i, item in renderer.segment_items.items() if canvas.itemcget(item, 'arrow') == 'last']
+    assert arrows == [i for i, segment in enumerate(model.segments) if not segment[4] and i in arrows]
+    assert len(arrows) == sum(1 for segment in model.segments if not segment[4])
+    assert len(renderer.note_items) == len(model.notes)
+
+
+# === ITEM POOL ===
+
+def test_released_items_are_hidden_and_reused():
+    canvas = FakeCanvas()
+    pool = ItemPool(canvas, max_free=2)
+    lines = [pool.acquire('line', (0, 0, 1, 1), tags=("connection",)) for _ in range(3)]
+    pool.release(lines)
+    assert pool.free_count() == 2 and len(canvas.items) == 2  # The third one was deleted
+    assert not canvas.visible() and canvas.find_withtag(POOLED_TAG) == tuple(sorted(lines[:2]))
+
+    again = pool.acquire('line', (5, 5, 6, 6), fill='red', tags=("other",))
+    assert again in lines and canvas.coords(again) == [5, 5, 6, 6]
+    assert canvas.gettags(again) == ("other",) and canvas.itemcget(again, 'state') == 'normal'
+    rectangle = pool.acquire('rectangle', (0, 0, 2, 2))
+    assert rectangle not in lines and pool.free_count() == 1
+
+
+def test_zone_switch_reuses_items(db, model, customization):
+    canvas, renderer = renderer_for(model, 4000, 4000)
+    renderer.update()
+    before = Counter(canvas.kinds())
+    other = ZoneRenderCache(db, customization).get(2, 0)
+    renderer.set_model(other)
+    renderer.update()
+    after = Counter(canvas.kinds())
+    # New items only where the second zone needs more of a type than the first had
+    assert Counter(kind for kind, *_ in canvas.items.values()) == before | after
+
+
+def test_zoom_places_items_from_world_coordinates(model):
+    canvas, renderer = renderer_for(model, 4000, 4000)
+    renderer.update()
+    for _ in range(25):
+        zoom(renderer, 1.37)
+        assert renderer.update()
+        zoom(renderer, 1 / 1.37)
+        renderer.update()
+    scale, ox, oy = renderer.transform()
+    x, y = model.positions[2]
+    shadow_points, room_points = room_shapes(x, y)
+    room = canvas.find_withtag('2_room')[0]
+    assert canvas.coords(room) == pytest.approx([ox + scale * v if i % 2 == 0 else oy + scale * v
+                                                 for i, v in enumerate(room_points)])
+    assert renderer.room_canvas_center(2) == pytest.approx((ox + scale * x, oy + scale * y))
+    assert not renderer.update()  # Nothing moved: no redraw
+
+
+def test_hit_testing_through_the_drawn_transform(model):
+    canvas, renderer = renderer_for(model)
+    assert renderer.room_at(0, 0) is None  # Nothing drawn yet
+    renderer.update()
+    zoom(renderer, 0.05)
+    renderer.update()
+    scale, ox, oy = renderer.transform()
+    x, y = model.positions[20]
+    cx, cy = ox + scale * x, oy + scale * y
+    # Room boxes are 2px wide now, the 3px minimum hit radius still catches them
+    assert renderer.room_at(cx + 2, cy - 2) == 20
+    assert renderer.room_at(cx + 0.6 * scale * 120, cy) not in (None, 20)
@@ -0,0 +1,112 @@
+# test_zone_tiles.py - Zone image pyramids, their disk cache and the visible crop
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from fake_canvas import FakeCanvas
+from map import zone_tiles
+from map.render_cache import ZoneRenderCache
+from map.zone_renderer import LOD_SIMPLE
+from map.zone_tiles import TILE_BASE_SCALE, TILE_MIN_SIZE, ZoneTiles, image_pyramid, render_zone_image
+from test_zone_renderer import renderer_for, zoom
+
+COLORS = {'background': '#000000', 'room': '#c0c0c0', 'connection': '#808080', '#ff0000': '#ff0000'}
+
+
+@pytest.fixture(autouse=True)
+def images_without_tk(monkeypatch, storage):
+    """PhotoImage needs a Tk root: hand out the Pillow image itself"""
+    monkeypatch.setattr(zone_tiles, 'ImageTk', SimpleNamespace(PhotoImage=lambda image: image))
+
+
+@pytest.fixture
+def model(db, customization):
+    customization.store_customization("2", {"color": "#ff0000"})
+    return ZoneRenderCache(db, customization).get(1, 0)
+
+
+@pytest.fixture
+def tiles(db, tmp_path):
+    tiles = ZoneTiles(db)
+    tiles.cache_dir = str(tmp_path / 'tiles')
+    return tiles
+
+
+def prepared(tiles, model, colors=COLORS):
+    assert tiles.get(model, colors) is None  # Rendered in the background first
+    while tiles.is_pending():
+        time.sleep(0.01)
+    return tiles.get(model, colors)
+
+
+def test_image_covers_the_zone_bounds(model):
+    image = render_zone_image(model, 0.5, COLORS)
+    x1, y1, x2, y2 = model.bounds
+    assert image.size == (int((x2 - x1) * 0.5), int((y2 - y1) * 0.5))
+    x, y = model.positions[2]
+    assert image.getpixel(((x - x1) * 0.5, (y - y1) * 0.5)) == (255, 0, 0)
+    x, y = model.positions[3]
+    assert image.getpixel(((x - x1) * 0.5, (y - y1) * 0.5)) == (192, 192, 192)
+    assert image.getpixel((0, 0)) == (0, 0, 0)
+
+
+def test_pyramid_halves_down_to_the_minimum_size(model):
+    base = render_zone_image(model, 1.0, COLORS)
+    pyramid = image_pyramid(base, 1.0)
+    assert [scale for scale, _ in pyramid] == [1.0, 0.5, 0.25, 0.125][:len(pyramid)]
+    for (scale, image), (_, smaller) in zip(pyramid, pyramid[1:]):
+        assert smaller.size == (image.size[0] // 2, image.size[1] // 2)
+    assert max(pyramid[-1][1].size) >= TILE_MIN_SIZE > max(pyramid[-1][1].size) // 2
+
+
+def test_pyramids_are_cached_on_disk(tiles, model, db, tmp_path):
+    pyramid = prepared(tiles, model)
+    assert pyramid[0][0] == TILE_BASE_SCALE
+    cached = list((tmp_path / 'tiles').glob('zone_1_0_*.png'))
+    assert len(cached) == 1 and db.world_file_hash()[:16] in cached[0].name
+
+    again = ZoneTiles(db)
+    again.cache_dir = tiles.cache_dir
+    zone_tiles_render = zone_tiles.render_zone_image
+    try:
+        zone_tiles.render_zone_image = None  # Must come from the PNG
+        reloaded = prepared(again, model)
+    finally:
+        zone_tiles.render_zone_image = zone_tiles_render
+    assert [image.tobytes() for _, image in reloaded] == [image.tobytes() for _, image in pyramid]
+
+    # A different room color is a different image
+    model.styles[3] = ('#ff0000', False)
+    assert tiles.get(model, COLORS) is None
+
+
+def test_view_image_crops_the_visible_part(tiles, model):
+    pyramid = prepared(tiles, model)
+    x1, y1, x2, y2 = model.bounds
+    scale = 0.1
+    image, left, top = ZoneTiles.view_image(pyramid, model.bounds, scale, 0, 0, (0, 0, 30, 20))
+    assert (left, top) == pytest.approx((0, 0), abs=1)
+    assert image.size[0] <= 31 and image.size[1] <= 21
+    whole, left, top = ZoneTiles.view_image(pyramid, model.bounds, scale, 0, 0, (-1000, -1000, 1000, 1000))
+    assert (left, top) == pytest.approx((x1 * scale, y1 * scale), abs=1)
+    assert whole.size == pytest.approx(((x2 - x1) * scale, (y2 - y1) * scale), abs=2)
+    assert ZoneTiles.view_image(pyramid, model.bounds, scale, 0, 0, (500, 500, 600, 600)) is None
+
+
+def test_renderer_shows_the_image_below_full_detail(tiles, model):
+    canvas, renderer = renderer_for(model, 400, 400)
+    renderer.tiles = tiles
+    prepared(tiles, model, renderer._tile_colors())
+    zoom(renderer, 0.2)
+    renderer.update()
+    assert renderer.lod == LOD_SIMPLE
+    assert canvas.kinds('zone_image') == ['image'] and not renderer.room_items
+    renderer.pin(2)
+    assert list(renderer.room_items) == [2]
+
+    zoom(renderer, 5)
+    renderer.update()
+    assert canvas.kinds('zone_image') == [] and len(renderer.room_items) > 1
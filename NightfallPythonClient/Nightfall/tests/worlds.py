@@ -0,0 +1,119 @@
+# worlds.py - Generated test worlds and reference searches over their exits
+import heapq
+import random
+from collections import deque
+
+# Exit type per (dx, dy) grid step
+DIRECTIONS = {(0, -1): 0, (1, -1): 1, (1, 0): 2, (1, 1): 3, (0, 1): 4, (-1, 1): 5, (-1, 0): 6, (-1, -1): 7}
+# Command of each exit type, as sent to the MUD
+TYPE_COMMANDS = {0: "n", 1: "ne", 2: "e", 3: "se", 4: "s", 5: "sw", 6: "w", 7: "nw",
+                 8: "u", 9: "d", 10: "enter", 11: "leave"}
+# Room without any exit, in a zone of its own
+ISLAND_ROOM = 999
+ISLAND_ZONE = 9
+
+
+def make_world(zones=3, size=6, seed=1):
+    """
+    World file data of `zones` square zones of size x size rooms, 120 units
+    apart, with random gaps in the exits. Neighbouring zones are joined by an
+    east/west exit pair and a portal ('enter portal' / leave). The corner room
+    of every zone is on level 1. ISLAND_ROOM has no exits at all.
+    """
+    rng = random.Random(seed)
+    rooms, zone_data, exits, zone_rooms, descriptions, names = {}, {}, {}, {}, [], []
+    grid = {}
+    room_id = 1
+
+    def add_room(room_id, zone_id, x, y, z):
+        room = {"id": room_id, "name": f"Room {room_id} of zone {zone_id}",
+                "description": f"A clearing number {room_id} with trees {x} {y}",
+                "position": {"x": x * 120, "y": y * 120, "z": z},
+                "zone_id": zone_id, "exits": [], "connected_rooms": []}
+        rooms[str(room_id)] = room
+        zone_rooms.setdefault(str(zone_id), []).append(room_id)
+        descriptions.append([room_id, room["description"]])
+        names.append([room_id, room["name"]])
+
+    for zone_id in range(1, zones + 1):
+        zone_data[str(zone_id)] = {"name": f"Zone {zone_id}"}
+        for x in range(size):
+            for y in range(size):
+                add_room(room_id, zone_id, x, y, 1 if x == y == 0 else 0)
+                grid[(zone_id, x, y)] = room_id
+                room_id += 1
+    zone_data[str(ISLAND_ZONE)] = {"name": "Island"}
+    add_room(ISLAND_ROOM, ISLAND_ZONE, 0, 0, 0)
+
+    def link(a, b, exit_type, command=None):
+        exit_info = {"to": b, "type": exit_type}
+        if command:
+            exit_info["command"] = command
+        exits.setdefault(str(a), []).append(exit_info)
+        rooms[str(a)]["exits"].append(exit_info)
+        rooms[str(a)]["connected_rooms"].append(b)
+
+    for (zone_id, x, y), a in grid.items():
+        for (dx, dy), exit_type in DIRECTIONS.items():
+            if dx and dy and rng.random() < 0.8:
+                continue
+            b = grid.get((zone_id, x + dx, y + dy))
+            if b and rng.random() < 0.9:
+                link(a, b, exit_type)
+    for zone_id in range(1, zones):
+        a, b = grid[(zone_id, size - 1, size // 2)], grid[(zone_id + 1, 0, size // 2)]
+        link(a, b, 2)
+        link(b, a, 6)
+        a, b = grid[(zone_id, size // 2, size - 1)], grid[(zone_id + 1, size // 2, 0)]
+        link(a, b, 10, "enter portal")
+        link(b, a, 11)
+    return {"rooms": rooms, "zones": zone_data, "exits": exits, "descriptions_index": descriptions,
+            "names_index": names, "zone_rooms": zone_rooms}
+
+
+def exit_command(exit_info):
+    return exit_info.get("command") or TYPE_COMMANDS[exit_info["type"]]
+
+
+def walk(world, start, commands):
+    """Rooms visited walking commands from start (start included), None if a command has no exit"""
+    rooms = [int(start)]
+    for command in commands:
+        exit_info = next((e for e in world["exits"].get(str(rooms[-1]), ()) if exit_command(e) == command), None)
+        if exit_info is None:
+            return None
+        rooms.append(int(exit_info["to"]))
+    return rooms
+
+
+def shortest_steps(world, source):
+    """Reference BFS: {room id: steps} from source"""
+    steps = {int(source): 0}
+    queue = deque([int(source)])
+    while queue:
+        room_id = queue.popleft()
+        for exit_info in world["exits"].get(str(room_id), ()):
+            to_id = int(exit_info["to"])
+            if to_id not in steps and str(to_id) in world["rooms"]:
+                steps[to_id] = steps[room_id] + 1
+                queue.append(to_id)
+    return steps
+
+
+def shortest_costs(world, source, exit_cost):
+    """Reference Dijkstra: {room id: cost} from source, exit_cost(from id, exit) per exit (None: unusable)"""
+    dist = {int(source): 0.0}
+    heap = [(0.0, int(source))]
+    while heap:
+        cost, room_id = heapq.heappop(heap)
+        if cost > dist[room_id]:
+            continue
+        for exit_info in world["exits"].get(str(room_id), ()):
+            to_id = int(exit_info["to"])
+            step = exit_cost(room_id, exit_info)
+            if step is None or str(to_id) not in world["rooms"]:
+                continue
+            if cost + step < dist.get(to_id, float('inf')):
+                dist[to_id] = cost + step
+                heapq.heappush(heap, (cost + step, to_id))
+    return dist